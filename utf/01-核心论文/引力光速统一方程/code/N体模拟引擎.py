@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+蛙跳法 N 体引力模拟引擎
+Leapfrog N-Body Simulation Engine
+
+辛积分器（kick-drift-kick 蛙跳 / 速度 Verlet），两两引力加速度由
+引力场计算核心.evaluate_field 向量化计算（以质量自身位置为网格），支持 Plummer 软化。
+提供能量、动量漂移诊断；frames() 生成器每帧推进若干物理子步，
+物理步长与显示帧率解耦，动画只需逐帧取状态。
+
+Author: Algorithm Alliance - Gravity Animation Specialist
+Date: 2025-09-16
+"""
+
+import numpy as np
+
+from 引力场计算核心 import evaluate_field
+
+
+class LeapfrogNBody:
+    """蛙跳法 N 体积分器"""
+
+    def __init__(self, masses, positions, velocities, G=1.0, softening=0.0, dt=0.01):
+        self.masses = np.asarray(masses, dtype=np.float64).reshape(-1)
+        self.positions = np.array(positions, dtype=np.float64).reshape(len(self.masses), -1)
+        self.velocities = np.array(velocities, dtype=np.float64).reshape(self.positions.shape)
+        self.G = G
+        self.softening = softening
+        self.dt = dt
+        self.time = 0.0
+        self.steps = 0
+
+        self.accelerations = self.compute_accelerations()
+        self.initial_energy = self.total_energy()
+        self.initial_momentum = self.momentum()
+
+    def compute_accelerations(self, positions=None):
+        """两两引力加速度 a_i = G Σ_j m_j (x_j - x_i) / (|x_j - x_i|² + ε²)^{3/2}"""
+        positions = self.positions if positions is None else positions
+        # 自身项的位移为零，对加速度没有贡献
+        return evaluate_field(self.masses, positions, positions, G=self.G, softening=self.softening,
+                              potential=False, intensity=False)['vectors']
+
+    def step(self, n_steps=1):
+        """推进 n_steps 个 kick-drift-kick 步，每步只计算一次加速度"""
+        dt = self.dt
+        for _ in range(n_steps):
+            self.velocities += 0.5 * dt * self.accelerations
+            self.positions += dt * self.velocities
+            self.accelerations = self.compute_accelerations()
+            self.velocities += 0.5 * dt * self.accelerations
+        self.steps += n_steps
+        self.time += n_steps * dt
+
+    def kinetic_energy(self):
+        """动能 Σ m v² / 2"""
+        return 0.5 * float(np.sum(self.masses * np.einsum('ij,ij->i', self.velocities, self.velocities)))
+
+    def potential_energy(self):
+        """势能 -G Σ_{i<j} m_i m_j / sqrt(r² + ε²)"""
+        potential = evaluate_field(self.masses, self.positions, self.positions, G=self.G,
+                                   softening=self.softening, vectors=False, intensity=False)['potential']
+        if self.softening:
+            # 软化后自身项 -G m_i / ε 不为零，需扣除
+            potential = potential + self.G * self.masses / self.softening
+        return 0.5 * float(np.sum(self.masses * potential))
+
+    def total_energy(self):
+        """总能量"""
+        return self.kinetic_energy() + self.potential_energy()
+
+    def momentum(self):
+        """总动量 Σ m v"""
+        return self.masses @ self.velocities
+
+    def diagnostics(self):
+        """能量、动量漂移诊断"""
+        energy = self.total_energy()
+        momentum = self.momentum()
+        # 动量漂移按 Σ m|v| 归一化（初始总动量通常为零）
+        scale = float(np.sum(self.masses * np.linalg.norm(self.velocities, axis=1))) or 1.0
+        return {
+            'time': self.time,
+            'steps': self.steps,
+            'energy': energy,
+            'energy_drift': abs((energy - self.initial_energy) / self.initial_energy)
+                            if self.initial_energy else abs(energy),
+            'momentum_drift': float(np.linalg.norm(momentum - self.initial_momentum)) / scale,
+        }
+
+    def frames(self, substeps=10):
+        """
+        每帧推进 substeps 个物理步并产出当前状态，供动画逐帧读取
+
+        产出: (时间, 位置副本, 速度副本)
+        """
+        while True:
+            yield self.time, self.positions.copy(), self.velocities.copy()
+            self.step(substeps)
+
+
+def circular_binary(mass_1, mass_2, pos_1, pos_2, G=1.0):
+    """两质量的圆轨道初速度（质心静止，轨道平面为 XY 平面）"""
+    pos_1 = np.asarray(pos_1, dtype=np.float64)
+    pos_2 = np.asarray(pos_2, dtype=np.float64)
+    separation = pos_2 - pos_1
+    distance = np.linalg.norm(separation)
+    total = mass_1 + mass_2
+
+    # 相对速度 sqrt(G M / r)，方向垂直于连线
+    direction = np.cross([0.0, 0.0, 1.0], separation / distance)
+    relative = np.sqrt(G * total / distance) * direction
+    return np.array([-mass_2 / total * relative, mass_1 / total * relative])
+
+
+def plummer_cluster(n_bodies, seed=42, G=1.0):
+    """Plummer 球星团（总质量 1，位力平衡的近似初速度）"""
+    rng = np.random.default_rng(seed)
+    masses = np.full(n_bodies, 1.0 / n_bodies)
+    radius = 1.0 / np.sqrt(rng.uniform(0.01, 0.99, n_bodies) ** (-2 / 3) - 1)
+    direction = rng.normal(size=(n_bodies, 3))
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    positions = radius[:, None] * direction
+
+    # 速度按当地逃逸速度的一半取各向同性随机方向
+    escape = np.sqrt(2 * G) * (1 + radius**2) ** (-0.25)
+    velocity_direction = rng.normal(size=(n_bodies, 3))
+    velocity_direction /= np.linalg.norm(velocity_direction, axis=1)[:, None]
+    velocities = 0.5 * escape[:, None] * velocity_direction
+    velocities -= velocities.mean(axis=0)
+    return masses, positions, velocities
+
+
+def main():
+    """主函数：双星圆轨道和 Plummer 星团的守恒量诊断"""
+    print("🪐 蛙跳法 N 体模拟引擎")
+    print("=" * 50)
+
+    masses = [3.0, 1.5]
+    positions = [[-3.0, 0.0, 0.0], [3.0, 0.0, 0.0]]
+    engine = LeapfrogNBody(masses, positions, circular_binary(3.0, 1.5, *positions), dt=0.02)
+    period = 2 * np.pi * np.sqrt(6.0**3 / 4.5)
+    engine.step(int(round(10 * period / engine.dt)))
+    stats = engine.diagnostics()
+    print(f"✅ 双星 10 个周期 ({stats['steps']} 步): 能量漂移 {stats['energy_drift']:.2e}, "
+          f"动量漂移 {stats['momentum_drift']:.2e}")
+
+    masses, positions, velocities = plummer_cluster(500)
+    engine = LeapfrogNBody(masses, positions, velocities, softening=0.05, dt=0.005)
+    for _, state in zip(range(50), engine.frames(substeps=20)):
+        pass
+    stats = engine.diagnostics()
+    print(f"✅ Plummer 星团 500 体 ({stats['steps']} 步): 能量漂移 {stats['energy_drift']:.2e}, "
+          f"动量漂移 {stats['momentum_drift']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@ from matplotlib.colors import LinearSegmentedColormap
 from matplotlib.widgets import Button
 import matplotlib.gridspec as gridspec
 
+from 引力场计算核心 import evaluate_field
+
 # 设置中文字体和超高质量渲染
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -389,16 +391,9 @@ class SpaceFieldInteractionAnimator:
         y = np.linspace(-4, 4, 40)
         X, Y = np.meshgrid(x, y)
         
-        # M的场强分布
-        r_M = np.sqrt((X - self.mass_M_pos[0])**2 + (Y - self.mass_M_pos[1])**2) + 0.1
-        field_M = 2.0 / r_M**2
-        
-        # m的场强分布
-        r_m = np.sqrt((X - self.mass_m_pos[0])**2 + (Y - self.mass_m_pos[1])**2) + 0.1
-        field_m = 1.0 / r_m**2
-        
-        # 总场强
-        total_field = field_M + field_m
+        # 总场强：M、m 的 1/r² 场强标量叠加
+        total_field = evaluate_field([2.0, 1.0], [self.mass_M_pos[:2], self.mass_m_pos[:2]], (X, Y),
+                                     r_offset=0.1, potential=False, vectors=False)['intensity']
         
         # 动态等高线
         levels = np.logspace(-1, 1, 8)
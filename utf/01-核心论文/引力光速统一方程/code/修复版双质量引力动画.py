@@ -16,6 +16,10 @@ import matplotlib.animation as animation
 from matplotlib.patches import Circle
 import matplotlib.patches as patches
 
+from 引力场计算核心 import evaluate_field
+from N体模拟引擎 import LeapfrogNBody, circular_binary
+from 场线追踪 import fibonacci_sphere, split_lines, trace_field_lines
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -25,13 +29,41 @@ plt.rcParams['figure.dpi'] = 120
 class FixedGravityAnimator:
     """修复版引力动画器"""
     
-    def __init__(self):
+    # 场线追踪的边界盒（与三维子图的绘图范围一致）
+    FIELD_LINE_BOUNDS = (np.array([-6.0, -5.0, -4.0]), np.array([6.0, 5.0, 4.0]))
+    
+    # 场强网格的格距（x 方向 linspace(-6, 6, 100)）
+    FIELD_GRID_CELL = 12.0 / 99
+    
+    def __init__(self, simulate=False, substeps=10, dt=0.02, field_tolerance=FIELD_GRID_CELL):
         self.fig = None
         self.total_frames = 200
         
         # 物理参数
         self.mass_M_pos = np.array([-3, 0, 0])  # 大质量M
         self.mass_m_pos = np.array([3, 0, 0])   # 小质量m
+        self.mass_M = 3.0
+        self.mass_m = 1.5
+        
+        # 蛙跳法 N 体模拟：每显示一帧推进 substeps 个物理步（G=1，圆轨道初速度）
+        self.engine = None
+        self.sim_frames = None
+        if simulate:
+            positions = [self.mass_M_pos, self.mass_m_pos]
+            velocities = circular_binary(self.mass_M, self.mass_m, *positions)
+            self.engine = LeapfrogNBody([self.mass_M, self.mass_m], positions, velocities, dt=dt)
+            self.sim_frames = self.engine.frames(substeps)
+        
+        # 场数据（场强网格、矢量网格、场线）按两个质量位置的快照缓存：
+        #   - 静止模式（simulate=False）：快照不变，整个动画只计算一次
+        #   - 模拟模式：任一质量离开快照位置超过 field_tolerance（默认一个网格格距）时更新快照，
+        #     场数据随之重算，场线和等值线与绘制的质量位置相差不超过这个距离
+        self.field_tolerance = field_tolerance
+        self._field_positions = (self.mass_M_pos.copy(), self.mass_m_pos.copy())
+        self._field_cache = {}
+        self._field_lines_cache = {}
+        self._field_panel_key = None
+        self._field_colorbar = None
         
         # 颜色配置
         self.colors = {
@@ -59,35 +91,74 @@ class FixedGravityAnimator:
         self.ax_forces = self.fig.add_subplot(223)
         self.ax_explanation = self.fig.add_subplot(224)
         
+        # 新图形需要重新绘制场强面板和颜色条
+        self._field_panel_key = None
+        self._field_colorbar = None
+        
         return self.fig
     
-    def create_gravity_field_lines(self, center_pos, n_lines=20, color='red', inward=True):
-        """创建正确的引力场线（向心收敛）"""
-        field_lines = []
-        
-        for i in range(n_lines):
-            # 随机生成球面上的起始点
-            theta = np.random.uniform(0, 2*np.pi)
-            phi = np.random.uniform(0, np.pi)
-            
-            # 起始半径
-            start_radius = 4.0
-            
-            # 创建向心收敛的场线
-            t = np.linspace(0, 1, 50)
-            
-            # 场线从外向内收敛到质量中心
-            radii = start_radius * (1 - 0.9 * t)  # 向内收敛
+    def field_key(self):
+        """场数据缓存键：两个质量位置的快照"""
+        mass_M_pos, mass_m_pos = self._field_positions
+        return tuple(np.round(mass_M_pos, 9)) + tuple(np.round(mass_m_pos, 9))
+    
+    def get_field_grids(self):
+        """场强网格和矢量网格（按质量位置快照缓存，只保留当前快照的一份）"""
+        key = self.field_key()
+        if key not in self._field_cache:
+            # 场强分布
+            x = np.linspace(-6, 6, 100)
+            y = np.linspace(-4, 4, 80)
+            X, Y = np.meshgrid(x, y)
             
-            # 添加轻微的螺旋效果
-            theta_spiral = theta + 0.5 * t
+            # 总场强：M、m 的 1/r² 场强标量叠加
+            masses = [self.mass_M, self.mass_m]
+            positions = [position[:2] for position in self._field_positions]
+            total_field = evaluate_field(masses, positions, (X, Y), r_offset=0.1,
+                                         potential=False, vectors=False)['intensity']
             
-            x = center_pos[0] + radii * np.sin(phi) * np.cos(theta_spiral)
-            y = center_pos[1] + radii * np.sin(phi) * np.sin(theta_spiral)
-            z = center_pos[2] + radii * np.cos(phi)
+            # 引力矢量场（指向 M、m，权重 1 : 0.5）
+            x_vec = np.linspace(-5, 5, 15)
+            y_vec = np.linspace(-3, 3, 10)
+            X_vec, Y_vec = np.meshgrid(x_vec, y_vec)
+            fx_total, fy_total = evaluate_field(np.array(masses) / 3.0, positions, (X_vec, Y_vec),
+                                                r_offset=0.1, potential=False,
+                                                intensity=False)['components']
             
+            self._field_cache = {key: {
+                'X': X, 'Y': Y, 'total_field': total_field,
+                'X_vec': X_vec, 'Y_vec': Y_vec, 'fx': fx_total, 'fy': fy_total,
+            }}
+        return self._field_cache[key]
+    
+    def create_gravity_field_lines(self, center_pos, n_lines=20, color='red', inward=True):
+        """创建正确的引力场线（向心收敛）：从球面种子点沿真实双质量引力场积分"""
+        field_key = self.field_key()
+        if field_key not in self._field_lines_cache:
+            self._field_lines_cache = {field_key: {}}
+        cache = self._field_lines_cache[field_key]
+        key = tuple(np.round(center_pos, 9)) + (n_lines, color, inward)
+        if key in cache:
+            return cache[key]
+        
+        field_lines = []
+        
+        # 起始球面上均匀分布的种子点（起始半径 4.0），超出边界盒的种子点收回到盒面上，
+        # 否则这些线一开始就越界，只有两个点
+        lower, upper = self.FIELD_LINE_BOUNDS
+        seeds = np.clip(fibonacci_sphere(n_lines, radius=4.0, center=center_pos), lower, upper)
+        
+        # 沿场方向（inward）或逆场方向追踪，终止于质量球面或绘图边界
+        result = trace_field_lines([self.mass_M, self.mass_m], list(self._field_positions), seeds,
+                                   direction=1 if inward else -1, capture_radius=[0.4, 0.25],
+                                   bounds=self.FIELD_LINE_BOUNDS, max_length=20.0,
+                                   rtol=1e-4, atol=1e-4)
+        
+        for line in split_lines(result):
+            x, y, z = line.T
             field_lines.append((x, y, z, color))
         
+        cache[key] = field_lines
         return field_lines
     
     def create_interaction_field_lines(self):
@@ -141,14 +212,17 @@ class FixedGravityAnimator:
         self.ax_3d.plot_surface(x_m, y_m, z_m, color=self.colors['mass_m'], alpha=0.8)
         
         # 绘制M的引力场线（红色，向心）
-        field_lines_M = self.create_gravity_field_lines(self.mass_M_pos, 15, self.colors['field_M'])
+        field_lines_M = self.create_gravity_field_lines(self._field_positions[0], 15, self.colors['field_M'])
         for x, y, z, color in field_lines_M:
             self.ax_3d.plot(x, y, z, color=color, alpha=0.6, linewidth=2)
             
             # 添加箭头指示引力方向（向内）
-            mid_idx = len(x) // 2
+            if len(x) < 2:
+                continue
+            end_idx = min(len(x) // 2 + 5, len(x) - 1)
+            mid_idx = min(len(x) // 2, end_idx - 1)
             arrow_start = np.array([x[mid_idx], y[mid_idx], z[mid_idx]])
-            arrow_end = np.array([x[mid_idx+5], y[mid_idx+5], z[mid_idx+5]])
+            arrow_end = np.array([x[end_idx], y[end_idx], z[end_idx]])
             arrow_dir = arrow_end - arrow_start
             
             self.ax_3d.quiver(arrow_start[0], arrow_start[1], arrow_start[2],
@@ -156,14 +230,17 @@ class FixedGravityAnimator:
                             color=color, alpha=0.8, arrow_length_ratio=0.3)
         
         # 绘制m的引力场线（蓝色，向心）
-        field_lines_m = self.create_gravity_field_lines(self.mass_m_pos, 10, self.colors['field_m'])
+        field_lines_m = self.create_gravity_field_lines(self._field_positions[1], 10, self.colors['field_m'])
         for x, y, z, color in field_lines_m:
             self.ax_3d.plot(x, y, z, color=color, alpha=0.6, linewidth=2)
             
             # 添加箭头指示引力方向（向内）
-            mid_idx = len(x) // 2
+            if len(x) < 2:
+                continue
+            end_idx = min(len(x) // 2 + 5, len(x) - 1)
+            mid_idx = min(len(x) // 2, end_idx - 1)
             arrow_start = np.array([x[mid_idx], y[mid_idx], z[mid_idx]])
-            arrow_end = np.array([x[mid_idx+5], y[mid_idx+5], z[mid_idx+5]])
+            arrow_end = np.array([x[end_idx], y[end_idx], z[end_idx]])
             arrow_dir = arrow_end - arrow_start
             
             self.ax_3d.quiver(arrow_start[0], arrow_start[1], arrow_start[2],
@@ -195,30 +272,30 @@ class FixedGravityAnimator:
         self.ax_3d.set_zlabel('Z')
         self.ax_3d.set_title('✅ 正确的双质量引力场可视化', fontsize=14, fontweight='bold')
         
+        # 模拟诊断：能量、动量漂移
+        if self.engine is not None:
+            stats = self.engine.diagnostics()
+            self.ax_3d.text2D(0.02, 0.02,
+                              f"t = {stats['time']:.2f}  步数 {stats['steps']}\n"
+                              f"能量漂移 {stats['energy_drift']:.1e}\n"
+                              f"动量漂移 {stats['momentum_drift']:.1e}",
+                              transform=self.ax_3d.transAxes, fontsize=9, color='#2C3E50')
+        
         # 设置坐标轴范围
         self.ax_3d.set_xlim([-6, 6])
         self.ax_3d.set_ylim([-5, 5])
         self.ax_3d.set_zlim([-4, 4])
     
     def draw_field_strength_comparison(self, frame):
-        """绘制场强对比图"""
+        """绘制场强对比图（质量位置不变时保留上一帧的等高线，不重绘）"""
+        key = self.field_key()
+        if key == self._field_panel_key:
+            return
+        self._field_panel_key = key
         self.ax_field.clear()
         
-        # 创建场强分布
-        x = np.linspace(-6, 6, 100)
-        y = np.linspace(-4, 4, 80)
-        X, Y = np.meshgrid(x, y)
-        
-        # M的引力场强（1/r²，向心）
-        r_M = np.sqrt((X - self.mass_M_pos[0])**2 + (Y - self.mass_M_pos[1])**2) + 0.1
-        field_M = 3.0 / r_M**2
-        
-        # m的引力场强（1/r²，向心）
-        r_m = np.sqrt((X - self.mass_m_pos[0])**2 + (Y - self.mass_m_pos[1])**2) + 0.1
-        field_m = 1.5 / r_m**2
-        
-        # 总场强
-        total_field = field_M + field_m
+        grids = self.get_field_grids()
+        X, Y, total_field = grids['X'], grids['Y'], grids['total_field']
         
         # 绘制场强等高线
         contour = self.ax_field.contourf(X, Y, total_field, levels=20, cmap='hot', alpha=0.7)
@@ -233,30 +310,7 @@ class FixedGravityAnimator:
                             marker='o', edgecolors='white', linewidth=2, label='质量m')
         
         # 绘制引力矢量场（向心）
-        x_vec = np.linspace(-5, 5, 15)
-        y_vec = np.linspace(-3, 3, 10)
-        X_vec, Y_vec = np.meshgrid(x_vec, y_vec)
-        
-        # 计算指向M的引力矢量
-        dx_M = self.mass_M_pos[0] - X_vec
-        dy_M = self.mass_M_pos[1] - Y_vec
-        r_M_vec = np.sqrt(dx_M**2 + dy_M**2) + 0.1
-        fx_M = dx_M / r_M_vec**3
-        fy_M = dy_M / r_M_vec**3
-        
-        # 计算指向m的引力矢量
-        dx_m = self.mass_m_pos[0] - X_vec
-        dy_m = self.mass_m_pos[1] - Y_vec
-        r_m_vec = np.sqrt(dx_m**2 + dy_m**2) + 0.1
-        fx_m = 0.5 * dx_m / r_m_vec**3
-        fy_m = 0.5 * dy_m / r_m_vec**3
-        
-        # 总引力矢量
-        fx_total = fx_M + fx_m
-        fy_total = fy_M + fy_m
-        
-        # 绘制矢量场
-        self.ax_field.quiver(X_vec, Y_vec, fx_total, fy_total, 
+        self.ax_field.quiver(grids['X_vec'], grids['Y_vec'], grids['fx'], grids['fy'], 
                            alpha=0.6, scale=20, color='white', width=0.003)
         
         self.ax_field.set_xlabel('X')
@@ -265,8 +319,11 @@ class FixedGravityAnimator:
         self.ax_field.legend()
         self.ax_field.set_aspect('equal')
         
-        # 添加颜色条
-        plt.colorbar(contour, ax=self.ax_field, shrink=0.8, label='场强')
+        # 颜色条只创建一次，之后跟随新的等高线更新
+        if self._field_colorbar is None:
+            self._field_colorbar = plt.colorbar(contour, ax=self.ax_field, shrink=0.8, label='场强')
+        else:
+            self._field_colorbar.update_normal(contour)
     
     def draw_force_analysis(self, frame):
         """绘制力的分析"""
@@ -390,8 +447,20 @@ class FixedGravityAnimator:
                                color='#2C3E50', fontweight='bold',
                                transform=self.ax_explanation.transAxes)
     
+    def advance_simulation(self):
+        """从模拟引擎取下一帧状态，更新两个质量的位置（移动超过 field_tolerance 时更新场数据的位置快照）"""
+        if self.sim_frames is None:
+            return
+        _, positions, _ = next(self.sim_frames)
+        self.mass_M_pos, self.mass_m_pos = positions
+        moved = max(np.linalg.norm(live - snapshot)
+                    for live, snapshot in zip((self.mass_M_pos, self.mass_m_pos), self._field_positions))
+        if moved > self.field_tolerance:
+            self._field_positions = (self.mass_M_pos.copy(), self.mass_m_pos.copy())
+    
     def animate(self, frame):
         """主动画函数"""
+        self.advance_simulation()
         self.draw_3d_gravity_system(frame)
         self.draw_field_strength_comparison(frame)
         self.draw_force_analysis(frame)
@@ -415,7 +484,7 @@ def main():
     print("🔧 算法联盟 - 引力动画修复程序启动")
     print("正在修复双质量引力系统的可视化问题...")
     
-    animator = FixedGravityAnimator()
+    animator = FixedGravityAnimator(simulate=True)
     anim = animator.create_animation()
     
     plt.show()
@@ -426,6 +495,7 @@ def main():
     print("• 增加了双向相互作用效果")
     print("• 正确显示了牛顿第三定律")
     print("• 改进了场强分布的可视化")
+    print("• 质量在引力作用下运动（蛙跳法 N 体模拟）")
     
     # 保存选项
     save_option = input("\n💾 是否保存修复版动画？(y/n): ").lower().strip()
@@ -7,9 +7,22 @@ import matplotlib.animation as animation
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']  # 用来正常显示中文标签
 plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
 
+# 粒子数量（结构数组实现，可直接设为 1_000_000）
+n_particles = 100
+
+# 三维散点最多显示的粒子数：粒子很多时按固定步长抽样显示，物理推进仍覆盖全部粒子
+max_rendered = 20000
+
+# 是否显示平面投影直方图（用 np.bincount 统计粒子击中平面的位置分布）
+show_histogram = False
+hist_bins = 64
+
+# 每帧推进步长
+dt = 0.05
+
 # 设置图形
-fig = plt.figure(figsize=(10, 8))
-ax = fig.add_subplot(111, projection='3d')
+fig = plt.figure(figsize=(16, 8) if show_histogram else (10, 8))
+ax = fig.add_subplot(121 if show_histogram else 111, projection='3d')
 
 # 绘制平面
 xx, yy = np.meshgrid(np.linspace(-2, 2, 10), np.linspace(-2, 2, 10))
@@ -20,54 +33,87 @@ ax.plot_surface(xx, yy, zz, alpha=0.5, color='gray')
 source = np.array([0, 0, 1])
 ax.scatter(*source, color='red', s=100, label='Source')
 
-# 粒子数量
-n_particles = 100
-
 # 生成各向同性方向
 theta = np.arccos(2 * np.random.rand(n_particles) - 1)  # 极角（0到π）
 phi = 2 * np.pi * np.random.rand(n_particles)  # 方位角（0到2π）
 
-# 速度向量
-vx = np.sin(theta) * np.cos(phi)
-vy = np.sin(theta) * np.sin(phi)
-vz = np.cos(theta)
+# 结构数组（SoA）：位置和速度各为 (3, N) 的 float32 数组，每个分量一行连续存储
+# 速度预先乘以 dt，每帧只需一次原地加法
+velocity = np.empty((3, n_particles), dtype=np.float32)
+velocity[0] = np.sin(theta) * np.cos(phi) * dt
+velocity[1] = np.sin(theta) * np.sin(phi) * dt
+velocity[2] = np.cos(theta) * dt
+del theta, phi
 
 # 粒子初始位置（点源）
-x = np.full(n_particles, source[0])
-y = np.full(n_particles, source[1])
-z = np.full(n_particles, source[2])
+position = np.empty((3, n_particles), dtype=np.float32)
+position[:] = source[:, None]
+x, y, z = position  # 行视图，与 position 共享内存
+
+# 跟踪哪些粒子击中了平面（预分配，逐帧原地更新）
+hit_plane = np.zeros(n_particles, dtype=bool)
+prev_hit = np.zeros(n_particles, dtype=bool)
+new_hit = np.zeros(n_particles, dtype=bool)
+
+# 显示用的抽样视图：步长切片是视图，不会复制数据
+render_stride = max(1, -(-n_particles // max_rendered))
+x_view, y_view, z_view = x[::render_stride], y[::render_stride], z[::render_stride]
 
 # 创建粒子散点图
-particles = ax.scatter(x, y, z, color='blue', s=5, label='Particles')
+particles = ax.scatter(x_view, y_view, z_view, color='blue', s=5 if render_stride == 1 else 1,
+                       label='Particles')
 
 # 文本显示统计信息
 text = ax.text2D(0.05, 0.95, "", transform=ax.transAxes, fontsize=10)
 
-# 跟踪哪些粒子击中了平面
-hit_plane = np.zeros(n_particles, dtype=bool)
+# 平面投影直方图：只累计每帧新击中平面的粒子
+if show_histogram:
+    ax_hist = fig.add_subplot(122)
+    hist_counts = np.zeros(hist_bins * hist_bins, dtype=np.int64)
+    hist_image = ax_hist.imshow(hist_counts.reshape(hist_bins, hist_bins), origin='lower',
+                                extent=(-2, 2, -2, 2), cmap='hot', interpolation='nearest')
+    ax_hist.set_xlabel('X')
+    ax_hist.set_ylabel('Y')
+    ax_hist.set_title('Plane hit histogram (np.bincount)')
+
+
+def accumulate_histogram(indices):
+    """把新击中平面的粒子按 (x, y) 分箱累加到直方图"""
+    ix = np.floor((x[indices] + 2) * (hist_bins / 4)).astype(np.int64)
+    iy = np.floor((y[indices] + 2) * (hist_bins / 4)).astype(np.int64)
+    inside = (ix >= 0) & (ix < hist_bins) & (iy >= 0) & (iy < hist_bins)
+    flat = iy[inside] * hist_bins + ix[inside]
+    hist_counts[:] += np.bincount(flat, minlength=hist_bins * hist_bins)
+
 
 # 动画更新函数
 def update(num):
-    global x, y, z, hit_plane
-    
-    # 移动未击中平面的粒子
-    for i in range(n_particles):
-        if not hit_plane[i]:
-            x[i] += vx[i] * 0.05
-            y[i] += vy[i] * 0.05
-            z[i] += vz[i] * 0.05
-            if z[i] <= 0:
-                hit_plane[i] = True
-                z[i] = 0  # 固定在平面上
-
-    # 更新散点图
-    particles._offsets3d = (x, y, z)
-    
+    # 原地推进所有粒子；已击中平面的粒子速度已清零，保持不动
+    np.add(position, velocity, out=position)
+
+    # 检测击中平面的粒子并固定在平面上
+    np.copyto(prev_hit, hit_plane)
+    np.less_equal(z, 0, out=hit_plane)
+    np.copyto(velocity, 0, where=hit_plane)
+    np.maximum(z, 0, out=z)
+
+    # 更新散点图（抽样视图随 position 原地变化）
+    particles._offsets3d = (x_view, y_view, z_view)
+
     # 统计击中平面的粒子数
-    count = np.sum(hit_plane)
+    count = np.count_nonzero(hit_plane)
     ratio = count / n_particles if n_particles > 0 else 0
     text.set_text(f"Hit plane: {count}/{n_particles} = {ratio:.2f}\nGeometric factor: 2 (4pi/2pi)")
-    
+
+    if show_histogram:
+        np.greater(hit_plane, prev_hit, out=new_hit)
+        indices = np.flatnonzero(new_hit)
+        if indices.size:
+            accumulate_histogram(indices)
+            hist_image.set_data(hist_counts.reshape(hist_bins, hist_bins))
+            hist_image.set_clim(0, max(1, hist_counts.max()))
+        return particles, text, hist_image
+
     return particles, text
 
 # 初始化动画
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+场景几何二进制导出器
+Scene Geometry Binary Exporter
+
+把 Python 动画器中已经算好的球面网格、场矢量（含箭头和引力场线）、平面相互作用线、
+立体角元素和平面场强分布导出为小端 float32 二进制缓冲区（.bin）和一份 JSON 清单，
+WebGL 页面只需一次 fetch 即可得到全部 TypedArray，启动时不再用 JS 生成几何。
+
+二进制布局（所有偏移均相对文件起点，按 4 字节对齐）：
+    [0:4]   魔数 b'UFVG'
+    [4:8]   uint32 小端，JSON 清单的字节长度 H
+    [8:8+H] UTF-8 JSON 清单（尾部空格填充到 4 字节对齐）
+    [...]   各数组数据，小端 float32（索引为 uint32）
+浏览器端的读取器是 WebGL高级几何因子可视化.html 中的 loadSceneGeometry。
+
+线段和圆锥按极角 θ 升序排列，并附带 *_theta 数组：页面按积分进度二分查找 θ 上限，
+用 setDrawRange / InstancedMesh.count 显示前缀，无需逐个对象切换可见性。
+
+Author: Algorithm Alliance - Visualization Pipeline
+Date: 2025-09-16
+"""
+
+import colorsys
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from 几何因子3D到2D动画可视化 import GeometricFactorAnimator
+
+MAGIC = b'UFVG'
+FORMAT_VERSION = 1
+
+# 与 WebGL高级几何因子可视化.html 中的常量保持一致
+MASS_M_POS = np.array([-4.0, 0.0, 0.0])
+MASS_m_POS = np.array([4.0, 0.0, 0.0])
+
+# 每个质量的引力场线条数（与页面浏览器端生成时的 lineCount * 0.4 一致）
+GRAVITY_LINE_COUNTS = {'M': 14, 'm': 10}
+
+# 投影平面顶点颜色：弱场为页面原有的绿色，强场渐变为橙色
+PLANE_COLOR_LOW = np.array([0.27, 1.0, 0.27])
+PLANE_COLOR_HIGH = np.array([1.0, 0.6, 0.1])
+
+# 允许写入的数据类型（浏览器端分别映射为 Float32Array / Uint32Array）
+DTYPES = {
+    'float32': np.dtype('<f4'),
+    'uint32': np.dtype('<u4'),
+}
+
+
+def sphere_geometry(radius, width_segments, height_segments):
+    """生成与 THREE.SphereGeometry 顶点顺序一致的球面网格（位置、法线、索引）"""
+    u = np.arange(width_segments + 1) / width_segments
+    v = np.arange(height_segments + 1) / height_segments
+    U, V = np.meshgrid(u, v)
+
+    normals = np.empty(U.shape + (3,), dtype=np.float64)
+    normals[..., 0] = -np.cos(U * 2 * np.pi) * np.sin(V * np.pi)
+    normals[..., 1] = np.cos(V * np.pi)
+    normals[..., 2] = np.sin(U * 2 * np.pi) * np.sin(V * np.pi)
+    positions = radius * normals
+
+    # 每个网格单元两个三角形，按 three.js 的顺序交错排列，极点处退化的三角形被省略
+    grid = np.arange((width_segments + 1) * (height_segments + 1)).reshape(height_segments + 1, -1)
+    a = grid[:-1, 1:]
+    b = grid[:-1, :-1]
+    c = grid[1:, :-1]
+    d = grid[1:, 1:]
+    triangles = np.stack([np.stack([a, b, d], axis=-1), np.stack([b, c, d], axis=-1)], axis=2)
+    keep = np.ones(triangles.shape[:3], dtype=bool)
+    keep[0, :, 0] = False
+    keep[-1, :, 1] = False
+    index = triangles[keep]
+
+    return positions.reshape(-1, 3), normals.reshape(-1, 3), index.reshape(-1)
+
+
+def plane_field(width, height, width_segments, height_segments, sources, r_offset=0.1):
+    """在 THREE.PlaneGeometry 的顶点上计算多质量 1/r² 总场强"""
+    x = np.linspace(-width / 2, width / 2, width_segments + 1)
+    y = np.linspace(height / 2, -height / 2, height_segments + 1)
+    X, Y = np.meshgrid(x, y)
+
+    total = np.zeros_like(X)
+    for (sx, sy), strength in sources:
+        r = np.sqrt((X - sx) ** 2 + (Y - sy) ** 2) + r_offset
+        total += strength / r ** 2
+    return total.reshape(-1)
+
+
+def fibonacci_directions(n):
+    """球面上近似均匀分布的 n 个单位方向（斐波那契格点）"""
+    k = np.arange(n) + 0.5
+    z = 1 - 2 * k / n
+    azimuth = np.pi * (1 + np.sqrt(5)) * k
+    rho = np.sqrt(1 - z ** 2)
+    return np.stack([rho * np.cos(azimuth), rho * np.sin(azimuth), z], axis=-1)
+
+
+def sort_by_theta(directions):
+    """按极角 θ = arccos(z) 升序排列方向，返回 (方向, θ)"""
+    theta = np.arccos(np.clip(directions[:, 2], -1.0, 1.0))
+    order = np.argsort(theta, kind='stable')
+    return directions[order], theta[order]
+
+
+def radial_segments(center, directions, r_start, r_end):
+    """沿各方向从半径 r_start 到 r_end 的线段，每行（起点 xyz、终点 xyz）"""
+    return np.hstack([center + r_start * directions, center + r_end * directions])
+
+
+def interaction_segments(line_count=12, samples=40):
+    """z=0 平面上两个发散场的相互作用线（与页面 createPlaneInteractionLines 的曲线一致，波动相位取 0）"""
+    angle = (np.arange(line_count) / line_count * 2 * np.pi)[:, None]
+    t = np.arange(samples + 1) / samples
+    radius = 0.5 + t * 2.5
+    x_M = MASS_M_POS[0] + radius * np.cos(angle + t * 0.5)
+    y_M = MASS_M_POS[1] + radius * np.sin(angle + t * 0.5)
+    x_m = MASS_m_POS[0] - radius * np.cos(angle + t * 0.5)
+    y_m = MASS_m_POS[1] - radius * np.sin(angle + t * 0.5)
+    wave = 0.2 * np.sin(t * np.pi * 3)
+    points = np.stack([(x_M + x_m) / 2, (y_M + y_m) / 2 + wave, np.zeros_like(x_M)], axis=-1)
+    return np.concatenate([points[:, :-1], points[:, 1:]], axis=-1).reshape(-1, 6)
+
+
+def build_scene_geometry():
+    """汇总 WebGL 场景所需的全部预计算几何"""
+    arrays = {}
+
+    # 质量M、m的同心场球壳（与页面 createSphericalField 的半径和分段数一致）
+    shells = [('M', MASS_M_POS, 0.9, 6, 64, 32), ('m', MASS_m_POS, 0.7, 4, 48, 24)]
+    for label, center, step, count, w, h in shells:
+        for i in range(1, count + 1):
+            positions, normals, index = sphere_geometry(i * step, w, h)
+            arrays[f'field_shell_{label}_{i}_position'] = positions
+            arrays[f'field_shell_{label}_{i}_normal'] = normals
+            arrays[f'field_shell_{label}_{i}_index'] = index
+
+    positions, normals, index = sphere_geometry(1.5, 32, 16)
+    arrays['interaction_sphere_position'] = positions
+    arrays['interaction_sphere_normal'] = normals
+    arrays['interaction_sphere_index'] = index
+
+    # 发散矢量场：复用 GeometricFactorAnimator 的均匀球面方向（去掉极点处重复的方向），
+    # 每行一条线段（起点 xyz、终点 xyz），半径范围与页面的空间运动场线一致，页面直接作为 LineSegments 顶点；
+    # 箭头（每行位置 xyz、朝向 xyz）位于线段 80% 处指向外侧
+    animator = GeometricFactorAnimator()
+    vectors = animator.create_vector_field(n_vectors=12, radius_scale=1.0)
+    directions, theta = sort_by_theta(np.unique(np.round(vectors[:, 3:], 12), axis=0))
+    for label, center, max_radius in (('M', MASS_M_POS, 5.0), ('m', MASS_m_POS, 3.5)):
+        arrays[f'field_vectors_{label}'] = radial_segments(center, directions, 0.3, 0.3 + max_radius)
+        arrays[f'field_vectors_{label}_theta'] = theta
+        arrays[f'field_arrows_{label}'] = np.hstack([center + (0.3 + 0.8 * max_radius) * directions, directions])
+
+    # 引力场 A⃗ = -Gk(Δn/Δs)(r⃗/r)：从外向质量中心收敛（半径 maxRadius → 0.15 maxRadius），
+    # 箭头位于 60% 处指向中心
+    for label, center, max_radius in (('M', MASS_M_POS, 4.0), ('m', MASS_m_POS, 3.0)):
+        directions, theta = sort_by_theta(fibonacci_directions(GRAVITY_LINE_COUNTS[label]))
+        arrays[f'gravity_lines_{label}'] = radial_segments(center, directions, max_radius, 0.15 * max_radius)
+        arrays[f'gravity_lines_{label}_theta'] = theta
+        arrays[f'gravity_arrows_{label}'] = np.hstack([center + 0.49 * max_radius * directions, -directions])
+
+    arrays['interaction_lines'] = interaction_segments()
+
+    # 立体角元素：质量M周围 16×16 的 (θ, φ) 网格上的小圆锥（位置 xyz、朝向 xyz），颜色按 φ 取色相
+    grid = 16
+    theta, phi = np.meshgrid(np.arange(grid) / grid * np.pi, np.arange(grid) / grid * 2 * np.pi, indexing='ij')
+    theta, phi = theta.reshape(-1), phi.reshape(-1)
+    directions = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1)
+    arrays['solid_angle_elements'] = np.hstack([MASS_M_POS + 1.5 * directions, directions])
+    arrays['solid_angle_elements_theta'] = theta
+    arrays['solid_angle_elements_color'] = np.array([colorsys.hls_to_rgb(h, 0.6, 0.8) for h in phi / (2 * np.pi)])
+
+    # 投影平面上的总场强（页面中 PlaneGeometry(16, 12, 32, 24)，旋转后局部 y 对应世界 z）
+    field = plane_field(16, 12, 32, 24, [((MASS_M_POS[0], MASS_M_POS[2]), 3.0),
+                                         ((MASS_m_POS[0], MASS_m_POS[2]), 1.5)])
+    strength = np.sqrt(field / field.max())[:, None]
+    arrays['projection_plane_field'] = field
+    arrays['projection_plane_color'] = (1 - strength) * PLANE_COLOR_LOW + strength * PLANE_COLOR_HIGH
+
+    return arrays
+
+
+def write_geometry_bundle(arrays, bin_path):
+    """把数组字典写成单个 .bin 缓冲区，并在旁边写一份 JSON 清单"""
+    bin_path = Path(bin_path)
+    prepared = {}
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        dtype = 'uint32' if np.issubdtype(array.dtype, np.integer) else 'float32'
+        prepared[name] = (dtype, np.ascontiguousarray(array, dtype=DTYPES[dtype]))
+
+    def build_manifest(header_length):
+        offset = 8 + header_length
+        entries = {}
+        for name, (dtype, data) in prepared.items():
+            entries[name] = {
+                'dtype': dtype,
+                'offset': offset,
+                'count': int(data.size),
+                'shape': list(data.shape),
+            }
+            offset += data.nbytes
+        return {
+            'version': FORMAT_VERSION,
+            'byteOrder': 'little',
+            'buffer': bin_path.name,
+            'byteLength': offset,
+            'arrays': entries,
+        }
+
+    # 清单长度会影响偏移量，迭代到长度稳定为止
+    header_length = 0
+    while True:
+        header = json.dumps(build_manifest(header_length), ensure_ascii=False).encode('utf-8')
+        padded_length = (len(header) + 3) // 4 * 4
+        if padded_length == header_length:
+            break
+        header_length = padded_length
+    manifest = build_manifest(header_length)
+    header = header.ljust(header_length, b' ')
+
+    bin_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(bin_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', header_length))
+        f.write(header)
+        for dtype, data in prepared.values():
+            f.write(data.tobytes())
+
+    with open(bin_path.with_suffix('.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    return manifest
+
+
+def read_geometry_bundle(bin_path):
+    """读取 .bin 缓冲区，返回 (清单, 数组字典)，数组为只读内存映射视图"""
+    raw = np.memmap(bin_path, dtype=np.uint8, mode='r')
+    if raw[:4].tobytes() != MAGIC:
+        raise ValueError(f"不是几何缓冲区文件: {bin_path}")
+    header_length = struct.unpack('<I', raw[4:8].tobytes())[0]
+    manifest = json.loads(raw[8:8 + header_length].tobytes().decode('utf-8'))
+
+    arrays = {}
+    for name, info in manifest['arrays'].items():
+        dtype = DTYPES[info['dtype']]
+        start = info['offset']
+        data = raw[start:start + info['count'] * dtype.itemsize].view(dtype)
+        arrays[name] = data.reshape(info['shape'])
+    return manifest, arrays
+
+
+def main():
+    """主函数"""
+    print("📦 正在导出预计算场景几何...")
+    arrays = build_scene_geometry()
+    output = Path(__file__).with_name('scene_geometry.bin')
+    manifest = write_geometry_bundle(arrays, output)
+
+    print(f"✅ 已写入: {output.name} ({manifest['byteLength'] / 1024:.1f} KB, {len(arrays)} 个数组)")
+    print(f"✅ 清单: {output.with_suffix('.json').name}")
+
+    _, loaded = read_geometry_bundle(output)
+    for name, array in arrays.items():
+        assert np.allclose(loaded[name], array, atol=1e-5), name
+    print("✅ 回读校验通过")
+
+
+if __name__ == "__main__":
+    main()
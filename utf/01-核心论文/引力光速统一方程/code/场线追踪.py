@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量自适应 RK45 场线追踪器
+Batched Adaptive RK45 Field-Line Tracer
+
+从一组种子点出发，沿真实的多质量引力场方向积分场线（以弧长为参数，dx/ds = ĝ(x)）。
+所有种子点同时推进：每个 Dormand-Prince 5(4) 级只调用一次
+引力场计算核心.evaluate_field，各条线的步长按各自的误差估计独立调整。
+
+终止条件：
+    - 进入某个质量的捕获半径（汇 / 源）
+    - 离开边界盒
+    - 场强过小（驻点）
+    - 达到最大弧长或最大步数
+
+结果以单个参差数组返回：所有点顺序拼接在 points 中，第 i 条线为
+points[offsets[i]:offsets[i + 1]]。
+
+Author: Algorithm Alliance - Field Computation Core
+Date: 2025-09-16
+"""
+
+import time
+
+import numpy as np
+
+from 引力场计算核心 import evaluate_field
+
+# 终止原因
+STATUS_MAX_STEPS = 0
+STATUS_SINK = 1
+STATUS_SOURCE = 2
+STATUS_BOUNDS = 3
+STATUS_STAGNATION = 4
+STATUS_MAX_LENGTH = 5
+
+# Dormand-Prince 5(4) 系数
+DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+DP_B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+DP_B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+DP_E = DP_B5 - DP_B4
+
+
+def trace_field_lines(masses, positions, seeds, direction=1, G=1.0, softening=0.0, r_offset=0.0,
+                      bounds=None, capture_radius=0.1, max_length=50.0, max_steps=2000,
+                      initial_step=0.05, max_step=0.5, rtol=1e-6, atol=1e-6, min_field=1e-12):
+    """
+    同时追踪多条场线
+
+    参数:
+        masses, positions: 场源质量 (N,) 与位置 (N, D)
+        seeds:     (L, D) 种子点
+        direction: +1 沿场方向（引力场指向质量），-1 逆场方向
+        bounds:    (lower, upper) 边界盒，None 表示不限
+        capture_radius: 质量的捕获半径，标量或 (N,) 数组
+        max_length / max_steps: 单条线的最大弧长 / 最大步数
+        initial_step / max_step: 初始步长与步长上限（弧长单位）
+        rtol / atol: 自适应步长的相对 / 绝对容差
+        min_field: 场强低于此值视为驻点
+
+    返回:
+        dict:
+            'points':   (P, D) 所有线的点顺序拼接
+            'offsets':  (L + 1,) 第 i 条线为 points[offsets[i]:offsets[i + 1]]
+            'status':   (L,) 终止原因（STATUS_* 常量）
+            'captured': (L,) 捕获该线的质量编号，未被捕获为 -1
+            'lengths':  (L,) 弧长
+    """
+    masses = np.asarray(masses, dtype=np.float64).reshape(-1)
+    positions = np.asarray(positions, dtype=np.float64).reshape(len(masses), -1)
+    seeds = np.array(seeds, dtype=np.float64).reshape(-1, positions.shape[1])
+    n_lines, dim = seeds.shape
+    capture = np.broadcast_to(np.asarray(capture_radius, dtype=np.float64), masses.shape)
+    if bounds is not None:
+        lower = np.asarray(bounds[0], dtype=np.float64)
+        upper = np.asarray(bounds[1], dtype=np.float64)
+
+    def field_direction(points):
+        """单位场方向及场强"""
+        g = evaluate_field(masses, positions, points, G=G, softening=softening, r_offset=r_offset,
+                           potential=False, intensity=False)['vectors']
+        norm = np.sqrt(np.einsum('ij,ij->i', g, g))
+        safe = np.where(norm > min_field, norm, 1.0)
+        return direction * g / safe[:, None], norm
+
+    def nearest_source(points):
+        """到最近质量的距离（扣除捕获半径）及其编号"""
+        distance = np.sqrt(((points[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2)) - capture
+        nearest = np.argmin(distance, axis=1)
+        return distance[np.arange(len(points)), nearest], nearest
+
+    def step_reach(gap, nearest):
+        """
+        接近质量时的步长上限：最后一步可以越过捕获球面、落到捕获半径的一半处，
+        不会把步长逐次减半地逼近球面；捕获半径为 0 时只走剩余距离的一半，避免落在奇点上
+        """
+        radius = capture[nearest]
+        return np.maximum(np.where(radius > 0, gap + 0.5 * radius, 0.5 * gap), 1e-9)
+
+    status = np.full(n_lines, STATUS_MAX_STEPS)
+    captured = np.full(n_lines, -1)
+    lengths = np.zeros(n_lines)
+    record_line = [np.arange(n_lines)]
+    record_points = [seeds.copy()]
+
+    # 活动线的状态
+    active = np.arange(n_lines)
+    y = seeds.copy()
+    h = np.full(n_lines, float(initial_step))
+    steps = np.zeros(n_lines, dtype=np.int64)
+    k = np.empty((7, n_lines, dim))
+    k[0], norm = field_direction(y)
+
+    # 种子点本身已落在捕获半径内或场强为零
+    gap, nearest = nearest_source(y)
+    done = np.zeros(n_lines, dtype=bool)
+    status[gap <= 0] = np.where(direction * masses[nearest[gap <= 0]] > 0, STATUS_SINK, STATUS_SOURCE)
+    captured[gap <= 0] = nearest[gap <= 0]
+    done |= gap <= 0
+    status[~done & (norm <= min_field)] = STATUS_STAGNATION
+    done |= norm <= min_field
+    reach = step_reach(gap, nearest)
+
+    while True:
+        keep = ~done
+        if not keep.all():
+            active, y, h, steps, reach = active[keep], y[keep], h[keep], steps[keep], reach[keep]
+            k = k[:, keep]
+        if not len(active):
+            break
+
+        # 步长上限：不超过剩余弧长，且接近质量时不越过捕获球内部、不落在奇点上
+        h = np.minimum(h, max_step)
+        h = np.minimum(h, max_length - lengths[active])
+        h = np.minimum(h, reach)
+
+        for stage in range(1, 7):
+            increment = np.tensordot(DP_A[stage], k[:stage], axes=1)
+            k[stage], norm = field_direction(y + h[:, None] * increment)
+        y_new = y + h[:, None] * np.tensordot(DP_B5, k, axes=1)
+        error = h[:, None] * np.tensordot(DP_E, k, axes=1)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error_norm = np.sqrt(np.mean((error / scale) ** 2, axis=1))
+
+        accept = error_norm <= 1.0
+        factor = np.clip(0.9 * np.where(error_norm > 0, error_norm, 1e-10) ** -0.2, 0.2, 5.0)
+
+        if accept.any():
+            lines = active[accept]
+            y[accept] = y_new[accept]
+            lengths[lines] += h[accept]
+            steps[accept] += 1
+            k[0, accept] = k[6, accept]  # FSAL：末级即下一步的首级
+            record_line.append(lines)
+            record_points.append(y_new[accept])
+
+            # 终止判断（末级恰好在新位置上求值，场强可直接复用）
+            gap_new, nearest = nearest_source(y[accept])
+            reach[accept] = step_reach(gap_new, nearest)
+            finished = np.zeros(len(lines), dtype=bool)
+
+            hit = gap_new <= 0
+            status[lines[hit]] = np.where(direction * masses[nearest[hit]] > 0, STATUS_SINK, STATUS_SOURCE)
+            captured[lines[hit]] = nearest[hit]
+            finished |= hit
+
+            if bounds is not None:
+                outside = ~finished & ((y[accept] < lower) | (y[accept] > upper)).any(axis=1)
+                status[lines[outside]] = STATUS_BOUNDS
+                finished |= outside
+
+            stagnant = ~finished & (norm[accept] <= min_field)
+            status[lines[stagnant]] = STATUS_STAGNATION
+            finished |= stagnant
+
+            too_long = ~finished & (lengths[lines] >= max_length * (1 - 1e-12))
+            status[lines[too_long]] = STATUS_MAX_LENGTH
+            finished |= too_long
+
+            finished |= steps[accept] >= max_steps
+            done = np.zeros(len(active), dtype=bool)
+            done[np.flatnonzero(accept)[finished]] = True
+        else:
+            done = np.zeros(len(active), dtype=bool)
+
+        h = h * factor
+
+    # 按线号稳定排序，得到连续存放的参差数组
+    line_index = np.concatenate(record_line)
+    order = np.argsort(line_index, kind='stable')
+    counts = np.bincount(line_index, minlength=n_lines)
+    return {
+        'points': np.concatenate(record_points)[order],
+        'offsets': np.concatenate(([0], np.cumsum(counts))),
+        'status': status,
+        'captured': captured,
+        'lengths': lengths,
+    }
+
+
+def split_lines(result):
+    """把参差数组拆成每条线一个 (n_i, D) 数组的列表"""
+    return np.split(result['points'], result['offsets'][1:-1])
+
+
+def fibonacci_sphere(n_points, radius=1.0, center=(0.0, 0.0, 0.0)):
+    """球面上近似均匀分布的确定性种子点"""
+    i = np.arange(n_points) + 0.5
+    polar = np.arccos(1 - 2 * i / n_points)
+    azimuth = np.pi * (1 + 5**0.5) * i
+    unit = np.stack([np.sin(polar) * np.cos(azimuth),
+                     np.sin(polar) * np.sin(azimuth),
+                     np.cos(polar)], axis=1)
+    return np.asarray(center, dtype=np.float64) + radius * unit
+
+
+def benchmark(n_sources=36, n_seeds=200, seed=42):
+    """基准测试：n_sources 个质量，n_seeds 条场线"""
+    rng = np.random.default_rng(seed)
+    masses = rng.uniform(0.5, 2.0, n_sources)
+    positions = rng.uniform(-5, 5, (n_sources, 3))
+    seeds = fibonacci_sphere(n_seeds, radius=7.0)
+
+    start = time.perf_counter()
+    result = trace_field_lines(masses, positions, seeds, capture_radius=0.2,
+                               bounds=((-8, -8, -8), (8, 8, 8)), rtol=1e-5, atol=1e-5)
+    elapsed = time.perf_counter() - start
+    return {
+        'sources': n_sources,
+        'lines': n_seeds,
+        'points': len(result['points']),
+        'seconds': elapsed,
+        'result': result,
+    }
+
+
+def main():
+    """主函数：径向场校验 + 基准测试"""
+    print("🧲 批量 RK45 场线追踪器")
+    print("=" * 50)
+
+    # 单质量的场线应为指向质量的径向直线
+    seeds = fibonacci_sphere(50, radius=4.0)
+    result = trace_field_lines([1.0], [[0.0, 0.0, 0.0]], seeds, capture_radius=0.2)
+    deviation = 0.0
+    for line, start in zip(split_lines(result), seeds):
+        radial = start / np.linalg.norm(start)
+        offsets = line - np.outer(line @ radial, radial)
+        deviation = max(deviation, np.abs(offsets).max())
+    sinks = np.count_nonzero(result['status'] == STATUS_SINK)
+    print(f"✅ 单质量径向场: {sinks}/50 条线终止于质量，最大横向偏差 {deviation:.1e}")
+
+    stats = benchmark()
+    status = stats['result']['status']
+    print(f"⚡ {stats['sources']} 个质量 × {stats['lines']} 条场线: {stats['seconds'] * 1000:.1f} ms, "
+          f"{stats['points']} 个点（汇 {np.count_nonzero(status == STATUS_SINK)}，"
+          f"出界 {np.count_nonzero(status == STATUS_BOUNDS)}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Barnes-Hut 树算法引力场计算
+Barnes-Hut Tree Gravity Field Evaluation
+
+数千到数十万个质量（星系状分布）时，逐对直接求和 O(N·M) 不可行。
+本模块用纯 NumPy 向量化实现四叉树 / 八叉树 Barnes-Hut 算法：
+
+1. 建树：质量按 Morton（Z 序）编码排序，逐层用 np.add.reduceat 得到每个节点的
+   总质量和质心，节点的子节点在下一层中连续存放；
+2. 遍历：网格点同样按 Morton 序排序并切成紧凑小块，以 (网格块, 节点) 对为单位
+   逐层展开，满足开角判据 size / (d - R_block) < θ 的节点作为单极子远场，
+   不满足的叶节点展开为其中的质量做近场直接求和；
+3. 求值：每个网格块的相互作用列表补齐成等长后用批量矩阵乘法求和，
+   与 引力场计算核心.evaluate_field 使用同样的核函数和返回格式。
+
+Author: Algorithm Alliance - Field Computation Core
+Date: 2025-09-16
+"""
+
+import time
+
+import numpy as np
+
+from 引力场计算核心 import evaluate_field, _as_points
+
+# Morton 编码每维的位数（三维 21 位、二维 31 位可放进 uint64）
+MORTON_BITS = {2: 31, 3: 21}
+
+# 网格点按 Morton 序排序时每维使用的位数
+TARGET_MORTON_BITS = 10
+
+# 每批求值的“网格点 × 相互作用”对上限
+DEFAULT_MAX_PAIRS = 1 << 16
+
+
+def morton_keys(points, lower, size, bits):
+    """把 (P, D) 点量化到 2^bits 的格子上，并按位交织成 Morton 编码"""
+    dim = points.shape[1]
+    scale = (1 << bits) / size
+    cells = np.clip(((points - lower) * scale).astype(np.int64), 0, (1 << bits) - 1).astype(np.uint64)
+    keys = np.zeros(len(points), dtype=np.uint64)
+    for bit in range(bits):
+        for d in range(dim):
+            keys |= ((cells[:, d] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(bit * dim + d)
+    return keys
+
+
+def _expand_ranges(owner, starts, counts):
+    """把每个 (owner, [start, start+count)) 展开成逐元素的 (owner, index) 对"""
+    total = int(counts.sum())
+    owner = np.repeat(owner, counts)
+    first = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return owner, first + np.arange(total, dtype=starts.dtype)
+
+
+def morton_blocks(keys, bits, dim, block_size):
+    """
+    把已排序的 Morton 编码切成空间上紧凑的块：每块是某一层的一个格子，
+    且点数不超过 block_size。返回各块在排序数组中的 (起点, 点数)
+    """
+    n = len(keys)
+    block_start, block_count = [], []
+    open_start = np.array([0])
+    open_count = np.array([n])
+    for level in range(1, bits + 1):
+        if not len(open_start):
+            break
+        prefix = keys >> np.uint64(dim * (bits - level))
+        boundary = np.zeros(n + 1, dtype=bool)
+        boundary[[0, n]] = True
+        boundary[1:n] = prefix[1:] != prefix[:-1]
+        # 只在仍然过大的区段内部切分
+        inside = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(inside, open_start, 1)
+        np.add.at(inside, open_start + open_count, -1)
+        inside = np.cumsum(inside)[:-1].astype(bool)
+        cuts = np.flatnonzero(boundary[:-1] & inside)
+        cuts = np.union1d(cuts, open_start)
+        ends = np.append(cuts[1:], n)
+        # 区段末端不能越过所属的 open 区段
+        owner = np.searchsorted(open_start, cuts, side='right') - 1
+        ends = np.minimum(ends, open_start[owner] + open_count[owner])
+        counts = ends - cuts
+        small = counts <= block_size
+        block_start.append(cuts[small])
+        block_count.append(counts[small])
+        open_start, open_count = cuts[~small], counts[~small]
+
+    # 到最细一层仍过大的区段（重复点）按 block_size 直接切分
+    if len(open_start):
+        pieces = -(-open_count // block_size)
+        owner, piece = _expand_ranges(np.arange(len(open_start)), np.zeros_like(pieces), pieces)
+        start = open_start[owner] + piece * block_size
+        block_start.append(start)
+        block_count.append(np.minimum(block_size, open_start[owner] + open_count[owner] - start))
+
+    block_start = np.concatenate(block_start)
+    order = np.argsort(block_start)
+    return block_start[order], np.concatenate(block_count)[order]
+
+
+class BarnesHutTree:
+    """Barnes-Hut 四叉树 / 八叉树（按 Morton 编码逐层构建）"""
+
+    def __init__(self, masses, positions, leaf_size=16, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        masses = np.asarray(masses, dtype=self.dtype).reshape(-1)
+        positions = np.asarray(positions, dtype=self.dtype).reshape(len(masses), -1)
+        self.dim = positions.shape[1]
+        if self.dim not in MORTON_BITS:
+            raise ValueError(f"只支持二维或三维质量分布，当前维数为 {self.dim}")
+        self.leaf_size = leaf_size
+        self.max_depth = MORTON_BITS[self.dim]
+
+        # 包围立方体（略微外扩，保证最大坐标落在最后一个格子内）
+        lower = positions.min(axis=0)
+        upper = positions.max(axis=0)
+        self.size = float(max((upper - lower).max(), 1e-12)) * (1 + 1e-9)
+        self.lower = lower
+
+        keys = morton_keys(positions, lower, self.size, self.max_depth)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.masses = masses[order]
+        self.positions = positions[order]
+        self.order = order
+
+        self._build()
+
+    def _build(self):
+        """逐层建树：每层的节点是排序后 Morton 前缀相同的连续区段"""
+        n = len(self.masses)
+        weighted = self.masses[:, None] * self.positions
+
+        level_starts = []
+        level = 0
+        while True:
+            shift = np.uint64(self.dim * (self.max_depth - level))
+            prefix = self.keys >> shift
+            starts = np.concatenate(([0], np.flatnonzero(prefix[1:] != prefix[:-1]) + 1))
+            level_starts.append(starts)
+            counts = np.diff(np.append(starts, n))
+            if counts.max() <= self.leaf_size or level == self.max_depth:
+                break
+            level += 1
+
+        node_start, node_count, node_level, child_start, child_count = [], [], [], [], []
+        base = 0
+        for level, starts in enumerate(level_starts):
+            counts = np.diff(np.append(starts, n))
+            ends = starts + counts
+            node_start.append(starts)
+            node_count.append(counts)
+            node_level.append(np.full(len(starts), level))
+
+            next_base = base + len(starts)
+            if level + 1 < len(level_starts):
+                below = level_starts[level + 1]
+                first = np.searchsorted(below, starts)
+                last = np.searchsorted(below, ends)
+                is_leaf = counts <= self.leaf_size
+                child_start.append(next_base + first)
+                child_count.append(np.where(is_leaf, 0, last - first))
+            else:
+                child_start.append(np.zeros(len(starts), dtype=np.int64))
+                child_count.append(np.zeros(len(starts), dtype=np.int64))
+            base = next_base
+
+        self.node_start = np.concatenate(node_start)
+        self.node_count = np.concatenate(node_count)
+        self.child_start = np.concatenate(child_start)
+        self.child_count = np.concatenate(child_count)
+        self.node_size = self.size / 2.0 ** np.concatenate(node_level)
+
+        # 节点总质量与质心（全零质量节点退化为几何平均位置）
+        self.node_mass = np.concatenate([np.add.reduceat(self.masses, s) for s in level_starts])
+        moment = np.concatenate([np.add.reduceat(weighted, s, axis=0) for s in level_starts])
+        centroid = np.concatenate([np.add.reduceat(self.positions, s, axis=0) for s in level_starts])
+        centroid /= self.node_count[:, None]
+        nonzero = self.node_mass != 0
+        self.node_com = np.where(nonzero[:, None],
+                                 moment / np.where(nonzero, self.node_mass, 1)[:, None],
+                                 centroid).astype(self.dtype)
+        self.depth = len(level_starts)
+
+        # 相互作用列表的统一索引表：前 n 项为质量本身，之后为各节点的单极子
+        self._table_positions = np.concatenate([self.positions, self.node_com])
+        self._table_masses = np.concatenate([self.masses, self.node_mass.astype(self.dtype)])
+
+    @property
+    def n_nodes(self):
+        return len(self.node_count)
+
+    def _interaction_lists(self, centers, radii, theta):
+        """对一组网格块遍历树，返回按块排序的相互作用列表 (块号, 表索引)"""
+        n_blocks = len(centers)
+        blk = np.arange(n_blocks, dtype=np.int64)
+        node = np.zeros(n_blocks, dtype=np.int64)
+        n_sources = len(self.masses)
+
+        found_blk, found_idx = [], []
+        while len(blk):
+            dist = np.sqrt(((self.node_com[node] - centers[blk]) ** 2).sum(axis=1)) - radii[blk]
+            accept = (dist > 0) & (self.node_size[node] < theta * dist)
+            leaf = ~accept & (self.child_count[node] == 0)
+            split = ~accept & ~leaf
+
+            # 远场：节点单极子
+            found_blk.append(blk[accept])
+            found_idx.append(n_sources + node[accept])
+
+            # 近场：叶节点展开为其中的质量
+            near_blk, near_src = _expand_ranges(blk[leaf], self.node_start[node[leaf]],
+                                                self.node_count[node[leaf]])
+            found_blk.append(near_blk)
+            found_idx.append(near_src)
+
+            # 其余节点打开，换成子节点继续判断
+            blk, node = _expand_ranges(blk[split], self.child_start[node[split]],
+                                       self.child_count[node[split]])
+
+        blk = np.concatenate(found_blk)
+        idx = np.concatenate(found_idx)
+        order = np.argsort(blk, kind='stable')
+        return np.bincount(blk, minlength=n_blocks), idx[order]
+
+    def evaluate(self, grid, theta=0.5, G=1.0, softening=0.0, r_offset=0.0,
+                 block_size=64, blocks_per_pass=4096, max_pairs=DEFAULT_MAX_PAIRS,
+                 potential=True, vectors=True, intensity=True):
+        """
+        用 Barnes-Hut 近似计算网格上的势、场矢量和场强
+
+        参数:
+            grid:       (..., D) 点阵，或 meshgrid 得到的坐标数组元组
+            theta:      开角参数，越小越精确（θ → 0 退化为直接求和）
+            block_size: 每个网格块的最大点数，同一块共享一张相互作用列表
+            blocks_per_pass: 每轮遍历的网格块数，用于限制相互作用列表的内存
+            其余参数与 引力场计算核心.evaluate_field 相同
+
+        返回:
+            与 evaluate_field 相同格式的 dict
+        """
+        dtype = self.dtype
+        points, shape = _as_points(grid, dtype)
+        n_points, dim = points.shape
+        if dim != self.dim:
+            raise ValueError(f"网格维数 {dim} 与质量分布维数 {self.dim} 不一致")
+
+        # 网格点按 Morton 序排序，切成空间上紧凑的块
+        lower = points.min(axis=0)
+        extent = float(max((points.max(axis=0) - lower).max(), 1e-12)) * (1 + 1e-9)
+        keys = morton_keys(points, lower, extent, TARGET_MORTON_BITS)
+        target_order = np.argsort(keys, kind='stable')
+        points = points[target_order]
+        block_start, block_count = morton_blocks(keys[target_order], TARGET_MORTON_BITS, dim, block_size)
+        n_blocks = len(block_start)
+
+        # 每块补齐到 block_size 个点（补齐项重复块内第一个点，结果丢弃）
+        slot = np.arange(block_size)
+        block_valid = slot < block_count[:, None]
+        block_index = block_start[:, None] + np.where(block_valid, slot, 0)
+        targets = points[block_index]                                  # (块, B, D)
+        block_lower = targets.min(axis=1)
+        block_upper = targets.max(axis=1)
+        centers = (block_lower + block_upper) / 2
+        radii = np.sqrt(((block_upper - block_lower) ** 2).sum(axis=1)) / 2
+
+        G = dtype.type(G)
+        eps2 = dtype.type(softening * softening)
+        offset = dtype.type(r_offset)
+        table_positions = self._table_positions
+        table_masses = self._table_masses
+
+        out_potential = np.zeros((n_blocks, block_size), dtype=dtype)
+        out_vectors = np.zeros((n_blocks, block_size, dim), dtype=dtype)
+        out_intensity = np.zeros((n_blocks, block_size), dtype=dtype)
+
+        for first_block in range(0, n_blocks, blocks_per_pass):
+            blocks = np.arange(first_block, min(first_block + blocks_per_pass, n_blocks))
+            counts, indices = self._interaction_lists(centers[blocks], radii[blocks], theta)
+            offsets = np.cumsum(counts) - counts
+
+            # 列表长度相近的块放在同一批，补齐的开销最小
+            by_length = np.argsort(counts, kind='stable')
+            position = 0
+            while position < len(by_length):
+                longest = max(1, int(counts[by_length[position]]))
+                batch = max(1, max_pairs // (block_size * longest))
+                group = by_length[position:position + batch]
+                position += len(group)
+                longest = max(1, int(counts[group].max()))
+                rows = blocks[group]
+                width = int(block_count[rows].max())
+
+                # 补齐成 (块, 列表长度) 的索引矩阵，补齐项质量为零
+                slot = np.arange(longest)
+                valid = slot < counts[group][:, None]
+                gather = np.where(valid, offsets[group][:, None] + slot, 0)
+                table_index = indices[gather] if len(indices) else np.zeros_like(gather)
+                source_pos = table_positions[table_index]                       # (b, K, D)
+                source_mass = np.where(valid, table_masses[table_index], 0)     # (b, K, 1)
+                source_mass = source_mass[:, :, None]
+                block_points = targets[rows, :width]                            # (b, W, D)
+
+                r2 = np.empty((len(group), width, longest), dtype=dtype)
+                delta = np.empty_like(r2)
+                np.subtract(block_points[:, :, 0, None], source_pos[:, None, :, 0], out=r2)
+                np.square(r2, out=r2)
+                for d in range(1, dim):
+                    np.subtract(block_points[:, :, d, None], source_pos[:, None, :, d], out=delta)
+                    np.square(delta, out=delta)
+                    r2 += delta
+                if eps2:
+                    r2 += eps2
+                rho = np.sqrt(r2, out=r2)
+                if offset:
+                    rho += offset
+                with np.errstate(divide='ignore'):
+                    inv = np.divide(1, rho, out=rho)
+                inv[~np.isfinite(inv)] = 0
+
+                if potential:
+                    out_potential[rows, :width] = -G * np.matmul(inv, source_mass)[..., 0]
+                np.square(inv, out=delta)  # 1/ρ²
+                if intensity:
+                    out_intensity[rows, :width] = G * np.matmul(delta, source_mass)[..., 0]
+                if vectors:
+                    delta *= inv  # 1/ρ³
+                    out_vectors[rows, :width] = G * (np.matmul(delta, source_mass * source_pos)
+                                                     - block_points * np.matmul(delta, source_mass))
+
+        # 去掉补齐项，恢复原始网格顺序
+        restore = np.empty(n_points, dtype=np.int64)
+        restore[target_order] = np.arange(n_points)
+        field = {}
+        if potential:
+            field['potential'] = out_potential[block_valid][restore].reshape(shape)
+        if vectors:
+            result_vectors = out_vectors[block_valid][restore]
+            field['vectors'] = result_vectors.reshape(shape + (dim,))
+            field['components'] = tuple(result_vectors[:, d].reshape(shape) for d in range(dim))
+            field['magnitude'] = np.sqrt(np.einsum('ij,ij->i', result_vectors, result_vectors)).reshape(shape)
+        if intensity:
+            field['intensity'] = out_intensity[block_valid][restore].reshape(shape)
+        return field
+
+
+def evaluate_field_barnes_hut(masses, positions, grid, theta=0.5, leaf_size=16,
+                              dtype=np.float64, **kwargs):
+    """一次性建树并求值，参数与 evaluate_field 相同，另加开角 theta 和叶节点容量"""
+    tree = BarnesHutTree(masses, positions, leaf_size=leaf_size, dtype=dtype)
+    return tree.evaluate(grid, theta=theta, **kwargs)
+
+
+def galaxy_distribution(n_sources, dim=3, seed=42):
+    """生成星系状质量分布：指数盘 + 核球，质量总和为 1"""
+    rng = np.random.default_rng(seed)
+    n_bulge = n_sources // 5
+    n_disk = n_sources - n_bulge
+
+    radius = rng.gamma(2.0, 1.0, n_disk)
+    angle = rng.uniform(0, 2 * np.pi, n_disk)
+    disk = np.stack([radius * np.cos(angle), radius * np.sin(angle),
+                     rng.normal(0, 0.1, n_disk)], axis=1)
+    bulge = rng.normal(0, 0.5, (n_bulge, 3))
+
+    positions = np.concatenate([disk, bulge])[:, :dim]
+    masses = rng.uniform(0.5, 1.5, n_sources)
+    return masses / masses.sum(), positions
+
+
+def verify_against_direct_sum(n_sources=20000, n_check=4000, theta=0.5, dim=3, seed=0):
+    """与直接求和对比，返回场矢量和势的相对误差（中位数 / 最大值）"""
+    masses, positions = galaxy_distribution(n_sources, dim=dim, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    targets = rng.uniform(-8, 8, (n_check, dim))
+
+    kwargs = dict(softening=0.05, potential=True, vectors=True, intensity=False)
+    tree_field = evaluate_field_barnes_hut(masses, positions, targets, theta=theta, **kwargs)
+    direct_field = evaluate_field(masses, positions, targets, **kwargs)
+
+    vector_error = (np.linalg.norm(tree_field['vectors'] - direct_field['vectors'], axis=1)
+                    / direct_field['magnitude'])
+    potential_error = np.abs(tree_field['potential'] / direct_field['potential'] - 1)
+    return {
+        'vector_median': float(np.median(vector_error)),
+        'vector_max': float(vector_error.max()),
+        'potential_median': float(np.median(potential_error)),
+        'potential_max': float(potential_error.max()),
+    }
+
+
+def benchmark(n_sources=10**5, n_grid=10**6, theta=0.5, dtype=np.float64, seed=42):
+    """基准测试：n_sources 个星系状分布的质量 × n_grid 个三维网格点"""
+    masses, positions = galaxy_distribution(n_sources, seed=seed)
+    side = round(n_grid ** (1 / 3))
+    axis = np.linspace(-8, 8, side)
+    grid = np.meshgrid(axis, axis, axis, indexing='ij')
+
+    start = time.perf_counter()
+    tree = BarnesHutTree(masses, positions, dtype=dtype)
+    built = time.perf_counter()
+    field = tree.evaluate(grid, theta=theta, softening=0.05, potential=False, intensity=False)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'sources': n_sources,
+        'grid_points': side**3,
+        'nodes': tree.n_nodes,
+        'depth': tree.depth,
+        'build_seconds': built - start,
+        'seconds': elapsed,
+        'field': field,
+    }
+
+
+def main():
+    """主函数：精度校验 + 基准测试"""
+    print("🌳 Barnes-Hut 树算法引力场")
+    print("=" * 50)
+
+    for dim in (2, 3):
+        for theta in (0.3, 0.5, 0.8):
+            errors = verify_against_direct_sum(theta=theta, dim=dim)
+            print(f"✅ {dim}D θ={theta}: 场矢量相对误差 中位数 {errors['vector_median']:.1e} / "
+                  f"最大 {errors['vector_max']:.1e}，势 中位数 {errors['potential_median']:.1e}")
+
+    stats = benchmark()
+    print(f"⚡ {stats['sources']:,} 质量 × {stats['grid_points']:,} 网格点: "
+          f"建树 {stats['build_seconds']:.2f} s（{stats['nodes']:,} 节点，{stats['depth']} 层），"
+          f"总计 {stats['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
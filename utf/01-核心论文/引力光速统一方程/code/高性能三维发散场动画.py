@@ -24,6 +24,8 @@ import matplotlib.gridspec as gridspec
 from functools import lru_cache
 import gc
 
+from 引力场计算核心 import evaluate_field
+
 # 性能优化设置
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -110,13 +112,12 @@ class HighPerformanceSpaceFieldAnimator:
         y = np.linspace(-4, 4, 40)
         X, Y = np.meshgrid(x, y)
         
-        # M的场强
-        r_M = np.sqrt((X - self.mass_M_pos[0])**2 + Y**2) + 0.1
-        field_M = 3.0 / r_M**2
-        
-        # m的场强
-        r_m = np.sqrt((X - self.mass_m_pos[0])**2 + Y**2) + 0.1
-        field_m = 1.5 / r_m**2
+        # M、m 各自的 1/r² 场强（质量位于 y=0 的投影平面上）
+        field_M, field_m = (
+            evaluate_field([mass], [(pos[0], 0.0)], (X, Y), r_offset=0.1,
+                           potential=False, vectors=False)['intensity']
+            for mass, pos in ((3.0, self.mass_M_pos), (1.5, self.mass_m_pos))
+        )
         
         self._field_data = {
             'X': X, 'Y': Y,
@@ -15,31 +15,61 @@ from pathlib import Path
 from typing import Dict, List, Any
 import subprocess
 
+from 公式存储 import get_store
+from 并行生成 import format_report, generate_parallel
+from 模板引擎 import compile_template
+from 第三方库 import VENDOR_DIR, VendoredLibraries
+from 公式预渲染 import LatexPrerenderer
+from 资源包 import AssetBundle
+from 输出优化 import OutputOptimizer, format_size_report
+from 高级HTML模板 import (ADVANCED_ENGINE_SCRIPT, ADVANCED_STYLE, FIELD_VERTEX_SHADER,
+                        get_advanced_html_template, get_shader_template)
+
+
+def _script_json(value) -> str:
+    """页面内联脚本里的 JSON 字面量（转义 </，避免提前结束 <script>）"""
+    return json.dumps(value, ensure_ascii=False).replace('</', '<\\/')
+
+
 class UnifiedFieldVisualizationEngine:
     """统一场论可视化引擎"""
     
-    def __init__(self):
-        self.base_path = Path("utf/统一场论核心公式")
+    def __init__(self, base_path=None, optimize=False, vendor=False, prerender=True):
+        self.base_path = Path(base_path) if base_path else Path(__file__).parent
+        # optimize=True 时压缩页面，并写出 .gz / .br 预压缩文件
+        self.optimizer = OutputOptimizer() if optimize else None
+        # 所有页面共用的样式和场景引擎只写一份（assets/ufv-advanced.<hash>.css/js）
+        self.assets = AssetBundle("ufv-advanced", self.optimizer, css=ADVANCED_STYLE, js=ADVANCED_ENGINE_SCRIPT)
+        # vendor=True（或本地库目录）时第三方库从 assets/ 加载，页面不访问 CDN
+        self.vendor = VendoredLibraries(VENDOR_DIR if vendor is True else vendor, self.optimizer) if vendor else None
+        # prerender=True 时公式在构建时预渲染为内联 SVG，页面不再加载 MathJax
+        self.prerenderer = LatexPrerenderer(enabled=prerender)
         self.templates = self._load_templates()
         self.standards = self._load_standards()
         self.formulas_db = self._load_formulas_database()
         
     def _load_formulas_database(self) -> Dict[str, Any]:
-        """加载公式数据库"""
+        """加载公式数据库（共享的公式存储，公式按依赖顺序排列）"""
         try:
-            with open(self.base_path / "公式规格数据库.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            self.store = get_store()
         except FileNotFoundError:
             return {"formulas": []}
+        return {"formulas": self.store.formulas(), "visualization_templates": self.store.templates}
     
     def _load_templates(self) -> Dict[str, str]:
         """加载最先进的可视化模板"""
         return {
-            "webgl_advanced": self._get_webgl_template(),
-            "threejs_physics": self._get_threejs_template(),
             "shader_effects": self._get_shader_template()
         }
     
+    def _get_advanced_html_template(self) -> str:
+        """获取最先进的HTML5页面模板"""
+        return get_advanced_html_template()
+    
+    def _get_shader_template(self) -> str:
+        """获取着色器模板（场矢量箭头的顶点着色器，FIELD_FUNCTION 插槽为公式的 GLSL 函数）"""
+        return FIELD_VERTEX_SHADER
+    
     def _load_standards(self) -> Dict[str, Any]:
         """加载规范标准"""
         return {
@@ -62,73 +92,53 @@ class UnifiedFieldVisualizationEngine:
             }
         }
     
-    def generate_all_visualizations(self):
-        """全自动生成所有公式的可视化"""
+    def generate_all_visualizations(self, workers=None):
+        """全自动生成所有公式的可视化（HTML 页面由进程池并行渲染、原子写入），返回耗时报告"""
         print("🚀 启动全自动可视化生成系统...")
         print(f"📊 准备生成 {len(self.formulas_db['formulas'])} 个公式的可视化")
         
-        for i, formula in enumerate(self.formulas_db['formulas'], 1):
-            print(f"\n🔧 生成第 {i}/{len(self.formulas_db['formulas'])} 个: {formula['name']}")
-            self._generate_single_visualization(formula)
-        
-        # 生成主索引页面
-        self._generate_master_index()
-        
-        # 生成导航系统
-        self._generate_navigation_system()
+        self.assets.write(self.base_path / "assets")
+        if self.vendor is not None:
+            self.vendor.write(self.base_path / "assets")
+        report = generate_parallel(self, self.formulas_db['formulas'], workers)
+        print(format_report(report))
+        if self.optimizer is not None:
+            print(format_size_report(report['formulas']))
         
         print("\n🎉 全自动生成完成！")
+        return report
     
-    def _generate_single_visualization(self, formula: Dict[str, Any]):
-        """生成单个公式的完整可视化"""
-        folder_name = f"{formula['id']}-{formula['name']}"
-        folder_path = self.base_path / folder_name
-        
-        # 创建文件夹结构
-        self._create_folder_structure(folder_path)
-        
-        # 生成高级HTML5可视化
-        html_content = self._generate_advanced_html(formula)
-        with open(folder_path / "visualization.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        # 生成配套文档
-        self._generate_documentation(folder_path, formula)
-        
-        # 生成示例和资源
-        self._generate_assets(folder_path, formula)
-        
-        print(f"   ✅ {formula['name']} 可视化生成完成")
-    
-    def _create_folder_structure(self, folder_path: Path):
-        """创建标准文件夹结构"""
-        folder_path.mkdir(parents=True, exist_ok=True)
-        (folder_path / "assets").mkdir(exist_ok=True)
-        (folder_path / "examples").mkdir(exist_ok=True)
-        (folder_path / "docs").mkdir(exist_ok=True)
-        (folder_path / "tests").mkdir(exist_ok=True)
+    def render_formula_files(self, formula: Dict[str, Any]) -> Dict[str, str]:
+        """渲染单个公式文件夹的页面（只计算内容，不写文件）"""
+        return {"visualization.html": self._generate_advanced_html(formula)}
     
     def _generate_advanced_html(self, formula: Dict[str, Any]) -> str:
-        """生成最先进的HTML5可视化"""
-        template = self._get_advanced_html_template()
-        
-        # 替换模板变量
-        replacements = {
-            "{{FORMULA_NAME}}": formula['name'],
-            "{{FORMULA_ICON}}": formula['icon'],
-            "{{FORMULA_LATEX}}": formula['formula_latex'],
-            "{{FORMULA_DESCRIPTION}}": formula['description'],
-            "{{VISUALIZATION_TYPE}}": formula['visualization_type'],
-            "{{PARAMETERS_JSON}}": json.dumps(formula['parameters'], indent=2),
-            "{{PHYSICS_CONCEPTS}}": json.dumps(formula['physics_concepts']),
-            "{{CATEGORY}}": formula['category']
-        }
-        
-        html_content = template
-        for placeholder, value in replacements.items():
-            html_content = html_content.replace(placeholder, str(value))
+        """生成最先进的HTML5可视化（模板只编译一次，之后按插槽拼接；样式和场景引擎引用共享资源）"""
+        template = compile_template(self._get_advanced_html_template())
+        page_dir = self.base_path / f"{formula['id']}-{formula['name']}"
+        asset_dir = self.base_path / "assets"
+        formula_math, math_scripts = self.prerenderer.display(formula['formula_latex'])
         
-        return html_content
+        # 填充模板插槽
+        html = template.render(
+            STYLESHEET=self.assets.url('css', asset_dir, page_dir),
+            ENGINE_SCRIPT=self.assets.url('js', asset_dir, page_dir),
+            FORMULA_NAME=formula['name'],
+            FORMULA_NAME_JSON=_script_json(formula['name']),
+            FORMULA_ICON=formula['icon'],
+            FORMULA_LATEX_JSON=_script_json(formula['formula_latex']),
+            FORMULA_MATH=formula_math,
+            MATH_SCRIPTS=math_scripts,
+            FORMULA_DESCRIPTION=formula['description'],
+            VISUALIZATION_TYPE_JSON=_script_json(formula['visualization_type']),
+            PARAMETERS_JSON=json.dumps(formula['parameters'], indent=2),
+            FIELD_SHADER=get_shader_template(formula['id']),
+            PHYSICS_CONCEPTS=json.dumps(formula['physics_concepts']),
+            CATEGORY=formula['category']
+        )
+        if self.vendor is None:
+            return html
+        return self.vendor.rewrite(html, asset_dir, page_dir)
 
 def main():
     """主函数"""
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式内核编译器
+Symbolic-to-NumPy Formula Kernel Compiler
+
+把公式规格数据库中每个公式的 symbolic 定义编译成向量化的 NumPy 函数：
+    - sympy 解析表达式，lambdify(cse=True) 消除公共子表达式
+    - 生成的源代码按定义的哈希缓存到 __pycache__/formula_kernels/，
+      再次启动时直接 exec 缓存源码，不需要导入 sympy、也不重新解析
+    - vector3 参数展开为 name_x / name_y / name_z 三个标量参数
+    - 输出值按字符串参数的选项分支（如公式18的 wave_type），每个选项编译为一个内核
+    - 任意公式都可以在数据库声明的参数范围内批量求值
+    - 同一定义也可以生成 GLSL 函数（generate_glsl），在着色器中逐顶点求值，参数作为 uniform
+
+symbolic 字段格式:
+    "symbolic": {
+        "inputs":  [额外的自变量，格式同 parameters],
+        "outputs": {"输出名": "sympy 表达式" 或 {"选项": "表达式", ...}}
+    }
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DATABASE_PATH = Path(__file__).with_name('公式规格数据库.json')
+CACHE_DIR = Path(__file__).with_name('__pycache__') / 'formula_kernels'
+
+# 生成代码的格式变化时递增，使旧缓存失效
+COMPILER_VERSION = 1
+
+KERNEL_NAME = '_lambdifygenerated'
+
+VECTOR_AXES = ('x', 'y', 'z')
+
+# GLSL 函数中 uniform 名称的前缀（避免参数名与 GLSL 保留字冲突）
+UNIFORM_PREFIX = 'u_'
+
+# 整数幂不超过该值时展开为乘法（GLSL 的 pow 在底数为负时未定义）
+GLSL_INLINE_POWER = 4
+
+
+def load_database(database_path: Path = DATABASE_PATH) -> Dict[str, Any]:
+    """读取公式规格数据库"""
+    with open(database_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def expand_parameters(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """把参数声明展开为标量参数列表（vector3 拆成三个分量，字符串参数跳过）"""
+    scalars = []
+    for entry in entries:
+        if entry['type'] == 'vector3':
+            for axis, default in zip(VECTOR_AXES, entry['default']):
+                scalars.append({'name': f"{entry['name']}_{axis}", 'vector': entry['name'],
+                                'integer': False, 'default': default, 'range': entry['range']})
+        elif entry['type'] in ('float', 'integer'):
+            scalars.append({'name': entry['name'], 'vector': None,
+                            'integer': entry['type'] == 'integer',
+                            'default': entry['default'], 'range': entry['range']})
+    return scalars
+
+
+def formula_variants(formula: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, str]]]:
+    """
+    按字符串参数的选项拆分输出表达式
+
+    返回:
+        (选择参数或 None, {选项: {输出名: 表达式}})，无分支时选项为 None
+    """
+    outputs = formula['symbolic']['outputs']
+    if not any(isinstance(expr, dict) for expr in outputs.values()):
+        return None, {None: outputs}
+    selector = next(entry for entry in formula['parameters'] if entry['type'] == 'string')
+    variants = {}
+    for option in selector['options']:
+        variants[option] = {name: expr[option] if isinstance(expr, dict) else expr
+                            for name, expr in outputs.items()}
+    return selector, variants
+
+
+def spec_hash(formula_id: str, arguments: List[str], outputs: Dict[str, str]) -> str:
+    """内核定义的哈希（参数顺序 + 输出表达式 + 编译器版本）"""
+    spec = {'compiler': COMPILER_VERSION, 'id': formula_id, 'arguments': arguments, 'outputs': outputs}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def generate_source(arguments: List[str], outputs: Dict[str, str]) -> str:
+    """用 sympy 解析表达式并生成带公共子表达式消除的 NumPy 源代码"""
+    import inspect
+
+    import sympy
+    from sympy.parsing.sympy_parser import parse_expr
+
+    # 显式的符号表，避免 E、C、G、N、S 等名字被解析成 sympy 的内置对象
+    symbols = {name: sympy.Symbol(name) for name in arguments}
+    local_dict = dict(symbols, pi=sympy.pi)
+    expressions = [parse_expr(expr, local_dict=local_dict) for expr in outputs.values()]
+    unknown = set().union(*(expr.free_symbols for expr in expressions)) - set(symbols.values())
+    if unknown:
+        raise ValueError(f"表达式中有未声明的符号: {sorted(map(str, unknown))}")
+
+    kernel = sympy.lambdify([symbols[name] for name in arguments], expressions,
+                            modules='numpy', cse=True)
+    return inspect.getsource(kernel)
+
+
+def glsl_uniforms(parameters: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """参数声明对应的 uniform 列表：[(uniform 名, GLSL 类型)]，vector3 为一个 vec3"""
+    uniforms = []
+    for entry in parameters:
+        if entry['type'] == 'vector3':
+            uniforms.append((UNIFORM_PREFIX + entry['name'], 'vec3'))
+        elif entry['type'] in ('float', 'integer'):
+            uniforms.append((UNIFORM_PREFIX + entry['name'], 'float'))
+    return uniforms
+
+
+def _glsl_printer():
+    """GLSL ES 代码打印器：数字一律写成浮点字面量，小整数幂展开为乘法"""
+    from sympy.core.numbers import equal_valued
+    from sympy.printing.glsl import GLSLPrinter
+
+    class FormulaGLSLPrinter(GLSLPrinter):
+        def _print_Integer(self, expr):
+            return f"{int(expr)}.0"
+
+        def _print_Pow(self, expr):
+            exponent = expr.exp
+            if exponent.is_Integer and 1 < abs(int(exponent)) <= GLSL_INLINE_POWER:
+                base = self.parenthesize(expr.base, 100)
+                product = '*'.join([base] * abs(int(exponent)))
+                return product if exponent > 0 else f"1.0/({product})"
+            if equal_valued(exponent, -0.5):
+                return f"inversesqrt({self._print(expr.base)})"
+            return super()._print_Pow(expr)
+
+    return FormulaGLSLPrinter()
+
+
+def generate_glsl(parameters: List[Dict[str, Any]], inputs: List[Dict[str, Any]], outputs: Dict[str, str],
+                  function: str = 'fieldAt') -> str:
+    """
+    生成求值公式的 GLSL 函数（含 uniform 声明）
+
+    三个自变量映射为 vec3 p 的 x / y / z 分量；参数映射为 u_ 前缀的 uniform
+    （vector3 参数为 vec3）。三个输出时函数返回 vec3，一个输出时返回 float。
+    """
+    import sympy
+    from sympy.parsing.sympy_parser import parse_expr
+
+    if len(inputs) != len(VECTOR_AXES):
+        raise ValueError(f"GLSL 函数需要 3 个自变量（位置），实际为 {[entry['name'] for entry in inputs]}")
+    if len(outputs) not in (1, 3):
+        raise ValueError(f"GLSL 函数只支持 1 个或 3 个输出，实际为 {list(outputs)}")
+
+    symbols = {entry['name']: sympy.Symbol(f"p.{axis}") for entry, axis in zip(inputs, VECTOR_AXES)}
+    for argument in expand_parameters(parameters):
+        if argument['vector']:
+            axis = argument['name'][len(argument['vector']) + 1:]
+            symbols[argument['name']] = sympy.Symbol(f"{UNIFORM_PREFIX}{argument['vector']}.{axis}")
+        else:
+            symbols[argument['name']] = sympy.Symbol(UNIFORM_PREFIX + argument['name'])
+    local_dict = dict(symbols, pi=sympy.pi)
+    expressions = [parse_expr(expr, local_dict=local_dict) for expr in outputs.values()]
+    unknown = set().union(*(expr.free_symbols for expr in expressions)) - set(symbols.values())
+    if unknown:
+        raise ValueError(f"表达式中有未声明的符号: {sorted(map(str, unknown))}")
+
+    expressions = [expr.subs(sympy.pi, sympy.Float(sympy.pi, 9)) for expr in expressions]
+    replacements, reduced = sympy.cse(expressions, symbols=sympy.numbered_symbols('t'))
+    printer = _glsl_printer()
+
+    result_type = 'vec3' if len(outputs) == 3 else 'float'
+    lines = [f"uniform {glsl_type} {name};" for name, glsl_type in glsl_uniforms(parameters)]
+    lines.append('')
+    lines.append(f"{result_type} {function}(vec3 p) {{")
+    for symbol, value in replacements:
+        lines.append(f"    float {symbol} = {printer.doprint(value)};")
+    values = ', '.join(printer.doprint(expr) for expr in reduced)
+    lines.append(f"    return {result_type}({values});" if len(outputs) == 3 else f"    return {values};")
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def load_kernel(source: str):
+    """在 NumPy 命名空间中执行生成的源代码，返回内核函数（不需要 sympy）"""
+    namespace = dict(vars(np))
+    exec(compile(source, KERNEL_NAME, 'exec'), namespace)
+    return namespace[KERNEL_NAME]
+
+
+class CompiledFormula:
+    """编译后的公式内核"""
+
+    def __init__(self, formula: Dict[str, Any], variant: Optional[str], arguments: List[Dict[str, Any]],
+                 outputs: Dict[str, str], source: str, cached: bool):
+        self.id = formula['id']
+        self.name = formula['name']
+        self.variant = variant
+        self.arguments = arguments
+        self.outputs = list(outputs)
+        self.expressions = outputs
+        self.source = source
+        self.cached = cached
+        self.kernel = load_kernel(source)
+        self._vectors = {}
+        for argument in arguments:
+            if argument['vector']:
+                self._vectors.setdefault(argument['vector'], []).append(argument['name'])
+
+    def __repr__(self):
+        variant = f"[{self.variant}]" if self.variant else ''
+        return f"CompiledFormula({self.id}{variant}: {', '.join(self.outputs)})"
+
+    def defaults(self) -> Dict[str, float]:
+        """各标量参数的默认值"""
+        return {argument['name']: argument['default'] for argument in self.arguments}
+
+    def ranges(self) -> Dict[str, List[float]]:
+        """各标量参数在数据库中声明的范围"""
+        return {argument['name']: argument['range'] for argument in self.arguments}
+
+    def __call__(self, **values) -> Dict[str, np.ndarray]:
+        """
+        求值：参数可以是标量或可广播的数组，未给出的参数取默认值；
+        vector3 参数既可以按分量传 C_x=...，也可以整体传 C=(..., 3) 数组
+
+        返回:
+            {输出名: 数组}，所有输出广播到同一形状
+        """
+        for vector, components in self._vectors.items():
+            if vector in values:
+                stacked = np.asarray(values.pop(vector), dtype=np.float64)
+                for i, component in enumerate(components):
+                    values.setdefault(component, stacked[..., i])
+        unknown = set(values) - {argument['name'] for argument in self.arguments}
+        if unknown:
+            raise TypeError(f"公式{self.id}没有参数: {sorted(unknown)}")
+
+        inputs = [np.asarray(values.get(argument['name'], argument['default']), dtype=np.float64)
+                  for argument in self.arguments]
+        results = self.kernel(*inputs)
+        shape = np.broadcast_shapes(*(np.shape(value) for value in inputs + list(results)))
+        return {name: np.broadcast_to(np.asarray(result, dtype=np.float64), shape)
+                for name, result in zip(self.outputs, results)}
+
+    def sample_ranges(self, n: int, seed: int = 42) -> Dict[str, np.ndarray]:
+        """在声明的参数范围内均匀抽样 n 组参数（整数参数取整）"""
+        rng = np.random.default_rng(seed)
+        samples = {}
+        for argument in self.arguments:
+            low, high = argument['range']
+            if argument['integer']:
+                samples[argument['name']] = rng.integers(low, high, n, endpoint=True).astype(np.float64)
+            else:
+                samples[argument['name']] = rng.uniform(low, high, n)
+        return samples
+
+    def evaluate_over_ranges(self, n: int, seed: int = 42) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """在声明的参数范围内批量求值，返回 (参数样本, 输出)"""
+        samples = self.sample_ranges(n, seed)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return samples, self(**samples)
+
+
+class FormulaKernelCompiler:
+    """公式内核编译器：按需编译并缓存所有公式"""
+
+    def __init__(self, database_path: Path = DATABASE_PATH, cache_dir: Path = CACHE_DIR):
+        self.database_path = Path(database_path)
+        self.cache_dir = Path(cache_dir)
+        self.formulas = {formula['id']: formula for formula in load_database(self.database_path)['formulas']}
+        self._compiled: Dict[Tuple[str, Optional[str]], CompiledFormula] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def variants(self, formula_id: str) -> List[Optional[str]]:
+        """公式的所有分支选项（无分支时为 [None]）"""
+        return list(formula_variants(self.formulas[formula_id])[1])
+
+    def compile(self, formula_id: str, variant: Optional[str] = None) -> CompiledFormula:
+        """编译单个公式（variant 为 None 时取选择参数的默认值）"""
+        formula = self.formulas[formula_id]
+        if 'symbolic' not in formula:
+            raise ValueError(f"公式{formula_id}没有 symbolic 定义")
+        selector, variants = formula_variants(formula)
+        if selector is not None and variant is None:
+            variant = selector['default']
+        if variant not in variants:
+            raise ValueError(f"公式{formula_id}没有分支 {variant}，可选 {list(variants)}")
+
+        key = (formula_id, variant)
+        if key not in self._compiled:
+            outputs = variants[variant]
+            arguments = expand_parameters(formula['parameters'] + formula['symbolic'].get('inputs', []))
+            names = [argument['name'] for argument in arguments]
+            source, cached = self._cached_source(formula_id, variant, names, outputs, '.py',
+                                                 lambda: generate_source(names, outputs))
+            self._compiled[key] = CompiledFormula(formula, variant, arguments, outputs, source, cached)
+        return self._compiled[key]
+
+    def glsl(self, formula_id: str, variant: Optional[str] = None, function: str = 'fieldAt') -> str:
+        """公式的 GLSL 函数源代码（uniform 声明 + 函数，按定义的哈希缓存在磁盘上）"""
+        formula = self.formulas[formula_id]
+        if 'symbolic' not in formula:
+            raise ValueError(f"公式{formula_id}没有 symbolic 定义")
+        selector, variants = formula_variants(formula)
+        if selector is not None and variant is None:
+            variant = selector['default']
+        if variant not in variants:
+            raise ValueError(f"公式{formula_id}没有分支 {variant}，可选 {list(variants)}")
+
+        parameters = formula['parameters']
+        inputs = formula['symbolic'].get('inputs', [])
+        names = [argument['name'] for argument in expand_parameters(parameters + inputs)] + [function]
+        source, _ = self._cached_source(
+            formula_id, variant, names, variants[variant], '.glsl',
+            lambda: generate_glsl(parameters, inputs, variants[variant], function))
+        return source
+
+    def compile_all(self) -> Dict[Tuple[str, Optional[str]], CompiledFormula]:
+        """编译全部公式的全部分支"""
+        for formula_id, formula in self.formulas.items():
+            if 'symbolic' in formula:
+                for variant in self.variants(formula_id):
+                    self.compile(formula_id, variant)
+        return dict(self._compiled)
+
+    def _cached_source(self, formula_id: str, variant: Optional[str], arguments: List[str],
+                       outputs: Dict[str, str], suffix: str, generate: Callable[[], str]) -> Tuple[str, bool]:
+        """从磁盘缓存读取生成的源代码（NumPy 内核或 GLSL），未命中时生成并写入缓存"""
+        prefix = formula_id if variant is None else f"{formula_id}-{variant}"
+        digest = spec_hash(formula_id, arguments, outputs)[:16]
+        path = self.cache_dir / f"{prefix}.{digest}{suffix}"
+        if path.exists():
+            self.cache_hits += 1
+            return path.read_text(encoding='utf-8'), True
+
+        self.cache_misses += 1
+        source = generate()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"{prefix}.*{suffix}"):
+            stale.unlink()
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(source, encoding='utf-8')
+        os.replace(temporary, path)
+        return source, False
+
+
+def main():
+    """主函数：编译全部公式，校验并测试批量求值"""
+    print("🧮 公式内核编译器")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    compiler = FormulaKernelCompiler()
+    kernels = compiler.compile_all()
+    elapsed = time.perf_counter() - start
+    print(f"✅ 编译 {len(kernels)} 个内核: {elapsed * 1000:.1f} ms"
+          f"（缓存命中 {compiler.cache_hits}，未命中 {compiler.cache_misses}）")
+
+    # 与已有的手写实现对照
+    from 螺旋时空轨迹 import helix_batch
+    helix = compiler.compile('02')
+    t = np.linspace(0, 20, 200)
+    result = helix(r=3.0, omega=1.5, h=0.5, t=t)
+    expected = helix_batch(3.0, 1.5, 0.5, t)[0]
+    error = np.max(np.abs(np.stack([result['r_x'], result['r_y'], result['r_z']], axis=1) - expected))
+    print(f"✅ 公式02 与 helix_batch 的最大误差 {error:.1e}")
+
+    mass = compiler.compile('16')(v=0.0)['m']
+    gravity = compiler.compile('04')(G=1.0, mass=2.0, x=[1.0, 2.0], y=0.0, z=0.0)['A_x']
+    print(f"✅ 公式16 静止质量 m(v=0) = {float(mass):.3f}，公式04 平方反比 A(1)/A(2) = {gravity[0] / gravity[1]:.3f}")
+
+    n = 1_000_000
+    start = time.perf_counter()
+    for kernel in kernels.values():
+        kernel.evaluate_over_ranges(n)
+    elapsed = time.perf_counter() - start
+    print(f"⚡ {len(kernels)} 个内核 × {n:,} 组参数批量求值: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
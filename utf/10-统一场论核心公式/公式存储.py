@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式存储与依赖图查询
+Indexed In-Memory Formula Store
+
+公式规格数据库只解析一次，之后所有生成器共享同一个存储：
+    - 按编号、分类、物理概念、数学概念、可视化类型建立字典索引，查询为 O(1)
+    - dependencies 字段构成有向无环图，Kahn 算法给出拓扑顺序（同层按编号排序），
+      生成器按依赖顺序遍历公式
+    - 支持直接依赖 / 被依赖、传递闭包（全部前置公式 / 全部后续公式）查询
+    - 解析、校验后的存储连同索引一起 pickle 为快照（__pycache__/ 下），
+      数据库的 mtime 和大小不变时直接加载快照；mtime 变化但内容哈希相同时也复用快照，
+      生成器启动时跳过 JSON 解析和校验
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+DATABASE_PATH = Path(__file__).with_name('公式规格数据库.json')
+
+# 快照格式变化时递增，使旧快照失效
+SNAPSHOT_VERSION = 1
+
+FORMULA_FIELDS = {
+    'id': str, 'name': str, 'formula_latex': str, 'formula_unicode': str, 'description': str,
+    'icon': str, 'category': str, 'difficulty': int, 'physics_concepts': list, 'math_concepts': list,
+    'visualization_type': str, 'parameters': list, 'dependencies': list, 'applications': list,
+}
+
+PARAMETER_TYPES = ('float', 'integer', 'vector3', 'string')
+
+# 可按字段值查询的索引：索引名 -> (字段名, 字段是否为列表)
+INDEX_FIELDS = {
+    'category': ('category', False),
+    'physics_concept': ('physics_concepts', True),
+    'math_concept': ('math_concepts', True),
+    'visualization_type': ('visualization_type', False),
+}
+
+
+def validate_database(database: Dict[str, Any]):
+    """校验数据库结构：必填字段及类型、参数声明、默认值落在范围内；有问题时一并报出"""
+    problems = []
+    for position, formula in enumerate(database.get('formulas', [])):
+        label = f"公式{formula.get('id', f'#{position}')}"
+        for field, kind in FORMULA_FIELDS.items():
+            if not isinstance(formula.get(field), kind):
+                problems.append(f"{label}: 字段 {field} 缺失或不是 {kind.__name__}")
+        for parameter in formula.get('parameters', []) + formula.get('symbolic', {}).get('inputs', []):
+            name = f"{label} 参数 {parameter.get('name')}"
+            if parameter.get('type') not in PARAMETER_TYPES:
+                problems.append(f"{name}: 未知类型 {parameter.get('type')}")
+            elif parameter['type'] == 'string':
+                if parameter.get('default') not in parameter.get('options', []):
+                    problems.append(f"{name}: 默认值不在 options 中")
+            else:
+                low, high = parameter.get('range', (None, None))
+                defaults = parameter.get('default')
+                defaults = defaults if isinstance(defaults, list) else [defaults]
+                if low is None or not all(low <= value <= high for value in defaults):
+                    problems.append(f"{name}: 默认值 {parameter.get('default')} 不在范围 {parameter.get('range')} 内")
+    if not database.get('formulas'):
+        problems.append("数据库中没有公式")
+    if problems:
+        raise ValueError("公式数据库校验失败:\n  " + "\n  ".join(problems))
+
+
+class FormulaStore:
+    """公式存储：字典索引 + 依赖图"""
+
+    def __init__(self, formulas: List[Dict[str, Any]], templates: Optional[Dict[str, Any]] = None):
+        self.templates = templates or {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        for formula in formulas:
+            if formula['id'] in self.by_id:
+                raise ValueError(f"公式编号重复: {formula['id']}")
+            self.by_id[formula['id']] = formula
+
+        self.indexes: Dict[str, Dict[str, List[str]]] = {name: defaultdict(list) for name in INDEX_FIELDS}
+        for formula in formulas:
+            for name, (field, multiple) in INDEX_FIELDS.items():
+                values = formula.get(field, []) if multiple else [formula.get(field)]
+                for value in values:
+                    if value is not None:
+                        self.indexes[name][value].append(formula['id'])
+
+        self.dependents: Dict[str, List[str]] = {formula_id: [] for formula_id in self.by_id}
+        for formula in formulas:
+            for dependency in formula.get('dependencies', []):
+                if dependency not in self.by_id:
+                    raise ValueError(f"公式{formula['id']}依赖不存在的公式{dependency}")
+                self.dependents[dependency].append(formula['id'])
+        self.order = self._topological_order()
+        self._position = {formula_id: i for i, formula_id in enumerate(self.order)}
+
+    @classmethod
+    def from_json(cls, database_path: Path = DATABASE_PATH) -> 'FormulaStore':
+        """从 JSON 数据库解析、校验并构建存储"""
+        with open(database_path, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+        validate_database(database)
+        return cls(database['formulas'], database.get('visualization_templates'))
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'FormulaStore':
+        """由快照中的状态字典恢复存储，不重新建索引"""
+        store = cls.__new__(cls)
+        store.__dict__.update(state)
+        return store
+
+    def _topological_order(self) -> List[str]:
+        """Kahn 算法拓扑排序，入度为零的公式按编号依次输出；有环时报错"""
+        in_degree = {formula_id: len(formula.get('dependencies', []))
+                     for formula_id, formula in self.by_id.items()}
+        ready = [formula_id for formula_id, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            formula_id = heapq.heappop(ready)
+            order.append(formula_id)
+            for dependent in self.dependents[formula_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+        if len(order) != len(self.by_id):
+            cycle = sorted(formula_id for formula_id, degree in in_degree.items() if degree > 0)
+            raise ValueError(f"公式依赖存在环: {cycle}")
+        return order
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, formula_id: str) -> bool:
+        return formula_id in self.by_id
+
+    def __getitem__(self, formula_id: str) -> Dict[str, Any]:
+        return self.by_id[formula_id]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """按依赖顺序遍历公式"""
+        return (self.by_id[formula_id] for formula_id in self.order)
+
+    def get(self, formula_id: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(formula_id, default)
+
+    def formulas(self) -> List[Dict[str, Any]]:
+        """按依赖顺序排列的全部公式"""
+        return list(self)
+
+    def find(self, index: str, value: str) -> List[Dict[str, Any]]:
+        """按索引查询，如 find('category', 'gravity')"""
+        return [self.by_id[formula_id] for formula_id in self.indexes[index].get(value, [])]
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        return self.find('category', category)
+
+    def by_physics_concept(self, concept: str) -> List[Dict[str, Any]]:
+        return self.find('physics_concept', concept)
+
+    def by_math_concept(self, concept: str) -> List[Dict[str, Any]]:
+        return self.find('math_concept', concept)
+
+    def by_visualization_type(self, visualization_type: str) -> List[Dict[str, Any]]:
+        return self.find('visualization_type', visualization_type)
+
+    def dependencies(self, formula_id: str) -> List[str]:
+        """直接依赖的公式编号"""
+        return list(self.by_id[formula_id].get('dependencies', []))
+
+    def ancestors(self, formula_id: str) -> List[str]:
+        """全部前置公式（传递闭包），按依赖顺序排列"""
+        return self._closure(formula_id, self.dependencies)
+
+    def descendants(self, formula_id: str) -> List[str]:
+        """全部直接或间接依赖该公式的后续公式，按依赖顺序排列"""
+        return self._closure(formula_id, lambda node: self.dependents[node])
+
+    def _closure(self, formula_id: str, neighbours) -> List[str]:
+        seen: Set[str] = set()
+        stack = list(neighbours(formula_id))
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(neighbours(node))
+        return sorted(seen, key=self._position.__getitem__)
+
+
+_STORES: Dict[Path, FormulaStore] = {}
+
+
+def snapshot_path_for(database_path: Path) -> Path:
+    """数据库对应的快照路径：同目录 __pycache__/<文件名>.pickle"""
+    return database_path.parent / '__pycache__' / f"{database_path.stem}.pickle"
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_snapshot(database_path: Path, snapshot_path: Path) -> Optional[FormulaStore]:
+    """读取快照；数据库已变化或快照不可用时返回 None"""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header = pickle.load(f)
+            stat = database_path.stat()
+            if header.get('version') != SNAPSHOT_VERSION:
+                return None
+            if (header['mtime_ns'], header['size']) != (stat.st_mtime_ns, stat.st_size):
+                # 只改了修改时间（如 touch、检出）时内容哈希仍然一致
+                if header['size'] != stat.st_size or header['sha256'] != _file_digest(database_path):
+                    return None
+                store = FormulaStore.from_state(pickle.load(f))
+                save_snapshot(store, database_path, snapshot_path, header['sha256'])
+                return store
+            return FormulaStore.from_state(pickle.load(f))
+    except Exception:
+        # 截断或损坏的 pickle 可能抛出 UnpicklingError、EOFError，也可能是 AttributeError、
+        # ValueError、TypeError、IndexError 等；任何读取失败都从 JSON 重建
+        return None
+
+
+def save_snapshot(store: FormulaStore, database_path: Path, snapshot_path: Path,
+                  digest: Optional[str] = None):
+    """
+    写出快照：先写头部（版本、mtime、大小、哈希），再写存储的状态字典
+    （只含内置容器，不依赖模块名，作为脚本运行时写出的快照也能被导入方读取）
+    """
+    stat = database_path.stat()
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest or _file_digest(database_path),
+    }
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = snapshot_path.with_suffix('.tmp')
+    with open(temporary, 'wb') as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(vars(store), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, snapshot_path)
+
+
+def get_store(database_path: Path = DATABASE_PATH, use_snapshot: bool = True) -> FormulaStore:
+    """
+    进程内共享的公式存储，每个数据库文件只解析一次
+
+    use_snapshot 为 True 时优先加载磁盘快照，数据库变化后重新解析、校验并刷新快照
+    """
+    database_path = Path(database_path).resolve()
+    if database_path not in _STORES:
+        snapshot_path = snapshot_path_for(database_path)
+        store = load_snapshot(database_path, snapshot_path) if use_snapshot else None
+        if store is None:
+            store = FormulaStore.from_json(database_path)
+            if use_snapshot:
+                try:
+                    save_snapshot(store, database_path, snapshot_path)
+                except OSError:
+                    pass
+        _STORES[database_path] = store
+    return _STORES[database_path]
+
+
+def main():
+    """主函数：索引与依赖图查询示例"""
+    print("🗂️ 公式存储与依赖图")
+    print("=" * 50)
+
+    store = get_store()
+    print(f"✅ {len(store)} 个公式，依赖顺序: {' → '.join(store.order)}")
+    print(f"✅ 引力类公式: {[formula['id'] for formula in store.by_category('gravity')]}")
+    print(f"✅ 公式17 的全部前置公式: {store.ancestors('17')}")
+    print(f"✅ 依赖公式04 的后续公式: {store.descendants('04')}")
+    for formula in store:
+        assert all(store.order.index(dependency) < store.order.index(formula['id'])
+                   for dependency in store.dependencies(formula['id']))
+    print("✅ 拓扑顺序校验通过")
+
+    # 冷启动（解析 + 校验 + 建索引）与快照加载的耗时对比
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        FormulaStore.from_json(DATABASE_PATH)
+    cold = (time.perf_counter() - start) / rounds
+    snapshot_path = snapshot_path_for(DATABASE_PATH.resolve())
+    start = time.perf_counter()
+    for _ in range(rounds):
+        snapshot = load_snapshot(DATABASE_PATH.resolve(), snapshot_path)
+    warm = (time.perf_counter() - start) / rounds
+    print(f"⚡ 解析 JSON 建存储 {cold * 1000:.2f} ms，加载快照 {warm * 1000:.2f} ms"
+          f"（快照有效: {snapshot is not None and snapshot.order == store.order}）")
+
+
+if __name__ == "__main__":
+    main()
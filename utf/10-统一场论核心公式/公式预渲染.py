@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式 LaTeX 预渲染
+Build-Time LaTeX Pre-Rendering to Inline SVG
+
+生成的页面原本在运行时加载 MathJax，只为排版一两个 formula_latex 公式，每次打开页面都要数百毫秒。
+本模块在构建时用 matplotlib mathtext（本地、无需 TeX 安装）把公式排版一次：
+    - 输出可直接内联的 <svg>：字形转为路径，颜色继承 currentColor，尺寸以 em 为单位随字号缩放
+    - 按 LaTeX 文本（及渲染器版本）的哈希缓存在 __pycache__/formula_svg/，重复构建不再排版
+    - mathtext 不支持的公式（或未安装 matplotlib、关闭预渲染）退回到 MathJax 运行时排版：
+      display() 统一给出页面的公式标记和需要加载的脚本（MATHJAX_SCRIPTS，各生成器共用）
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import hashlib
+import html
+import io
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from 并行生成 import atomic_write
+
+CACHE_DIR = Path(__file__).with_name('__pycache__') / 'formula_svg'
+
+# 改变 SVG 输出格式时递增，使缓存失效
+RENDERER_VERSION = 1
+
+# 运行时数学排版：仅在公式无法预渲染为 SVG 的页面中加载（页面模板的 MATH_SCRIPTS 插槽）
+MATHJAX_SCRIPTS = '''    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+    <script>
+        window.MathJax = {
+            tex: { inlineMath: [['$', '$'], ['\\\\(', '\\\\)']], displayMath: [['$$', '$$'], ['\\\\[', '\\\\]']] },
+            svg: { fontCache: 'global' }
+        };
+    </script>
+'''
+
+# mathtext 以 10pt 排版；页面中显示为周围文字的 1.3 倍
+FONT_SIZE = 10
+DISPLAY_SCALE = 1.3
+
+_METADATA = re.compile(r'<\?xml.*?\?>\s*|<!DOCTYPE.*?>\s*|<metadata>.*?</metadata>\s*|<!--.*?-->\s*', re.DOTALL)
+# matplotlib 写出的全局样式（* 选择器）内联到页面后会影响整页，必须删除
+_GLOBAL_STYLE = re.compile(r'<defs>\s*<style[^>]*>.*?</style>\s*</defs>\s*', re.DOTALL)
+_BACKGROUND = re.compile(r'<g id="patch_1">.*?</g>\s*', re.DOTALL)
+_SIZE = re.compile(r'(width|height)="([\d.]+)pt"')
+
+
+def render_latex_svg(latex: str) -> str:
+    """
+    把 LaTeX 公式排版为可内联的 SVG 文本
+
+    异常:
+        ImportError: 未安装 matplotlib
+        ValueError:  mathtext 无法解析该公式
+    """
+    import matplotlib
+    from matplotlib.mathtext import math_to_image
+
+    buffer = io.BytesIO()
+    # 固定 hashsalt 使元素 id 稳定，相同公式得到逐字节相同的 SVG
+    with matplotlib.rc_context({'svg.fonttype': 'path', 'svg.hashsalt': 'formula',
+                                'savefig.transparent': True, 'font.size': FONT_SIZE}):
+        math_to_image(f"${latex}$", buffer, format='svg', color='#000000')
+    svg = buffer.getvalue().decode('utf-8')
+
+    svg = _METADATA.sub('', svg)
+    svg = _GLOBAL_STYLE.sub('', svg, count=1)
+    svg = _BACKGROUND.sub('', svg, count=1)
+    svg = svg.replace('#000000', 'currentColor')
+    svg = _SIZE.sub(lambda match: f'{match.group(1)}="{float(match.group(2)) / FONT_SIZE * DISPLAY_SCALE:.3f}em"', svg)
+    return svg.replace(
+        '<svg ',
+        f'<svg class="formula-svg" role="img" aria-label="{html.escape(latex)}" fill="currentColor" '
+        f'style="vertical-align: middle" ',
+        1).strip()
+
+
+class LatexPrerenderer:
+    """带磁盘缓存的公式预渲染器（enabled=False 时所有公式都交给 MathJax）"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        try:
+            import matplotlib
+            self.version = f"{RENDERER_VERSION}/{matplotlib.__version__}" if enabled else None
+        except ImportError:
+            self.version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def cache_path(self, latex: str) -> Path:
+        digest = hashlib.sha256(f"{self.version}\n{latex}".encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.svg"
+
+    def svg(self, latex: str) -> Optional[str]:
+        """公式的内联 SVG；无法预渲染时返回 None"""
+        if self.version is None:
+            return None
+        path = self.cache_path(latex)
+        if path.exists():
+            self.cache_hits += 1
+            return path.read_text(encoding='utf-8')
+        try:
+            svg = render_latex_svg(latex)
+        except ValueError:
+            return None
+        self.cache_misses += 1
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, svg)
+        return svg
+
+    def display(self, latex: str, delimiter: str = '$$') -> Tuple[str, str]:
+        """页面中显示公式的 (标记, 数学排版脚本)：预渲染的 SVG 不需要脚本，否则为定界公式和 MATHJAX_SCRIPTS"""
+        svg = self.svg(latex)
+        if svg is not None:
+            return svg, ''
+        return f"{delimiter}{latex}{delimiter}", MATHJAX_SCRIPTS
@@ -12,141 +12,18 @@ Date: 2025-09-16
 import os
 from pathlib import Path
 
-# 17个核心公式的详细信息
+from 公式存储 import get_store
+
+# 核心公式的详细信息（取自公式规格数据库，按依赖顺序排列）
 FORMULAS = [
     {
-        "id": "01",
-        "name": "时空同一化方程",
-        "formula": r"\vec{r}(t) = \vec{C}t = x\vec{i} + y\vec{j} + z\vec{k}",
-        "description": "揭示时间与空间的统一关系，时间是空间位移的度量",
-        "icon": "🌌"
-    },
-    {
-        "id": "02", 
-        "name": "三维螺旋时空方程",
-        "formula": r"\vec{r}(t) = r\cos\omega t \cdot \vec{i} + r\sin\omega t \cdot \vec{j} + ht \cdot \vec{k}",
-        "description": "描述空间中螺旋运动的轨迹，圆周运动与直线运动的叠加",
-        "icon": "🌀"
-    },
-    {
-        "id": "03",
-        "name": "质量定义方程", 
-        "formula": r"m = k \cdot \frac{dn}{d\Omega}",
-        "description": "质量是空间位移矢量条数密度的几何化度量",
-        "icon": "⚖️"
-    },
-    {
-        "id": "04",
-        "name": "引力场定义方程",
-        "formula": r"\vec{A} = -Gk\frac{\Delta n}{\Delta s}\frac{\vec{r}}{r}",
-        "description": "引力场是空间几何属性的梯度表现",
-        "icon": "🌍"
-    },
-    {
-        "id": "05",
-        "name": "静止动量方程",
-        "formula": r"\vec{p}_0 = m_0\vec{C}_0",
-        "description": "静止状态下的动量定义",
-        "icon": "⚡"
-    },
-    {
-        "id": "06",
-        "name": "运动动量方程",
-        "formula": r"\vec{P} = m(\vec{C} - \vec{V})",
-        "description": "运动状态下的动量表达",
-        "icon": "🚀"
-    },
-    {
-        "id": "07",
-        "name": "宇宙大统一方程",
-        "formula": r"F = \frac{d\vec{P}}{dt} = \vec{C}\frac{dm}{dt} - \vec{V}\frac{dm}{dt} + m\frac{d\vec{C}}{dt} - m\frac{d\vec{V}}{dt}",
-        "description": "统一的力学方程，描述宇宙中所有力的本质",
-        "icon": "🌟"
-    },
-    {
-        "id": "08",
-        "name": "空间波动方程",
-        "formula": r"\frac{\partial^2 L}{\partial x^2} + \frac{\partial^2 L}{\partial y^2} + \frac{\partial^2 L}{\partial z^2} = \frac{1}{c^2} \frac{\partial^2 L}{\partial t^2}",
-        "description": "描述空间的波动性质",
-        "icon": "🌊"
-    },
-    {
-        "id": "09",
-        "name": "电荷定义方程",
-        "formula": r"q = k'k\frac{1}{\Omega^2}\frac{d\Omega}{dt}",
-        "description": "电荷的几何化定义",
-        "icon": "⚡"
-    },
-    {
-        "id": "10",
-        "name": "电场定义方程",
-        "formula": r"\vec{E} = -\frac{kk'}{4\pi\epsilon_0\Omega^2}\frac{d\Omega}{dt}\frac{\vec{r}}{r^3}",
-        "description": "电场的统一场论表达",
-        "icon": "🔌"
-    },
-    {
-        "id": "11",
-        "name": "磁场定义方程",
-        "formula": r"\vec{B} = \frac{\mu_0 \gamma k k'}{4 \pi \Omega^2} \frac{d \Omega}{d t} \frac{[(x-v t) \vec{i}+y \vec{j}+z \vec{k}]}{[\gamma^2(x-v t)^2+y^2+z^2]^{3/2}}",
-        "description": "磁场的统一场论表达",
-        "icon": "🧲"
-    },
-    {
-        "id": "12",
-        "name": "变化引力场产生电磁场",
-        "formula": r"\frac{\partial^2\vec{A}}{\partial t^2} = \frac{\vec{V}}{f}(\nabla \cdot \vec{E}) - \frac{C^2}{f}(\nabla \times \vec{B})",
-        "description": "引力场变化产生电磁场的机制",
-        "icon": "🔄"
-    },
-    {
-        "id": "13",
-        "name": "磁矢势方程",
-        "formula": r"\vec{\nabla} \times \vec{A} = \frac{\vec{B}}{f}",
-        "description": "磁矢势与磁场的关系",
-        "icon": "🎯"
-    },
-    {
-        "id": "14",
-        "name": "变化引力场产生电场",
-        "formula": r"\vec{E} = -f\frac{d\vec{A}}{dt}",
-        "description": "引力场变化产生电场",
-        "icon": "⚡"
-    },
-    {
-        "id": "15",
-        "name": "变化磁场产生引力场和电场",
-        "formula": r"\frac{d\vec{B}}{dt} = \frac{-\vec{A} \times \vec{E}}{c^2} - \frac{\vec{V}}{c^2} \times \frac{d\vec{E}}{dt}",
-        "description": "磁场变化产生引力场和电场",
-        "icon": "🔀"
-    },
-    {
-        "id": "16",
-        "name": "统一场论能量方程",
-        "formula": r"e = m_0 c^2 = mc^2\sqrt{1 - \frac{v^2}{c^2}}",
-        "description": "能量的统一场论表达",
-        "icon": "💫"
-    },
-    {
-        "id": "17",
-        "name": "光速飞行器动力学方程",
-        "formula": r"\vec{F} = (\vec{C} - \vec{V})\frac{dm}{dt}",
-        "description": "光速飞行器的动力学原理",
-        "icon": "🛸"
-    },
-    {
-        "id": "18",
-        "name": "空间波动通解",
-        "formula": r"L(r,t) = f(t-r/c) + g(t+r/c)",
-        "description": "空间波动方程的通解",
-        "icon": "〰️"
-    },
-    {
-        "id": "19",
-        "name": "引力光速统一方程",
-        "formula": r"Z = \frac{Gc}{2}",
-        "description": "引力常数与光速的统一关系",
-        "icon": "🌌"
+        "id": formula["id"],
+        "name": formula["name"],
+        "formula": formula["formula_latex"],
+        "description": formula["description"],
+        "icon": formula["icon"]
     }
+    for formula in get_store()
 ]
 
 def create_formula_folder(formula_info):
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式参数空间扫描器
+Parameter-Space Sweep Runner for the Formula Database
+
+在公式规格数据库声明的参数范围内构造试验设计，用编译后的公式内核批量求值：
+    - 设计: 笛卡尔网格（cartesian）、拉丁超立方（lhs）、Sobol 序列（sobol，需要 scipy）
+    - 结果按列存储：每个参数 / 输出一个 .npy 文件，外加 schema.json，
+      绘图时按需内存映射读取单列
+    - 大规模扫描按行分块，由进程池并行求值，各进程直接写入内存映射的输出列
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from 公式内核编译器 import CACHE_DIR, DATABASE_PATH, FormulaKernelCompiler
+
+DESIGNS = ('cartesian', 'lhs', 'sobol')
+
+SCHEMA_FILE = 'schema.json'
+
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+
+def cartesian_design(dimensions: int, levels: Union[int, List[int]]) -> np.ndarray:
+    """笛卡尔网格设计，返回 [0, 1] 上的 (Π levels, d) 单位样本"""
+    levels = np.broadcast_to(np.asarray(levels, dtype=np.int64), (dimensions,))
+    axes = [np.linspace(0.0, 1.0, level) if level > 1 else np.array([0.5]) for level in levels]
+    grids = np.meshgrid(*axes, indexing='ij')
+    return np.stack([grid.reshape(-1) for grid in grids], axis=1)
+
+
+def latin_hypercube_design(dimensions: int, n: int, seed: int = 42) -> np.ndarray:
+    """拉丁超立方设计：每一维的 n 个等分区间各恰好取一个样本"""
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((dimensions, n)), axis=1).T
+    return (strata + rng.random((n, dimensions))) / n
+
+
+def sobol_design(dimensions: int, n: int, seed: int = 42) -> np.ndarray:
+    """扰乱 Sobol 低差异序列（需要 scipy）"""
+    try:
+        from scipy.stats import qmc
+    except ImportError as e:
+        raise ImportError("Sobol 设计需要 scipy (pip install scipy)，也可以改用 lhs 设计") from e
+    return qmc.Sobol(dimensions, scramble=True, seed=seed).random(n)
+
+
+class ParameterSweep:
+    """单个公式的参数空间扫描"""
+
+    def __init__(self, formula_id: str, variant: Optional[str] = None,
+                 parameters: Optional[List[str]] = None, fixed: Optional[Dict[str, float]] = None,
+                 database_path: Path = DATABASE_PATH, cache_dir: Path = CACHE_DIR):
+        self.database_path = Path(database_path)
+        self.cache_dir = Path(cache_dir)
+        self.formula = FormulaKernelCompiler(self.database_path, self.cache_dir).compile(formula_id, variant)
+        self.fixed = dict(fixed or {})
+
+        # 默认扫描全部未固定的标量参数
+        arguments = {argument['name']: argument for argument in self.formula.arguments}
+        if parameters is None:
+            parameters = [name for name in arguments if name not in self.fixed]
+        unknown = set(parameters) - set(arguments)
+        if unknown:
+            raise ValueError(f"公式{formula_id}没有参数: {sorted(unknown)}")
+        self.parameters = [arguments[name] for name in parameters]
+
+    def design(self, design: str = 'lhs', n: int = 1024, levels: Union[int, List[int]] = 10,
+               seed: int = 42) -> Dict[str, np.ndarray]:
+        """
+        在声明范围内构造试验设计
+
+        参数:
+            design: 'cartesian' / 'lhs' / 'sobol'
+            n:      lhs / sobol 的样本数
+            levels: cartesian 每一维的取值个数（整数或逐维列表）
+
+        返回:
+            {参数名: (rows,) 数组}
+        """
+        dimensions = len(self.parameters)
+        if design == 'cartesian':
+            unit = cartesian_design(dimensions, levels)
+        elif design == 'lhs':
+            unit = latin_hypercube_design(dimensions, n, seed)
+        elif design == 'sobol':
+            unit = sobol_design(dimensions, n, seed)
+        else:
+            raise ValueError(f"未知设计: {design}，可选 {DESIGNS}")
+
+        samples = {}
+        for column, parameter in zip(unit.T, self.parameters):
+            low, high = parameter['range']
+            values = low + column * (high - low)
+            samples[parameter['name']] = np.round(values) if parameter['integer'] else values
+        return samples
+
+    def run(self, output_dir: str, design: str = 'lhs', n: int = 1024,
+            levels: Union[int, List[int]] = 10, seed: int = 42, workers: Optional[int] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        构造设计、批量求值并按列写入 output_dir
+
+        output_dir 必须不存在、为空，或是之前扫描的结果目录（含 schema.json，整体替换）
+
+        参数:
+            workers:    进程数，None 为 CPU 核数，1 表示在当前进程内求值
+            chunk_size: 每个任务求值的行数
+
+        返回:
+            schema 字典（同 schema.json）
+        """
+        samples = self.design(design, n, levels, seed)
+        rows = len(next(iter(samples.values())))
+        output_dir = Path(output_dir)
+        if output_dir.exists() and any(output_dir.iterdir()):
+            # 只覆盖之前扫描的结果目录，不删除调用方的其他数据
+            if not (output_dir / SCHEMA_FILE).exists():
+                raise FileExistsError(f"{output_dir} 非空且不是参数扫描结果（没有 {SCHEMA_FILE}），拒绝覆盖")
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for name, values in samples.items():
+            np.save(output_dir / f"{name}.npy", values)
+        for name in self.formula.outputs:
+            np.lib.format.open_memmap(output_dir / f"{name}.npy", mode='w+', dtype=np.float64, shape=(rows,))
+
+        chunks = [(start, min(start + chunk_size, rows)) for start in range(0, rows, chunk_size)]
+        tasks = [(str(self.database_path), str(self.cache_dir), self.formula.id, self.formula.variant,
+                  str(output_dir), list(samples), self.fixed, start, stop) for start, stop in chunks]
+
+        start_time = time.perf_counter()
+        if workers == 1 or len(chunks) == 1:
+            for task in tasks:
+                _evaluate_chunk(task)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_evaluate_chunk, tasks))
+        elapsed = time.perf_counter() - start_time
+
+        schema = {
+            'formula': self.formula.id,
+            'name': self.formula.name,
+            'variant': self.formula.variant,
+            'design': design,
+            'seed': seed,
+            'rows': rows,
+            'chunks': len(chunks),
+            'seconds': elapsed,
+            'parameters': [{'name': parameter['name'], 'range': parameter['range'],
+                            'integer': parameter['integer']} for parameter in self.parameters],
+            'fixed': self.fixed,
+            'outputs': self.formula.expressions,
+            'columns': {name: {'file': f"{name}.npy", 'dtype': 'float64'}
+                        for name in list(samples) + self.formula.outputs},
+        }
+        temporary = output_dir / f"{SCHEMA_FILE}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False, indent=2)
+        os.replace(temporary, output_dir / SCHEMA_FILE)
+        return schema
+
+
+def _evaluate_chunk(task: Tuple) -> int:
+    """进程池任务：读取一段参数行，求值后写回输出列"""
+    database_path, cache_dir, formula_id, variant, output_dir, parameters, fixed, start, stop = task
+    formula = FormulaKernelCompiler(database_path, cache_dir).compile(formula_id, variant)
+    output_dir = Path(output_dir)
+
+    values = dict(fixed)
+    for name in parameters:
+        values[name] = np.load(output_dir / f"{name}.npy", mmap_mode='r')[start:stop]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = formula(**values)
+    for name, result in results.items():
+        column = np.load(output_dir / f"{name}.npy", mmap_mode='r+')
+        column[start:stop] = result
+        column.flush()
+    return stop - start
+
+
+def load_sweep(output_dir: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """以只读内存映射方式打开扫描结果，返回 ({列名: 数组}, schema)"""
+    output_dir = Path(output_dir)
+    with open(output_dir / SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    columns = {name: np.load(output_dir / column['file'], mmap_mode='r')
+               for name, column in schema['columns'].items()}
+    return columns, schema
+
+
+def main():
+    """主函数：三种设计的扫描示例和进程池性能测试"""
+    print("📊 公式参数空间扫描器")
+    print("=" * 50)
+
+    output = Path(__file__).with_name('sweep_results')
+
+    # 公式16：m(v) 在 v→c 时发散
+    sweep = ParameterSweep('16', parameters=['v', 'c'], fixed={'m0': 1.0})
+    schema = sweep.run(output / '16', design='cartesian', levels=[50, 20], workers=1)
+    columns, _ = load_sweep(output / '16')
+    print(f"✅ 公式16 笛卡尔网格 {schema['rows']} 行: m 范围 "
+          f"[{np.nanmin(columns['m']):.3f}, {np.nanmax(columns['m']):.3f}]")
+
+    # 公式04：拉丁超立方覆盖每一维的全部等分区间
+    sweep = ParameterSweep('04')
+    sweep.run(output / '04', design='lhs', n=1000, workers=1)
+    columns, schema = load_sweep(output / '04')
+    strata = [len(np.unique(np.floor((columns[p['name']] - p['range'][0])
+                                     / (p['range'][1] - p['range'][0]) * 1000))) for p in schema['parameters']]
+    print(f"✅ 公式04 拉丁超立方: {len(strata)} 维，每维覆盖区间数 {min(strata)}/1000")
+
+    try:
+        sweep.run(output / '04-sobol', design='sobol', n=1024, workers=1)
+        print("✅ 公式04 Sobol 设计完成")
+    except ImportError as error:
+        print(f"⚠️ {error}")
+
+    # 进程池大规模扫描，与单进程结果比较
+    sweep = ParameterSweep('11')
+    timings = {}
+    for workers in (1, None):
+        start = time.perf_counter()
+        schema = sweep.run(output / f"11-{workers}", design='lhs', n=4_000_000, workers=workers)
+        timings[workers] = time.perf_counter() - start
+    serial, _ = load_sweep(output / '11-1')
+    parallel, _ = load_sweep(output / '11-None')
+    same = all(np.array_equal(serial[name], parallel[name], equal_nan=True) for name in serial)
+    print(f"⚡ 公式11 {schema['rows']:,} 行 × {len(schema['columns'])} 列: 单进程 {timings[1]:.2f} s，"
+          f"进程池（{os.cpu_count()} 核，{schema['chunks']} 块）{timings[None]:.2f} s，结果一致: {same}")
+
+    shutil.rmtree(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+场矢量实例数据
+Field-Vector Instance Buffers for GPU-Instanced Rendering
+
+引力场、电场、磁场页面原来为每条场线、每个箭头各创建一个 Mesh / Line，绘制调用数随密度线性增长。
+本模块在构建时生成页面直接使用的顶点和实例数据：
+    - 采样点：球壳（引力场、电场）或圆柱（运动电荷磁场）内的低差异序列，确定性、分布均匀
+    - 场矢量：用公式内核编译器编译的公式04 / 10 / 11 在数据库默认参数下批量求值
+    - 场线：每条径向场线只是一条线段，全部合并为一个 LineSegments 的顶点数组
+数据以小端 Float32 的 base64 字符串嵌入页面，页面解码后交给一个 InstancedMesh（一次绘制调用）。
+着色器求值的页面（shader_field_buffers）只嵌入采样点，场矢量由顶点着色器按当前参数计算。
+公式11 页面的速度扫描（magnetic_sweep_buffers）用 运动电荷磁场计算 的 γ 相关求值器在规则网格上逐个速度求场。
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import base64
+from functools import lru_cache
+from typing import Callable, Dict
+
+import numpy as np
+
+from 公式内核编译器 import FormulaKernelCompiler
+from 运动电荷磁场计算 import MovingSourceMagneticField
+
+# 每个场页面的箭头实例数；InstancedMesh 只有一次绘制调用，10⁵ 个实例仍可保持 60fps，
+# 代价是页面体积（每个实例 24 字节，base64 后约 32 字节）
+FIELD_INSTANCE_COUNT = 4096
+
+# 公式11 速度扫描：网格每边点数和速度（单位 c）。页面嵌入 速度数 × 网格点数 个矢量，
+# 12³ × 10 个速度约 270 KB（base64）；v × R 形式在 v = 0 时处处为零，因此从 0.05c 开始
+MAGNETIC_SWEEP_GRID = 12
+MAGNETIC_SWEEP_VELOCITIES = tuple(np.round(np.linspace(0.05, 0.95, 10), 2).tolist())
+
+# 黄金角与 R2 低差异序列的生成元
+GOLDEN_ANGLE = np.pi * (3.0 - np.sqrt(5.0))
+R2_ALPHA = 0.7548776662466927
+
+_compiler = None
+
+
+def get_compiler() -> FormulaKernelCompiler:
+    """进程内共享的公式内核编译器（编译结果缓存在磁盘上）"""
+    global _compiler
+    if _compiler is None:
+        _compiler = FormulaKernelCompiler()
+    return _compiler
+
+
+def encode_float32(array: np.ndarray) -> str:
+    """数组按小端 Float32 编码为 base64 字符串"""
+    return base64.b64encode(np.ascontiguousarray(array, dtype='<f4').tobytes()).decode('ascii')
+
+
+def shell_points(count: int, r_min: float, r_max: float) -> np.ndarray:
+    """球壳 r_min ≤ r ≤ r_max 内的 count 个点：斐波那契球面方向 × R2 序列半径，形状 (count, 3)"""
+    i = np.arange(count) + 0.5
+    cos_theta = 1.0 - 2.0 * i / count
+    sin_theta = np.sqrt(1.0 - cos_theta ** 2)
+    phi = GOLDEN_ANGLE * i
+    radius = r_min + (r_max - r_min) * ((i * R2_ALPHA) % 1.0)
+    return radius[:, None] * np.stack([sin_theta * np.cos(phi), cos_theta, sin_theta * np.sin(phi)], axis=1)
+
+
+def cylinder_points(count: int, length: float, rho_min: float, rho_max: float) -> np.ndarray:
+    """以 x 轴为轴、长 length 的圆柱壳内的 count 个点，形状 (count, 3)"""
+    i = np.arange(count) + 0.5
+    x = length * (i / count - 0.5)
+    phi = GOLDEN_ANGLE * i
+    rho = rho_min + (rho_max - rho_min) * ((i * R2_ALPHA) % 1.0)
+    return np.stack([x, rho * np.cos(phi), rho * np.sin(phi)], axis=1)
+
+
+def radial_segments(directions: np.ndarray, r_min: float, r_max: float) -> np.ndarray:
+    """径向场线：每个方向一条从 r_min 到 r_max 的线段，形状 (2 * 方向数, 3)"""
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    return np.stack([directions * r_min, directions * r_max], axis=1).reshape(-1, 3)
+
+
+def field_vectors(formula_id: str, points: np.ndarray) -> np.ndarray:
+    """用编译后的公式内核在数据库默认参数下求场矢量，形状 (点数, 3)"""
+    kernel = get_compiler().compile(formula_id)
+    outputs = kernel(x=points[:, 0], y=points[:, 1], z=points[:, 2])
+    return np.stack([outputs[name] for name in kernel.outputs], axis=1)
+
+
+# 各场公式的采样区域：引力场、电场为球壳，运动电荷（速度沿 x 轴）的磁场为绕 x 轴的圆柱壳
+FIELD_SAMPLERS: Dict[str, Callable[[int], np.ndarray]] = {
+    '04': lambda count: shell_points(count, 2.0, 15.0),
+    '10': lambda count: shell_points(count, 1.5, 12.0),
+    '11': lambda count: cylinder_points(count, 18.0, 1.0, 12.0),
+}
+
+
+def _buffers(points: np.ndarray, vectors: np.ndarray, lines: np.ndarray = None) -> Dict[str, object]:
+    buffers = {'count': len(points), 'positions': encode_float32(points), 'vectors': encode_float32(vectors)}
+    if lines is not None:
+        buffers['lines'] = encode_float32(lines)
+    return buffers
+
+
+@lru_cache(maxsize=None)
+def gravity_field_buffers(count: int = FIELD_INSTANCE_COUNT) -> Dict[str, object]:
+    """公式04 引力场：球壳内的场矢量实例，以及水平 20 条、竖直 10 条径向场线"""
+    points = FIELD_SAMPLERS['04'](count)
+    phi = np.arange(20) / 20 * 2 * np.pi
+    theta = np.arange(10) / 10 * np.pi
+    directions = np.concatenate([
+        np.stack([np.cos(phi), np.zeros_like(phi), np.sin(phi)], axis=1),
+        np.stack([np.sin(theta), np.cos(theta), np.zeros_like(theta)], axis=1),
+    ])
+    return _buffers(points, field_vectors('04', points), radial_segments(directions, 2.0, 15.0))
+
+
+@lru_cache(maxsize=None)
+def electric_field_buffers(count: int = FIELD_INSTANCE_COUNT) -> Dict[str, object]:
+    """公式10 电场：球壳内的场矢量实例，以及 24 × 12 条径向场线"""
+    points = FIELD_SAMPLERS['10'](count)
+    phi, theta = np.meshgrid(np.arange(24) / 24 * 2 * np.pi, np.arange(12) / 12 * np.pi, indexing='ij')
+    directions = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)],
+                          axis=-1).reshape(-1, 3)
+    # theta = 0 的 24 条重合在 z 轴上，只保留一条
+    directions = np.unique(np.round(directions, 12), axis=0)
+    return _buffers(points, field_vectors('10', points), radial_segments(directions, 1.5, 12.0))
+
+
+@lru_cache(maxsize=None)
+def magnetic_sweep_buffers(grid: int = MAGNETIC_SWEEP_GRID,
+                           velocities: tuple = MAGNETIC_SWEEP_VELOCITIES) -> Dict[str, object]:
+    """
+    公式11 运动电荷磁场的速度扫描：规则网格上的箭头实例，每个速度一组场矢量
+
+    场源在 t = 0 位于原点、沿 x 轴运动，场矢量按毕奥-萨伐尔形式 v × R 含 γ 求值；
+    vectors 依次存放各速度的 (网格点数, 3) 数组，页面按速度切换实例
+    """
+    x = np.linspace(-9.0, 9.0, grid)
+    transverse = np.linspace(-12.0, 12.0, grid)
+    field = MovingSourceMagneticField(x, transverse, transverse, mode='cross')
+    points = np.stack(np.meshgrid(x, transverse, transverse, indexing='ij'), axis=-1).reshape(-1, 3)
+    vectors = np.concatenate([B.reshape(-1, 3) for _, B in field.iter_sweep(velocities)])
+    return {'count': len(points), 'positions': encode_float32(points), 'vectors': encode_float32(vectors),
+            'velocities': list(velocities), 'gamma': field.gamma(velocities).tolist()}
+
+
+@lru_cache(maxsize=None)
+def shader_field_buffers(formula_id: str, count: int = FIELD_INSTANCE_COUNT) -> Dict[str, object]:
+    """
+    着色器求值的场页面：只有采样点，以及默认参数下场强的中位数和对数跨度
+
+    着色器用 log(|F| / reference) / (2 · log_span) 把场强映射到箭头长度和颜色，
+    默认参数下大致覆盖 [0, 1]；改变参数后场强整体变化，颜色随之变亮或变暗。
+    """
+    points = FIELD_SAMPLERS[formula_id](count)
+    magnitudes = np.linalg.norm(field_vectors(formula_id, points), axis=1)
+    magnitudes = magnitudes[magnitudes > 0]
+    low, reference, high = np.percentile(magnitudes, [5, 50, 95])
+    return {'count': len(points), 'positions': encode_float32(points),
+            'reference': float(reference), 'log_span': float(np.log(high / low) / 2) or 1.0}
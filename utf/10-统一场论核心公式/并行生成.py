@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式文件夹并行生成
+Process-Pool Parallel Generation of Formula Folders
+
+生成器只需提供两样东西：
+    - base_path：输出根目录
+    - render_formula_files(formula)：返回 {文件名: 内容}，纯计算、不写文件
+生成器若有 optimizer 属性（输出优化.OutputOptimizer），写入前先压缩内容并写出 .gz / .br。
+本模块把公式分发到进程池（每个进程初始化时接收一次生成器副本），
+各进程渲染后原子写入（临时文件 + os.replace，读者不会看到写了一半的文件），
+并返回每个公式的耗时报告。任务按块分发，公式数增长到数百个时调度开销仍然很小。
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from 输出优化 import remove_compressed
+
+_worker_generator = None
+
+
+def _current_umask() -> int:
+    """读取进程的 umask（os.umask 只能先设置再恢复）"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 新文件的权限与 open() 创建时相同（0o666 & ~umask），mkstemp 默认的 0600 会让其他用户（如静态服务器）无法读取
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def atomic_write(path: Path, content: Union[str, bytes]):
+    """原子写入文件（str 按 UTF-8 写出）：同目录临时文件写完后 os.replace 覆盖目标，保留已有文件的权限"""
+    path = Path(path)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(content)
+            os.fchmod(f.fileno(), mode)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def formula_folder(generator, formula: Dict[str, Any]) -> Path:
+    """公式的输出文件夹"""
+    return Path(generator.base_path) / f"{formula['id']}-{formula['name']}"
+
+
+def write_formula_folder(generator, formula: Dict[str, Any]) -> Dict[str, Any]:
+    """渲染并原子写入单个公式文件夹，返回耗时记录"""
+    start = time.perf_counter()
+    files = generator.render_formula_files(formula)
+    rendered = time.perf_counter()
+
+    folder = formula_folder(generator, formula)
+    folder.mkdir(parents=True, exist_ok=True)
+    optimizer = getattr(generator, 'optimizer', None)
+    written_bytes, sizes = 0, {}
+    for name, content in files.items():
+        path = folder / name
+        if optimizer is None:
+            data = content.encode('utf-8')
+            atomic_write(path, data)
+            remove_compressed(path)
+        else:
+            result = optimizer.process(name, content)
+            data = result['content'].encode('utf-8')
+            atomic_write(path, data)
+            for suffix, blob in result['variants'].items():
+                atomic_write(path.with_name(name + suffix), blob)
+            remove_compressed(path, keep=result['variants'])
+            sizes[name] = result['sizes']
+        written_bytes += len(data)
+    written = time.perf_counter()
+    record = {
+        'id': formula['id'],
+        'target': folder.name,
+        'files': list(files),
+        'bytes': written_bytes,
+        'render': rendered - start,
+        'write': written - rendered,
+        'total': written - start,
+        'worker': os.getpid(),
+    }
+    if optimizer is not None:
+        record['sizes'] = sizes
+    return record
+
+
+def _init_worker(generator):
+    """进程初始化：保存生成器副本，之后的任务只传公式条目"""
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _write_task(formula: Dict[str, Any]) -> Dict[str, Any]:
+    return write_formula_folder(_worker_generator, formula)
+
+
+def generate_parallel(generator, formulas: Iterable[Dict[str, Any]],
+                      workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    并行生成多个公式文件夹
+
+    参数:
+        generator: 提供 base_path 和 render_formula_files 的生成器（需可 pickle）
+        workers:   进程数，None 为 CPU 核数，1 表示在当前进程内顺序生成
+
+    返回:
+        报告 dict：'formulas' 为各公式耗时记录（按输入顺序），另有总耗时、进程数等汇总
+    """
+    formulas = list(formulas)
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, max(len(formulas), 1))
+
+    start = time.perf_counter()
+    if workers == 1:
+        records = [write_formula_folder(generator, formula) for formula in formulas]
+    else:
+        # 每个进程大约分到 4 块，兼顾负载均衡与调度开销
+        chunksize = max(1, len(formulas) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(generator,)) as executor:
+            records = list(executor.map(_write_task, formulas, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    busy = sum(record['total'] for record in records)
+    return {
+        'formulas': records,
+        'workers': workers,
+        'wall': elapsed,
+        'busy': busy,
+        'bytes': sum(record['bytes'] for record in records),
+        'speedup': busy / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_report(report: Dict[str, Any], slowest: int = 5) -> str:
+    """把耗时报告格式化为可打印的文本"""
+    records: List[Dict[str, Any]] = report['formulas']
+    lines = [f"⏱️ {len(records)} 个公式，{report['workers']} 个进程: 墙钟 {report['wall'] * 1000:.1f} ms，"
+             f"累计 {report['busy'] * 1000:.1f} ms，并行加速 {report['speedup']:.1f}×，"
+             f"写出 {report['bytes'] / 1024:.1f} KB"]
+    for record in sorted(records, key=lambda record: record['total'], reverse=True)[:slowest]:
+        lines.append(f"   {record['target']}: 渲染 {record['render'] * 1000:.1f} ms，"
+                     f"写入 {record['write'] * 1000:.1f} ms（进程 {record['worker']}）")
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量构建清单
+Incremental Build Manifest
+
+记录每个构建目标（如一个公式文件夹）上次生成时的输入指纹：
+    - 公式在数据库中条目的内容哈希
+    - 模板版本号
+    - 生成器代码的哈希
+指纹不变且输出文件都还在时跳过该目标，空操作的重新构建几乎瞬间完成。
+清单保存为 JSON，原子写入（临时文件 + os.replace）。
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(value: Any) -> str:
+    """JSON 可序列化对象的规范化内容哈希（键排序，与缩进、键顺序无关）"""
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """文件内容哈希"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class BuildManifest:
+    """构建清单：目标名 -> 输入指纹与输出文件列表"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data['entries']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    @staticmethod
+    def fingerprint(**inputs: Any) -> str:
+        """由各项输入（数据库条目、模板版本、代码哈希等）组合出构建指纹"""
+        return content_hash(inputs)
+
+    def is_stale(self, target: str, fingerprint: str, outputs: Iterable[Path]) -> bool:
+        """目标是否需要重新生成：从未构建、指纹变化或输出文件缺失"""
+        entry = self.entries.get(target)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return True
+        return not all(Path(output).exists() for output in outputs)
+
+    def record(self, target: str, fingerprint: str, outputs: Iterable[Path]):
+        """记录目标的构建结果"""
+        self.entries[target] = {
+            'fingerprint': fingerprint,
+            'outputs': sorted(str(Path(output).relative_to(self.path.parent)) for output in outputs),
+        }
+
+    def prune(self, targets: Iterable[str]) -> List[str]:
+        """删除不再存在的目标的记录，返回被删除的目标名"""
+        keep = set(targets)
+        removed = [target for target in self.entries if target not in keep]
+        for target in removed:
+            del self.entries[target]
+        return removed
+
+    def save(self):
+        """原子写入清单文件"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
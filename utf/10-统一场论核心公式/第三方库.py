@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+第三方库本地化（离线模式）
+Vendored Third-Party Libraries for Offline Pages
+
+生成的页面默认从 CDN 加载 three.js、OrbitControls、MathJax 等库，在离线机器上会卡住或失败。
+离线模式下：
+    - 从本地 vendor/ 目录读取固定版本的库文件，用 LIBRARIES 中固定的 sha256 校验
+      （尚未固定时用 vendor.lock.json 中的记录，两者都没有视为错误）
+    - 以内容哈希文件名写入输出目录的 assets/（与共享样式、脚本相同的 AssetBundle 机制）
+    - 把页面中的 CDN 地址改写为相对路径，并在 <head> 开头加入 <link rel="preload">
+    - 删除 polyfill.io 等离线无法使用、也不再需要的脚本
+MathJax 使用自包含的 tex-svg 构建（chtml 构建运行时还要从 CDN 加载字体文件）。
+
+本地文件需要在联网环境中准备一次：
+    python 第三方库.py          # 下载到 vendor/，与 LIBRARIES 中的 sha256 不一致时拒绝写入
+    python 第三方库.py --pin    # 首次固定：接受尚未固定的库并打印其 sha256，核对后填入 LIBRARIES
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional
+
+from 并行生成 import atomic_write
+from 资源包 import AssetBundle
+from 输出优化 import OutputOptimizer
+
+VENDOR_DIR = Path(__file__).with_name('vendor')
+LOCK_FILE = 'vendor.lock.json'
+
+# 固定版本的第三方库：本地文件名、下载地址、页面中会被改写为本地文件的 CDN 地址，
+# 以及期望的 sha256（None 表示尚未固定，需用 --pin 下载一次、核对后填入）
+LIBRARIES = {
+    'three': {
+        'version': 'r128',
+        'file': 'three-r128.min.js',
+        'url': 'https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js',
+        'replaces': ['https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js'],
+        'sha256': None,
+    },
+    'orbit-controls': {
+        'version': '0.128.0',
+        'file': 'OrbitControls-0.128.0.js',
+        'url': 'https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js',
+        'replaces': ['https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js'],
+        'sha256': None,
+    },
+    'mathjax': {
+        'version': '3.2.2',
+        'file': 'mathjax-3.2.2-tex-svg.js',
+        'url': 'https://cdn.jsdelivr.net/npm/mathjax@3.2.2/es5/tex-svg.js',
+        'replaces': ['https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js',
+                     'https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-svg.js'],
+        'sha256': None,
+    },
+    'stats': {
+        'version': 'r17',
+        'file': 'stats-r17.min.js',
+        'url': 'https://cdnjs.cloudflare.com/ajax/libs/stats.js/r17/Stats.min.js',
+        'replaces': ['https://cdnjs.cloudflare.com/ajax/libs/stats.js/r17/Stats.min.js'],
+        'sha256': None,
+    },
+    'dat-gui': {
+        'version': '0.7.9',
+        'file': 'dat.gui-0.7.9.min.js',
+        'url': 'https://cdnjs.cloudflare.com/ajax/libs/dat-gui/0.7.9/dat.gui.min.js',
+        'replaces': ['https://cdnjs.cloudflare.com/ajax/libs/dat-gui/0.7.9/dat.gui.min.js'],
+        'sha256': None,
+    },
+}
+
+# 离线模式下直接删除的脚本（现代浏览器不需要 ES6 polyfill）
+DROPPED_SCRIPTS = ('https://polyfill.io/',)
+
+_SCRIPT_TAG = re.compile(r'[ \t]*<script\b[^>]*?\bsrc="([^"]+)"[^>]*>\s*</script>[ \t]*\n?', re.IGNORECASE)
+_HEAD_START = re.compile(r'<meta\s+charset="[^"]*"\s*/?>|<head\b[^>]*>', re.IGNORECASE)
+
+
+def load_lock(vendor_dir: Path) -> Dict[str, Dict[str, str]]:
+    """读取锁文件：库名 -> {version, url, sha256}，不存在时抛出 FileNotFoundError"""
+    path = Path(vendor_dir) / LOCK_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"缺少锁文件 {path}，请先在联网环境运行 python 第三方库.py 下载") from None
+
+
+def fetch_libraries(vendor_dir: Path = VENDOR_DIR, pin: bool = False) -> Dict[str, Dict[str, str]]:
+    """
+    （需联网）下载全部固定版本的库到 vendor_dir，并写出带 sha256 的锁文件
+
+    下载内容与 LIBRARIES 中的 sha256 不一致时抛出 ValueError，不写入任何文件；
+    尚未固定 sha256 的库只有 pin=True 时才接受（调用方核对后把 sha256 填入 LIBRARIES）
+    """
+    vendor_dir = Path(vendor_dir)
+    downloads, lock = {}, {}
+    for name, library in LIBRARIES.items():
+        with urllib.request.urlopen(library['url'], timeout=60) as response:
+            data = response.read()
+        digest = hashlib.sha256(data).hexdigest()
+        expected = library['sha256']
+        if expected is None and not pin:
+            raise ValueError(f"第三方库 {name} 尚未在 LIBRARIES 中固定 sha256，"
+                             f"请用 python 第三方库.py --pin 下载、核对后填入")
+        if expected is not None and digest != expected:
+            raise ValueError(f"下载的第三方库 {name} 的 sha256 {digest} 与 LIBRARIES 中固定的 {expected} 不一致")
+        downloads[name] = data
+        lock[name] = {'version': library['version'], 'url': library['url'], 'sha256': digest}
+
+    vendor_dir.mkdir(parents=True, exist_ok=True)
+    for name, data in downloads.items():
+        atomic_write(vendor_dir / LIBRARIES[name]['file'], data)
+    atomic_write(vendor_dir / LOCK_FILE, json.dumps(lock, ensure_ascii=False, indent=2, sort_keys=True))
+    return lock
+
+
+class VendoredLibraries:
+    """本地化的第三方库：写入带哈希的资源文件，并把页面中的 CDN 引用改写为本地路径
+
+    库文件缺失、（有库尚未固定时）锁文件缺失时抛出 FileNotFoundError；库文件与 LIBRARIES 中固定的 sha256
+    （尚未固定时为锁文件中的记录）不一致，或两处都没有 sha256 时抛出 ValueError。
+    """
+
+    def __init__(self, vendor_dir: Path = VENDOR_DIR, optimizer: Optional[OutputOptimizer] = None):
+        vendor_dir = Path(vendor_dir)
+        missing = [library['file'] for library in LIBRARIES.values() if not (vendor_dir / library['file']).exists()]
+        if missing:
+            raise FileNotFoundError(f"缺少本地第三方库 {missing}（目录 {vendor_dir}），"
+                                    f"请先在联网环境运行 python 第三方库.py 下载")
+
+        # 库文件已经压缩过，只做预压缩
+        if optimizer is not None:
+            optimizer = OutputOptimizer(minify=False, compress=optimizer.compress_enabled, level=optimizer.level)
+        # 每个库都必须有 sha256（优先使用 LIBRARIES 中固定的值），缺少记录与内容不一致同样视为错误
+        # 全部库都已在 LIBRARIES 中固定时不需要锁文件
+        lock = load_lock(vendor_dir) if any(library['sha256'] is None for library in LIBRARIES.values()) else {}
+        expected = {name: library['sha256'] or lock.get(name, {}).get('sha256')
+                    for name, library in LIBRARIES.items()}
+        unpinned = [name for name, digest in expected.items() if not digest]
+        if unpinned:
+            raise ValueError(f"第三方库 {unpinned} 在 LIBRARIES 和 {LOCK_FILE} 中都没有 sha256 记录，"
+                             f"请重新运行 python 第三方库.py 下载")
+        self.bundles: Dict[str, AssetBundle] = {}
+        for name, library in LIBRARIES.items():
+            data = (vendor_dir / library['file']).read_bytes()
+            if hashlib.sha256(data).hexdigest() != expected[name]:
+                raise ValueError(f"第三方库 {library['file']} 与记录的 sha256 不一致")
+            self.bundles[name] = AssetBundle(f"{name}-{library['version']}", optimizer, js=data.decode('utf-8'))
+
+    @property
+    def filenames(self) -> Dict[str, str]:
+        """库名 -> 带哈希的文件名（用于构建指纹）"""
+        return {name: bundle.filenames['js'] for name, bundle in self.bundles.items()}
+
+    def write(self, asset_dir: Path):
+        """把全部库文件写入资源目录（已存在的同哈希文件跳过）"""
+        for bundle in self.bundles.values():
+            bundle.write(asset_dir)
+
+    def rewrite(self, html: str, asset_dir: Path, page_dir: Path) -> str:
+        """把页面中的 CDN 脚本改写为本地文件，删除离线不可用的脚本，并预加载用到的库"""
+        urls = {url: name for name, library in LIBRARIES.items() for url in library['replaces']}
+        preloads = []
+
+        def replace(match):
+            src = match.group(1)
+            if src.startswith(DROPPED_SCRIPTS):
+                return ''
+            name = urls.get(src)
+            if name is None:
+                return match.group(0)
+            local = self.bundles[name].url('js', asset_dir, page_dir)
+            preloads.append(local)
+            return match.group(0).replace(src, local)
+
+        html = _SCRIPT_TAG.sub(replace, html)
+        head = _HEAD_START.search(html)
+        if preloads and head:
+            links = ''.join(f'\n    <link rel="preload" href="{url}" as="script">' for url in preloads)
+            html = html[:head.end()] + links + html[head.end():]
+        return html
+
+
+def main():
+    """主函数：下载固定版本的第三方库到 vendor/"""
+    parser = argparse.ArgumentParser(description="下载固定版本的第三方库到 vendor/（离线模式）")
+    parser.add_argument('--pin', action='store_true',
+                        help="接受尚未在 LIBRARIES 中固定 sha256 的库，并打印完整 sha256 供核对后填入")
+    args = parser.parse_args()
+
+    print("📦 下载第三方库到本地（离线模式）")
+    print("=" * 50)
+    lock = fetch_libraries(pin=args.pin)
+    for name, entry in lock.items():
+        size = os.path.getsize(VENDOR_DIR / LIBRARIES[name]['file'])
+        print(f"✅ {name} {entry['version']}: {size / 1024:.1f} KB，sha256 {entry['sha256'][:16]}…")
+        if LIBRARIES[name]['sha256'] is None:
+            print(f"   ⚠️ 尚未固定，核对后填入 LIBRARIES['{name}']['sha256']: {entry['sha256']}")
+    print(f"🔒 已写出 {VENDOR_DIR / LOCK_FILE}")
+
+
+if __name__ == "__main__":
+    main()
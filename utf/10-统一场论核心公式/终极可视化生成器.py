@@ -11,291 +11,161 @@ import os
 import math
 from pathlib import Path
 
+from 公式存储 import get_store
+from 并行生成 import format_report, generate_parallel, write_formula_folder
+from 构建清单 import BuildManifest, content_hash, file_hash
+from 模板引擎 import compile_template
+from 资源包 import AssetBundle
+from 第三方库 import VENDOR_DIR, VendoredLibraries
+from 公式预渲染 import LatexPrerenderer
+from 场矢量实例 import electric_field_buffers, gravity_field_buffers, magnetic_sweep_buffers
+from 输出优化 import OutputOptimizer, format_size_report
+from 页面模板 import ULTIMATE_ENGINE_SCRIPT, ULTIMATE_PAGE, ULTIMATE_SCRIPT, ULTIMATE_STYLE
+
+# 模板版本：生成结果的格式有不体现在本文件代码中的变化时递增
+TEMPLATE_VERSION = 1
+
+# 每个公式文件夹生成的文件
+OUTPUT_FILES = ("visualization.html", "theory.md", "README.md")
+
+# 生成结果依赖的代码文件（任一变化都会使全部公式重新生成）：
+# 模板与渲染、写入与压缩、资源哈希、公式预渲染，以及场矢量数据和产生它的公式内核、磁场求值器
+GENERATOR_SOURCES = (Path(__file__),) + tuple(Path(__file__).with_name(name) for name in (
+    "页面模板.py", "模板引擎.py", "并行生成.py", "资源包.py", "输出优化.py", "第三方库.py",
+    "公式预渲染.py", "场矢量实例.py", "公式内核编译器.py", "运动电荷磁场计算.py"))
+
+# 共享资源（样式、场景引擎脚本）所在目录，相对于输出根目录
+ASSET_DIR = "assets"
+
+# 动画轨迹的环形缓冲容量（顶点数），顶点数组在页面中只分配一次
+TRAJECTORY_LENGTH = 100
+# 螺旋窗口的最大采样点数（物理模型状态和顶点数组的容量）
+HELIX_CAPACITY = 400
+# 螺旋轨迹的采样步长和超前当前时刻的长度
+HELIX_STEP = 0.1
+HELIX_LOOKAHEAD = 5
+
 class UnifiedFieldVisualizationGenerator:
-    def __init__(self):
-        self.base_path = Path("utf/统一场论核心公式")
+    def __init__(self, base_path=None, optimize=False, vendor=False, prerender=True):
+        """
+        参数:
+            base_path: 输出根目录，默认为本文件所在目录
+            optimize:  True 时压缩 HTML/CSS/JS 并写出 .gz（以及可用时的 .br）预压缩文件
+            vendor:    True（或本地库目录）时把 three.js、MathJax 等复制到 assets/，页面不访问 CDN
+            prerender: True 时公式在构建时预渲染为内联 SVG，页面不再加载 MathJax
+        """
+        self.base_path = Path(base_path) if base_path else Path(__file__).parent
         self.load_formula_database()
+        self.manifest = BuildManifest(self.base_path / ".build_manifest.json")
+        self.optimizer = OutputOptimizer() if optimize else None
+        self.assets = AssetBundle("ufv", self.optimizer, css=ULTIMATE_STYLE, js=ULTIMATE_ENGINE_SCRIPT)
+        self.vendor = VendoredLibraries(VENDOR_DIR if vendor is True else vendor, self.optimizer) if vendor else None
+        self.prerenderer = LatexPrerenderer(enabled=prerender)
+        self.generator_hash = content_hash({
+            'sources': [file_hash(path) for path in GENERATOR_SOURCES],
+            'assets': self.assets.filenames,
+            'optimizer': self.optimizer.settings if self.optimizer else None,
+            'vendor': self.vendor.filenames if self.vendor else None,
+            'prerender': self.prerenderer.version,
+        })
         
     def load_formula_database(self):
-        """加载公式数据库"""
-        with open(self.base_path / "公式规格数据库.json", 'r', encoding='utf-8') as f:
-            self.database = json.load(f)
+        """加载公式数据库（共享的公式存储，只解析一次）"""
+        self.store = get_store()
+        self.database = {'formulas': self.store.formulas(), 'visualization_templates': self.store.templates}
+    
+    def formula_fingerprint(self, formula):
+        """公式的构建指纹：数据库条目 + 模板版本 + 生成器代码与共享资源"""
+        return BuildManifest.fingerprint(formula=formula, template_version=TEMPLATE_VERSION,
+                                         generator=self.generator_hash)
     
-    def generate_all_visualizations(self):
-        """生成所有19个公式的高质量可视化"""
+    def formula_outputs(self, formula):
+        """公式文件夹中生成的全部文件路径（开启压缩时包括 .gz 预压缩文件）"""
+        folder_path = self.base_path / f"{formula['id']}-{formula['name']}"
+        outputs = [folder_path / name for name in OUTPUT_FILES]
+        if self.optimizer is not None and self.optimizer.compress_enabled:
+            outputs += [folder_path / f"{name}.gz" for name in OUTPUT_FILES]
+        return outputs
+    
+    def generate_all_visualizations(self, force=False, workers=None):
+        """
+        生成所有19个公式的高质量可视化
+
+        增量构建：构建指纹未变且输出文件齐全的公式直接跳过，force=True 时全部重新生成。
+        需要重新生成的公式由进程池并行渲染、原子写入（workers=1 时在当前进程顺序生成）。
+
+        返回:
+            (重新生成的目标, 跳过的目标, 耗时报告)
+        """
         print("🚀 开始生成张祥前统一场论核心公式可视化系统...")
         
-        for formula in self.database['formulas']:
-            print(f"📐 正在生成: {formula['id']}-{formula['name']}")
-            self.generate_formula_visualization(formula)
-            
+        stale, skipped = [], []
+        for formula in self.store:
+            target = f"{formula['id']}-{formula['name']}"
+            if force or self.manifest.is_stale(target, self.formula_fingerprint(formula),
+                                               self.formula_outputs(formula)):
+                stale.append(formula)
+            else:
+                skipped.append(target)
+            
+        # 共享样式和脚本只写一份，页面通过带哈希的文件名引用
+        self.assets.write(self.base_path / ASSET_DIR)
+        if self.vendor is not None:
+            self.vendor.write(self.base_path / ASSET_DIR)
+        report = generate_parallel(self, stale, workers)
+        generated = []
+        for formula, record in zip(stale, report['formulas']):
+            print(f"📐 已生成: {record['target']}")
+            self.manifest.record(record['target'], self.formula_fingerprint(formula),
+                                 self.formula_outputs(formula))
+            generated.append(record['target'])
+            
+        self.manifest.prune(f"{formula['id']}-{formula['name']}" for formula in self.store)
+        self.manifest.save()
         self.generate_master_index()
-        print("✅ 所有可视化生成完成！")
+        if skipped:
+            print(f"⏭️ 跳过 {len(skipped)} 个未变化的公式: {', '.join(skipped)}")
+        if generated:
+            print(format_report(report))
+            if self.optimizer is not None:
+                print(format_size_report(report['formulas']))
+        print(f"✅ 可视化生成完成！重新生成 {len(generated)} 个，跳过 {len(skipped)} 个")
+        return generated, skipped, report
+    
+    def render_formula_files(self, formula):
+        """渲染单个公式文件夹的全部文件（只计算内容，不写文件）"""
+        return {
+            "visualization.html": self.create_advanced_html(formula),
+            "theory.md": self.create_theory_document(formula),
+            "README.md": self.create_readme(formula),
+        }
     
     def generate_formula_visualization(self, formula):
-        """为单个公式生成完整的可视化"""
-        folder_name = f"{formula['id']}-{formula['name']}"
-        folder_path = self.base_path / folder_name
-        
-        # 确保文件夹存在
-        folder_path.mkdir(exist_ok=True)
-        
-        # 生成高质量HTML可视化
-        html_content = self.create_advanced_html(formula)
-        with open(folder_path / "visualization.html", 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        # 生成理论文档
-        theory_content = self.create_theory_document(formula)
-        with open(folder_path / "theory.md", 'w', encoding='utf-8') as f:
-            f.write(theory_content)
-            
-        # 生成README
-        readme_content = self.create_readme(formula)
-        with open(folder_path / "README.md", 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        """为单个公式生成完整的可视化（高质量HTML、理论文档、README），原子写入"""
+        return write_formula_folder(self, formula)
     
     def create_advanced_html(self, formula):
-        """创建高级HTML5可视化"""
-        
-        # 根据公式类型选择可视化模板
-        visualization_code = self.get_visualization_code(formula)
-        
-        html_template = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{formula['name']} - 张祥前统一场论可视化</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            background: linear-gradient(135deg, #0c0c0c 0%, #1a1a2e 50%, #16213e 100%);
-            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            overflow: hidden; color: white; height: 100vh;
-        }}
-        
-        #canvas {{ 
-            display: block; cursor: grab; width: 100%; height: 100%;
-            background: radial-gradient(circle at center, #1a1a2e 0%, #0c0c0c 100%);
-        }}
-        
-        .ui-panel {{
-            position: absolute; background: rgba(0, 0, 0, 0.85);
-            backdrop-filter: blur(20px); border: 1px solid rgba(255, 255, 255, 0.1);
-            border-radius: 15px; padding: 20px; 
-            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.6);
-            transition: all 0.3s ease;
-        }}
-        
-        .ui-panel:hover {{ transform: translateY(-2px); }}
-        
-        #info-panel {{ 
-            top: 20px; left: 20px; width: 420px; max-height: 80vh; overflow-y: auto;
-        }}
-        
-        #controls-panel {{ 
-            top: 20px; right: 20px; width: 320px;
-        }}
-        
-        #math-panel {{
-            bottom: 20px; left: 20px; width: 500px;
-        }}
-        
-        .panel-title {{
-            font-size: 1.4em; font-weight: bold; margin-bottom: 15px;
-            background: linear-gradient(45deg, #667eea, #764ba2, #f093fb);
-            background-clip: text; -webkit-background-clip: text; 
-            -webkit-text-fill-color: transparent;
-            text-shadow: none;
-        }}
-        
-        .formula-display {{
-            background: rgba(255, 255, 255, 0.05); padding: 15px; border-radius: 10px;
-            margin: 10px 0; border-left: 4px solid #667eea;
-        }}
-        
-        .parameter-control {{
-            margin: 10px 0; display: flex; align-items: center; gap: 10px;
-        }}
-        
-        .parameter-control label {{
-            min-width: 80px; font-size: 0.9em; color: #ccc;
-        }}
-        
-        .parameter-control input[type="range"] {{
-            flex: 1; height: 6px; border-radius: 3px;
-            background: linear-gradient(90deg, #667eea, #764ba2);
-            outline: none; -webkit-appearance: none;
-        }}
-        
-        .parameter-control input[type="range"]::-webkit-slider-thumb {{
-            -webkit-appearance: none; width: 18px; height: 18px;
-            border-radius: 50%; background: #fff; cursor: pointer;
-            box-shadow: 0 2px 6px rgba(0,0,0,0.3);
-        }}
-        
-        .parameter-value {{
-            min-width: 60px; text-align: right; font-family: monospace;
-            background: rgba(255,255,255,0.1); padding: 2px 8px; border-radius: 4px;
-        }}
-        
-        .control-button {{
-            background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
-            border: none; padding: 12px 24px; border-radius: 25px; 
-            cursor: pointer; margin: 5px; font-size: 0.9em;
-            transition: all 0.3s ease; font-weight: 500;
-        }}
-        
-        .control-button:hover {{ 
-            transform: translateY(-2px); 
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
-        }}
-        
-        .control-button:active {{ transform: translateY(0); }}
-        
-        .stats-display {{
-            background: rgba(255, 255, 255, 0.05); padding: 10px; 
-            border-radius: 8px; margin: 10px 0; font-family: monospace;
-            font-size: 0.85em; line-height: 1.4;
-        }}
-        
-        .physics-insight {{
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1), rgba(118, 75, 162, 0.1));
-            border: 1px solid rgba(102, 126, 234, 0.3); padding: 15px; 
-            border-radius: 10px; margin: 15px 0;
-        }}
-        
-        .physics-insight h4 {{
-            color: #667eea; margin-bottom: 8px; font-size: 1.1em;
-        }}
-        
-        .loading-screen {{
-            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
-            background: linear-gradient(135deg, #0c0c0c, #1a1a2e);
-            display: flex; flex-direction: column; justify-content: center; align-items: center;
-            z-index: 1000; transition: opacity 0.5s ease;
-        }}
-        
-        .loading-spinner {{
-            width: 60px; height: 60px; border: 4px solid rgba(255,255,255,0.1);
-            border-top: 4px solid #667eea; border-radius: 50%;
-            animation: spin 1s linear infinite; margin-bottom: 20px;
-        }}
-        
-        @keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}
-        
-        .fade-out {{ opacity: 0; pointer-events: none; }}
-        
-        /* 响应式设计 */
-        @media (max-width: 768px) {{
-            .ui-panel {{ width: calc(100% - 40px) !important; }}
-            #controls-panel {{ top: auto; bottom: 20px; right: 20px; }}
-            #math-panel {{ display: none; }}
-        }}
-    </style>
-    
-    <!-- 外部库 -->
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
-    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
-    <script>
-        window.MathJax = {{
-            tex: {{ inlineMath: [['$', '$'], ['\\\\(', '\\\\)']] }},
-            svg: {{ fontCache: 'global' }}
-        }};
-    </script>
-</head>
-<body>
-    <!-- 加载屏幕 -->
-    <div id="loadingScreen" class="loading-screen">
-        <div class="loading-spinner"></div>
-        <h2>正在加载 {formula['name']} 可视化...</h2>
-        <p>张祥前统一场论 - 高级3D可视化系统</p>
-    </div>
-    
-    <!-- 主画布 -->
-    <canvas id="canvas"></canvas>
-    
-    <!-- 信息面板 -->
-    <div id="info-panel" class="ui-panel">
-        <div class="panel-title">{formula['icon']} {formula['name']}</div>
-        
-        <div class="formula-display">
-            <strong>LaTeX公式：</strong><br>
-            $${formula['formula_latex']}$$
-        </div>
-        
-        <div class="formula-display">
-            <strong>Unicode表示：</strong><br>
-            <code>{formula['formula_unicode']}</code>
-        </div>
-        
-        <p><strong>物理描述：</strong><br>{formula['description']}</p>
-        
-        <div class="physics-insight">
-            <h4>🔬 物理洞察</h4>
-            <p>该公式揭示了{', '.join(formula['physics_concepts'])}的深层关系。</p>
-        </div>
-        
-        <div class="physics-insight">
-            <h4>📊 数学工具</h4>
-            <p>涉及{', '.join(formula['math_concepts'])}等数学概念。</p>
-        </div>
-        
-        <div class="stats-display" id="statsDisplay">
-            <strong>实时统计：</strong><br>
-            帧率: <span id="fps">60</span> FPS<br>
-            渲染对象: <span id="objectCount">0</span><br>
-            计算精度: <span id="precision">高精度</span>
-        </div>
-    </div>
-    
-    <!-- 控制面板 -->
-    <div id="controls-panel" class="ui-panel">
-        <div class="panel-title">🎮 交互控制</div>
-        
-        <div style="text-align: center; margin-bottom: 15px;">
-            <button class="control-button" onclick="toggleAnimation()">
-                <span id="playPauseIcon">▶️</span> <span id="playPauseText">开始</span>
-            </button>
-            <button class="control-button" onclick="resetVisualization()">🔄 重置</button>
-            <button class="control-button" onclick="toggleFullscreen()">🔍 全屏</button>
-        </div>
-        
-        <!-- 动态参数控制 -->
-        <div id="parameterControls">
-            {self.generate_parameter_controls(formula)}
-        </div>
-        
-        <div class="physics-insight">
-            <h4>💡 操作提示</h4>
-            <p>• 鼠标拖拽旋转视角<br>
-            • 滚轮缩放场景<br>
-            • 调节参数观察变化<br>
-            • 点击重置恢复初始状态</p>
-        </div>
-    </div>
-    
-    <!-- 数学面板 -->
-    <div id="math-panel" class="ui-panel">
-        <div class="panel-title">📐 数学分析</div>
-        <div id="mathAnalysis">
-            <div class="formula-display">
-                <strong>实时计算结果：</strong><br>
-                <span id="calculationResult">计算中...</span>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        {visualization_code}
-    </script>
-</body>
-</html>"""
-        
-        return html_template
+        """创建高级HTML5可视化（预编译模板，渲染只做字符串拼接；样式和场景引擎引用共享资源）"""
+        page_dir = self.base_path / f"{formula['id']}-{formula['name']}"
+        asset_dir = self.base_path / ASSET_DIR
+        formula_math, math_scripts = self.prerenderer.display(formula['formula_latex'])
+        html = ULTIMATE_PAGE.render(
+            STYLESHEET=self.assets.url('css', asset_dir, page_dir),
+            ENGINE_SCRIPT=self.assets.url('js', asset_dir, page_dir),
+            FORMULA_NAME=formula['name'],
+            FORMULA_ICON=formula['icon'],
+            FORMULA_MATH=formula_math,
+            MATH_SCRIPTS=math_scripts,
+            FORMULA_UNICODE=formula['formula_unicode'],
+            FORMULA_DESCRIPTION=formula['description'],
+            PHYSICS_CONCEPTS=', '.join(formula['physics_concepts']),
+            MATH_CONCEPTS=', '.join(formula['math_concepts']),
+            PARAMETER_CONTROLS=self.generate_parameter_controls(formula),
+            # 根据公式类型选择可视化模板
+            VISUALIZATION_CODE=self.get_visualization_code(formula),
+        )
+        # 离线模式：CDN 地址改写为本地带哈希的库文件
+        return self.vendor.rewrite(html, asset_dir, page_dir) if self.vendor else html
     
     def generate_parameter_controls(self, formula):
         """生成参数控制HTML"""
@@ -333,241 +203,14 @@ class UnifiedFieldVisualizationGenerator:
     
     def get_visualization_code(self, formula):
         """根据公式类型生成对应的可视化代码"""
-        
-        # 基础JavaScript框架
-        base_code = f"""
-        // 全局变量
-        let scene, camera, renderer, controls;
-        let animationId, isAnimating = false;
-        let visualizationObjects = {{}};
-        let parameters = {{}};
-        let startTime = Date.now();
-        
-        // 初始化参数
-        function initializeParameters() {{
-            {self.generate_parameter_initialization(formula)}
-        }}
-        
-        // 场景初始化
-        function initScene() {{
-            // 创建场景
-            scene = new THREE.Scene();
-            scene.background = new THREE.Color(0x0a0a0a);
-            scene.fog = new THREE.Fog(0x0a0a0a, 50, 200);
-            
-            // 创建相机
-            camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);
-            camera.position.set(15, 15, 15);
-            
-            // 创建渲染器
-            renderer = new THREE.WebGLRenderer({{ 
-                canvas: document.getElementById('canvas'), 
-                antialias: true,
-                alpha: true
-            }});
-            renderer.setSize(window.innerWidth, window.innerHeight);
-            renderer.shadowMap.enabled = true;
-            renderer.shadowMap.type = THREE.PCFSoftShadowMap;
-            renderer.outputEncoding = THREE.sRGBEncoding;
-            renderer.toneMapping = THREE.ACESFilmicToneMapping;
-            renderer.toneMappingExposure = 1.2;
-            
-            // 创建控制器
-            controls = new THREE.OrbitControls(camera, renderer.domElement);
-            controls.enableDamping = true;
-            controls.dampingFactor = 0.05;
-            controls.maxDistance = 100;
-            controls.minDistance = 5;
-            
-            // 添加光照系统
-            setupLighting();
-            
-            // 创建坐标系
-            createCoordinateSystem();
-            
-            // 创建特定可视化内容
-            {self.get_specific_visualization(formula)}
-            
-            // 初始化参数
-            initializeParameters();
-            
-            // 开始动画循环
-            animate();
-            
-            // 隐藏加载屏幕
-            setTimeout(() => {{
-                document.getElementById('loadingScreen').classList.add('fade-out');
-            }}, 1000);
-        }}
-        
-        // 光照设置
-        function setupLighting() {{
-            // 环境光
-            const ambientLight = new THREE.AmbientLight(0x404080, 0.3);
-            scene.add(ambientLight);
-            
-            // 主光源
-            const directionalLight = new THREE.DirectionalLight(0xffffff, 1);
-            directionalLight.position.set(20, 20, 10);
-            directionalLight.castShadow = true;
-            directionalLight.shadow.mapSize.width = 2048;
-            directionalLight.shadow.mapSize.height = 2048;
-            directionalLight.shadow.camera.near = 0.5;
-            directionalLight.shadow.camera.far = 100;
-            directionalLight.shadow.camera.left = -50;
-            directionalLight.shadow.camera.right = 50;
-            directionalLight.shadow.camera.top = 50;
-            directionalLight.shadow.camera.bottom = -50;
-            scene.add(directionalLight);
-            
-            // 补充光源
-            const pointLight = new THREE.PointLight(0x667eea, 0.5, 100);
-            pointLight.position.set(-10, 10, -10);
-            scene.add(pointLight);
-            
-            const pointLight2 = new THREE.PointLight(0x764ba2, 0.5, 100);
-            pointLight2.position.set(10, -10, 10);
-            scene.add(pointLight2);
-        }}
-        
-        // 创建坐标系
-        function createCoordinateSystem() {{
-            // 坐标轴
-            const axesHelper = new THREE.AxesHelper(10);
-            scene.add(axesHelper);
-            
-            // 网格
-            const gridHelper = new THREE.GridHelper(20, 20, 0x444444, 0x222222);
-            scene.add(gridHelper);
-            
-            // 坐标标签
-            createAxisLabels();
-        }}
-        
-        // 创建坐标轴标签
-        function createAxisLabels() {{
-            const loader = new THREE.FontLoader();
-            // 这里可以添加文字标签，但为了简化，我们使用基础几何体标记
-            
-            // X轴标记
-            const xGeometry = new THREE.SphereGeometry(0.2);
-            const xMaterial = new THREE.MeshBasicMaterial({{ color: 0xff0000 }});
-            const xMarker = new THREE.Mesh(xGeometry, xMaterial);
-            xMarker.position.set(10, 0, 0);
-            scene.add(xMarker);
-            
-            // Y轴标记
-            const yGeometry = new THREE.SphereGeometry(0.2);
-            const yMaterial = new THREE.MeshBasicMaterial({{ color: 0x00ff00 }});
-            const yMarker = new THREE.Mesh(yGeometry, yMaterial);
-            yMarker.position.set(0, 10, 0);
-            scene.add(yMarker);
-            
-            // Z轴标记
-            const zGeometry = new THREE.SphereGeometry(0.2);
-            const zMaterial = new THREE.MeshBasicMaterial({{ color: 0x0000ff }});
-            const zMarker = new THREE.Mesh(zGeometry, zMaterial);
-            zMarker.position.set(0, 0, 10);
-            scene.add(zMarker);
-        }}
-        
-        // 主动画循环
-        function animate() {{
-            animationId = requestAnimationFrame(animate);
-            
-            const currentTime = (Date.now() - startTime) / 1000;
-            
-            if (isAnimating) {{
-                updateVisualization(currentTime);
-            }}
-            
-            // 更新控制器
-            controls.update();
-            
-            // 更新统计信息
-            updateStats();
-            
-            // 渲染场景
-            renderer.render(scene, camera);
-        }}
-        
-        // 更新可视化
-        function updateVisualization(time) {{
-            {self.get_animation_code(formula)}
-        }}
-        
-        // 更新统计信息
-        function updateStats() {{
-            const fps = Math.round(1000 / (performance.now() - (window.lastFrameTime || performance.now())));
-            window.lastFrameTime = performance.now();
-            
-            document.getElementById('fps').textContent = fps;
-            document.getElementById('objectCount').textContent = scene.children.length;
-        }}
-        
-        // 参数更新函数
-        function updateParameter(name, value) {{
-            parameters[name] = parseFloat(value);
-            document.getElementById(name + 'Value').textContent = parseFloat(value).toFixed(2);
-            updateVisualizationParameters();
-        }}
-        
-        function updateVectorParameter(name, axis, value) {{
-            if (!parameters[name]) parameters[name] = {{x: 0, y: 0, z: 0}};
-            parameters[name][axis] = parseFloat(value);
-            document.getElementById(name + '_' + axis + 'Value').textContent = parseFloat(value).toFixed(2);
-            updateVisualizationParameters();
-        }}
-        
-        // 更新可视化参数
-        function updateVisualizationParameters() {{
-            {self.get_parameter_update_code(formula)}
-        }}
-        
-        // 控制函数
-        function toggleAnimation() {{
-            isAnimating = !isAnimating;
-            const icon = document.getElementById('playPauseIcon');
-            const text = document.getElementById('playPauseText');
-            
-            if (isAnimating) {{
-                icon.textContent = '⏸️';
-                text.textContent = '暂停';
-            }} else {{
-                icon.textContent = '▶️';
-                text.textContent = '开始';
-            }}
-        }}
-        
-        function resetVisualization() {{
-            startTime = Date.now();
-            initializeParameters();
-            // 重置所有参数控制器
-            {self.get_reset_code(formula)}
-        }}
-        
-        function toggleFullscreen() {{
-            if (!document.fullscreenElement) {{
-                document.documentElement.requestFullscreen();
-            }} else {{
-                document.exitFullscreen();
-            }}
-        }}
-        
-        // 窗口大小调整
-        window.addEventListener('resize', () => {{
-            camera.aspect = window.innerWidth / window.innerHeight;
-            camera.updateProjectionMatrix();
-            renderer.setSize(window.innerWidth, window.innerHeight);
-        }});
-        
-        // 页面加载完成后初始化
-        window.addEventListener('load', () => {{
-            initScene();
-        }});
-        """
-        
-        return base_code
+        return ULTIMATE_SCRIPT.render(
+            PARAMETER_INITIALIZATION=self.generate_parameter_initialization(formula),
+            SPECIFIC_VISUALIZATION=self.get_specific_visualization(formula),
+            PHYSICS_MODEL=self.get_physics_model(formula),
+            ANIMATION_CODE=self.get_animation_code(formula),
+            PARAMETER_UPDATE_CODE=self.get_parameter_update_code(formula),
+            RESET_CODE=self.get_reset_code(formula),
+        )
     
     def generate_parameter_initialization(self, formula):
         """生成参数初始化代码"""
@@ -583,32 +226,34 @@ class UnifiedFieldVisualizationGenerator:
         """根据公式类型生成特定的可视化代码"""
         
         visualization_map = {
-            "01": self.get_spacetime_unification_viz(),
-            "02": self.get_helix_spacetime_viz(),
-            "03": self.get_mass_definition_viz(),
-            "04": self.get_gravity_field_viz(),
-            "05": self.get_rest_momentum_viz(),
-            "06": self.get_motion_momentum_viz(),
-            "07": self.get_unified_force_viz(),
-            "08": self.get_space_wave_viz(),
-            "09": self.get_charge_definition_viz(),
-            "10": self.get_electric_field_viz(),
-            "11": self.get_magnetic_field_viz(),
-            "12": self.get_gravity_em_coupling_viz(),
-            "13": self.get_vector_potential_viz(),
-            "14": self.get_gravity_to_electric_viz(),
-            "15": self.get_magnetic_to_gravity_viz(),
-            "16": self.get_energy_mass_viz(),
-            "17": self.get_lightspeed_propulsion_viz(),
-            "18": self.get_wave_solution_viz(),
-            "19": self.get_constant_unification_viz()
+            "01": 'get_spacetime_unification_viz',
+            "02": 'get_helix_spacetime_viz',
+            "03": 'get_mass_definition_viz',
+            "04": 'get_gravity_field_viz',
+            "05": 'get_rest_momentum_viz',
+            "06": 'get_motion_momentum_viz',
+            "07": 'get_unified_force_viz',
+            "08": 'get_space_wave_viz',
+            "09": 'get_charge_definition_viz',
+            "10": 'get_electric_field_viz',
+            "11": 'get_magnetic_field_viz',
+            "12": 'get_gravity_em_coupling_viz',
+            "13": 'get_vector_potential_viz',
+            "14": 'get_gravity_to_electric_viz',
+            "15": 'get_magnetic_to_gravity_viz',
+            "16": 'get_energy_mass_viz',
+            "17": 'get_lightspeed_propulsion_viz',
+            "18": 'get_wave_solution_viz',
+            "19": 'get_constant_unification_viz'
         }
         
-        return visualization_map.get(formula['id'], self.get_default_viz())
+        # 尚未实现专用可视化的公式使用默认可视化
+        method = getattr(self, visualization_map.get(formula['id'], 'get_default_viz'), self.get_default_viz)
+        return method()
     
     def get_spacetime_unification_viz(self):
         """时空同一化方程可视化"""
-        return """
+        return compile_template("""
             // 创建时空网格
             const spaceTimeGrid = new THREE.Group();
             
@@ -643,41 +288,30 @@ class UnifiedFieldVisualizationGenerator:
             scene.add(lightSpeedArrow);
             visualizationObjects.lightSpeedArrow = lightSpeedArrow;
             
-            // 创建轨迹线
-            const trajectoryGeometry = new THREE.BufferGeometry();
+            // 创建轨迹线（环形缓冲，保留最近 {{TRAJECTORY_LENGTH}} 个点）
             const trajectoryMaterial = new THREE.LineBasicMaterial({ 
                 color: 0xff6b6b, 
                 linewidth: 3 
             });
-            const trajectoryLine = new THREE.Line(trajectoryGeometry, trajectoryMaterial);
+            const trajectoryLine = createRingBufferLine({{TRAJECTORY_LENGTH}}, trajectoryMaterial);
             scene.add(trajectoryLine);
             visualizationObjects.trajectoryLine = trajectoryLine;
-            
-            // 轨迹点数组
-            visualizationObjects.trajectoryPoints = [];
-        """
+        """).render(TRAJECTORY_LENGTH=TRAJECTORY_LENGTH)
     
     def get_helix_spacetime_viz(self):
         """三维螺旋时空方程可视化"""
-        return """
-            // 创建螺旋轨迹
-            const helixPoints = [];
-            for (let t = 0; t <= 20; t += 0.1) {
-                const r = 5;
-                const omega = 1;
-                const h = 2;
-                const x = r * Math.cos(omega * t);
-                const y = r * Math.sin(omega * t);
-                const z = h * t;
-                helixPoints.push(new THREE.Vector3(x, y, z));
-            }
-            
-            const helixGeometry = new THREE.BufferGeometry().setFromPoints(helixPoints);
+        return compile_template("""
+            // 创建螺旋轨迹（采样点由物理模型给出，动画中整段拷贝，不重建几何体）
             const helixMaterial = new THREE.LineBasicMaterial({ 
                 color: 0x667eea, 
                 linewidth: 3 
             });
-            const helixCurve = new THREE.Line(helixGeometry, helixMaterial);
+            const helixCurve = createStateLine({{HELIX_CAPACITY}}, helixMaterial);
+            // 动画开始前的初始螺旋：在主线程用同一个模型算一次
+            const initialModel = createPhysicsModel();
+            const initialState = new Float64Array(initialModel.size);
+            initialModel.step({}, 0, initialState);
+            copyStatePoints(helixCurve, initialState, 4, initialState[3]);
             scene.add(helixCurve);
             visualizationObjects.helixCurve = helixCurve;
             
@@ -703,7 +337,7 @@ class UnifiedFieldVisualizationGenerator:
             visualizationObjects.projectionXY = projectionXY;
             visualizationObjects.projectionXZ = projectionXZ;
             visualizationObjects.projectionYZ = projectionYZ;
-        """
+        """).render(HELIX_CAPACITY=HELIX_CAPACITY)
     
     def get_mass_definition_viz(self):
         """质量定义方程可视化"""
@@ -826,60 +460,107 @@ class UnifiedFieldVisualizationGenerator:
             visualizationObjects.particles = particles;
         """
     
+    def get_physics_model(self, formula):
+        """
+        生成物理模型代码（createPhysicsModel），在 Web Worker 中步进，主线程只读取最新状态
+
+        模型函数会被序列化到 worker 中运行，只能使用传入的 parameters 和 time；
+        02 的螺旋窗口采样（每帧 HELIX_CAPACITY 个点的三角函数）也在模型中完成，主线程只拷贝顶点。
+        没有物理模型的公式返回空字符串，动画在主线程中按时间更新
+        """
+        physics_map = {
+            "01": """
+        function createPhysicsModel() {
+            // 时空同一化：r = C t，状态为 [x, y, z]
+            return {
+                size: 3,
+                step(parameters, time, state) {
+                    const C = parameters.C || {x: 1, y: 0, z: 0};
+                    const t = parameters.t || time;
+                    state[0] = C.x * t;
+                    state[1] = C.y * t;
+                    state[2] = C.z * t;
+                }
+            };
+        }
+            """,
+            "02": compile_template("""
+        function createPhysicsModel() {
+            // 三维螺旋时空：r(t) = (r cos ωt, r sin ωt, h t)
+            // 状态为 [粒子 x, y, z, 螺旋点数 n, n 个螺旋采样点的 x, y, z ...]，
+            // 螺旋窗口截止于当前时刻之后 {{HELIX_LOOKAHEAD}}，最多 {{HELIX_CAPACITY}} 个采样点
+            const capacity = {{HELIX_CAPACITY}};
+            const sampleStep = {{HELIX_STEP}};
+            const lookahead = {{HELIX_LOOKAHEAD}};
+            return {
+                size: 4 + capacity * 3,
+                step(parameters, time, state) {
+                    const r = parameters.r || 5;
+                    const omega = parameters.omega || 1;
+                    const h = parameters.h || 2;
+                    state[0] = r * Math.cos(omega * time);
+                    state[1] = r * Math.sin(omega * time);
+                    state[2] = h * time;
+                    
+                    // 采样时刻固定为步长的整数倍，窗口滑动时已有采样点的位置不变
+                    const last = Math.floor((time + lookahead) / sampleStep);
+                    const first = Math.max(0, last - capacity + 1);
+                    state[3] = last - first + 1;
+                    for (let k = first, i = 4; k <= last; k++, i += 3) {
+                        const t = k * sampleStep;
+                        state[i] = r * Math.cos(omega * t);
+                        state[i + 1] = r * Math.sin(omega * t);
+                        state[i + 2] = h * t;
+                    }
+                }
+            };
+        }
+            """).render(HELIX_CAPACITY=HELIX_CAPACITY, HELIX_STEP=HELIX_STEP, HELIX_LOOKAHEAD=HELIX_LOOKAHEAD),
+        }
+        return physics_map.get(formula['id'], "")
+    
     def get_animation_code(self, formula):
-        """生成动画代码"""
+        """生成动画代码（轨迹写入预分配的环形缓冲，每帧不创建几何体；物理状态来自 worker）"""
         animation_map = {
             "01": """
                 // 时空同一化动画
                 if (visualizationObjects.lightSpeedArrow) {
                     const C = parameters.C || {x: 1, y: 0, z: 0};
-                    const t = parameters.t || time;
                     
                     // 更新光速矢量方向
                     visualizationObjects.lightSpeedArrow.lookAt(C.x, C.y, C.z);
                     
-                    // 更新位置
-                    const position = new THREE.Vector3(C.x * t, C.y * t, C.z * t);
-                    visualizationObjects.lightSpeedArrow.position.copy(position);
-                    
-                    // 更新轨迹
-                    visualizationObjects.trajectoryPoints.push(position.clone());
-                    if (visualizationObjects.trajectoryPoints.length > 100) {
-                        visualizationObjects.trajectoryPoints.shift();
-                    }
+                    // 更新位置（worker 计算的 r = C t）
+                    visualizationObjects.lightSpeedArrow.position.set(state[0], state[1], state[2]);
                     
-                    const trajectoryGeometry = new THREE.BufferGeometry().setFromPoints(visualizationObjects.trajectoryPoints);
-                    visualizationObjects.trajectoryLine.geometry.dispose();
-                    visualizationObjects.trajectoryLine.geometry = trajectoryGeometry;
+                    // 更新轨迹：写入环形缓冲，最旧的点被覆盖
+                    pushRingBufferPoint(visualizationObjects.trajectoryLine, state[0], state[1], state[2]);
                 }
             """,
             "02": """
                 // 螺旋时空动画
                 if (visualizationObjects.particle) {
-                    const r = parameters.r || 5;
-                    const omega = parameters.omega || 1;
-                    const h = parameters.h || 2;
-                    
-                    const x = r * Math.cos(omega * time);
-                    const y = r * Math.sin(omega * time);
-                    const z = h * time;
-                    
-                    visualizationObjects.particle.position.set(x, y, z);
-                    
-                    // 更新螺旋轨迹
-                    const helixPoints = [];
-                    for (let t = 0; t <= time + 5; t += 0.1) {
-                        const hx = r * Math.cos(omega * t);
-                        const hy = r * Math.sin(omega * t);
-                        const hz = h * t;
-                        helixPoints.push(new THREE.Vector3(hx, hy, hz));
+                    // 粒子位置和螺旋窗口的采样点都由 worker 计算，这里只拷贝到顶点数组
+                    visualizationObjects.particle.position.set(state[0], state[1], state[2]);
+                    copyStatePoints(visualizationObjects.helixCurve, state, 4, state[3]);
+                }
+            """,
+            "11": """
+                // 运动电荷磁场：速度在扫描范围内往返（每秒两档），γ 增大时场向垂直于运动方向的平面压缩
+                if (visualizationObjects.fieldVectors) {
+                    const fieldVectors = visualizationObjects.fieldVectors;
+                    const sweep = fieldVectors.userData.sweep;
+                    const steps = sweep.velocities.length;
+                    const phase = Math.floor(time * 2) % (2 * steps - 2);
+                    const frame = phase < steps ? phase : 2 * steps - 2 - phase;
+                    if (frame !== sweep.frame) {
+                        sweep.frame = frame;
+                        const size = fieldVectors.count * 3;
+                        setInstancedArrows(fieldVectors, sweep.positions,
+                                           sweep.vectors.subarray(frame * size, (frame + 1) * size), sweep.options);
                     }
-                    
-                    const newGeometry = new THREE.BufferGeometry().setFromPoints(helixPoints);
-                    visualizationObjects.helixCurve.geometry.dispose();
-                    visualizationObjects.helixCurve.geometry = newGeometry;
                 }
-            """
+            """,
         }
         
         return animation_map.get(formula['id'], """
@@ -1004,7 +685,7 @@ class UnifiedFieldVisualizationGenerator:
 ## 📊 技术特性
 
 - **渲染引擎**: WebGL + Three.js
-- **数学渲染**: MathJax 3.0
+- **数学渲染**: 构建时预渲染的内联 SVG（无法预渲染时使用 MathJax 3.0）
 - **响应式设计**: 支持移动设备
 - **高性能**: 60fps流畅动画
 
@@ -1036,17 +717,10 @@ class UnifiedFieldVisualizationGenerator:
         # 这里可以更新主索引页面，添加更多功能
         pass
 
-# 主程序
-if __name__ == "__main__":
-    generator = UnifiedFieldVisualizationGenerator()
-    generator.generate_all_visualizations()    
- 
-   def get_gravity_field_viz(self):
-        """引力场定义方程可视化"""
-        return """
-            // 创建引力场线可视化
-            const fieldLineGroup = new THREE.Group();
-            
+    def get_gravity_field_viz(self):
+        """引力场定义方程可视化（场线和场矢量箭头的数据由生成器给出，各一次绘制调用）"""
+        buffers = gravity_field_buffers()
+        return compile_template("""
             // 创建中心质量
             const massGeometry = new THREE.SphereGeometry(1, 32, 16);
             const massMaterial = new THREE.MeshPhongMaterial({ 
@@ -1057,53 +731,24 @@ if __name__ == "__main__":
             scene.add(centralMass);
             visualizationObjects.centralMass = centralMass;
             
-            // 创建引力场线
-            for (let i = 0; i < 20; i++) {
-                const phi = (i / 20) * Math.PI * 2;
-                const fieldLine = [];
-                
-                for (let r = 2; r <= 15; r += 0.5) {
-                    const x = r * Math.cos(phi);
-                    const y = 0;
-                    const z = r * Math.sin(phi);
-                    fieldLine.push(new THREE.Vector3(x, y, z));
-                }
-                
-                const lineGeometry = new THREE.BufferGeometry().setFromPoints(fieldLine);
-                const lineMaterial = new THREE.LineBasicMaterial({ 
-                    color: 0x00ff88, 
-                    opacity: 0.7, 
-                    transparent: true 
-                });
-                const line = new THREE.Line(lineGeometry, lineMaterial);
-                fieldLineGroup.add(line);
-            }
-            
-            // 垂直方向的场线
-            for (let i = 0; i < 10; i++) {
-                const theta = (i / 10) * Math.PI;
-                const fieldLine = [];
-                
-                for (let r = 2; r <= 15; r += 0.5) {
-                    const x = r * Math.sin(theta);
-                    const y = r * Math.cos(theta);
-                    const z = 0;
-                    fieldLine.push(new THREE.Vector3(x, y, z));
-                }
-                
-                const lineGeometry = new THREE.BufferGeometry().setFromPoints(fieldLine);
-                const lineMaterial = new THREE.LineBasicMaterial({ 
-                    color: 0x00ff88, 
-                    opacity: 0.7, 
-                    transparent: true 
-                });
-                const line = new THREE.Line(lineGeometry, lineMaterial);
-                fieldLineGroup.add(line);
-            }
-            
+            // 创建引力场线（水平 20 条、竖直 10 条，合并为一个 LineSegments）
+            const fieldLineGroup = createFieldLineSegments("{{FIELD_LINES}}", new THREE.LineBasicMaterial({ 
+                color: 0x00ff88, 
+                opacity: 0.7, 
+                transparent: true 
+            }));
             scene.add(fieldLineGroup);
             visualizationObjects.fieldLineGroup = fieldLineGroup;
             
+            // 引力场矢量：{{INSTANCE_COUNT}} 个实例的 InstancedMesh
+            const fieldVectors = createInstancedArrows(
+                decodeFloat32("{{INSTANCE_POSITIONS}}"),
+                decodeFloat32("{{INSTANCE_VECTORS}}"),
+                { radius: 0.06, minLength: 0.2, maxLength: 0.9, opacity: 0.8, weakColor: 0x2244aa, strongColor: 0xffaa00 }
+            );
+            scene.add(fieldVectors);
+            visualizationObjects.fieldVectors = fieldVectors;
+            
             // 创建场强度可视化
             const fieldStrengthGeometry = new THREE.SphereGeometry(12, 64, 32);
             const fieldStrengthMaterial = new THREE.ShaderMaterial({
@@ -1149,7 +794,8 @@ if __name__ == "__main__":
             const fieldStrengthSphere = new THREE.Mesh(fieldStrengthGeometry, fieldStrengthMaterial);
             scene.add(fieldStrengthSphere);
             visualizationObjects.fieldStrengthSphere = fieldStrengthSphere;
-        """
+        """).render(FIELD_LINES=buffers['lines'], INSTANCE_COUNT=buffers['count'],
+                    INSTANCE_POSITIONS=buffers['positions'], INSTANCE_VECTORS=buffers['vectors'])
     
     def get_unified_force_viz(self):
         """宇宙大统一方程可视化"""
@@ -1387,8 +1033,9 @@ if __name__ == "__main__":
         """
     
     def get_electric_field_viz(self):
-        """电场定义方程可视化"""
-        return """
+        """电场定义方程可视化（场线和场矢量箭头的数据由生成器给出，各一次绘制调用）"""
+        buffers = electric_field_buffers()
+        return compile_template("""
             // 创建电荷
             const chargeGeometry = new THREE.SphereGeometry(0.8, 32, 16);
             const chargeMaterial = new THREE.MeshPhongMaterial({ 
@@ -1399,36 +1046,24 @@ if __name__ == "__main__":
             scene.add(charge);
             visualizationObjects.charge = charge;
             
-            // 创建电场线
-            const fieldLineGroup = new THREE.Group();
-            
-            for (let i = 0; i < 24; i++) {
-                const phi = (i / 24) * Math.PI * 2;
-                for (let j = 0; j < 12; j++) {
-                    const theta = (j / 12) * Math.PI;
-                    
-                    const fieldLine = [];
-                    for (let r = 1.5; r <= 12; r += 0.3) {
-                        const x = r * Math.sin(theta) * Math.cos(phi);
-                        const y = r * Math.sin(theta) * Math.sin(phi);
-                        const z = r * Math.cos(theta);
-                        fieldLine.push(new THREE.Vector3(x, y, z));
-                    }
-                    
-                    const lineGeometry = new THREE.BufferGeometry().setFromPoints(fieldLine);
-                    const lineMaterial = new THREE.LineBasicMaterial({ 
-                        color: 0x4488ff, 
-                        opacity: 0.6, 
-                        transparent: true 
-                    });
-                    const line = new THREE.Line(lineGeometry, lineMaterial);
-                    fieldLineGroup.add(line);
-                }
-            }
-            
+            // 创建电场线（径向线段合并为一个 LineSegments）
+            const fieldLineGroup = createFieldLineSegments("{{FIELD_LINES}}", new THREE.LineBasicMaterial({ 
+                color: 0x4488ff, 
+                opacity: 0.6, 
+                transparent: true 
+            }));
             scene.add(fieldLineGroup);
             visualizationObjects.electricFieldLines = fieldLineGroup;
             
+            // 电场矢量：{{INSTANCE_COUNT}} 个实例的 InstancedMesh
+            const fieldVectors = createInstancedArrows(
+                decodeFloat32("{{INSTANCE_POSITIONS}}"),
+                decodeFloat32("{{INSTANCE_VECTORS}}"),
+                { radius: 0.05, minLength: 0.15, maxLength: 0.8, opacity: 0.8, weakColor: 0x2233aa, strongColor: 0xff4444 }
+            );
+            scene.add(fieldVectors);
+            visualizationObjects.fieldVectors = fieldVectors;
+            
             // 创建电场强度可视化
             const fieldGeometry = new THREE.SphereGeometry(10, 64, 32);
             const fieldMaterial = new THREE.ShaderMaterial({
@@ -1495,11 +1130,13 @@ if __name__ == "__main__":
             const forceArrow = new THREE.Mesh(forceArrowGeometry, forceArrowMaterial);
             scene.add(forceArrow);
             visualizationObjects.forceArrow = forceArrow;
-        """
+        """).render(FIELD_LINES=buffers['lines'], INSTANCE_COUNT=buffers['count'],
+                    INSTANCE_POSITIONS=buffers['positions'], INSTANCE_VECTORS=buffers['vectors'])
     
     def get_magnetic_field_viz(self):
-        """磁场定义方程可视化"""
-        return """
+        """磁场定义方程可视化（场矢量箭头为生成器给出的含 γ 速度扫描，一次绘制调用，动画中按速度切换）"""
+        buffers = magnetic_sweep_buffers()
+        return compile_template("""
             // 创建电流导线
             const wireGeometry = new THREE.CylinderGeometry(0.1, 0.1, 20, 16);
             const wireMaterial = new THREE.MeshPhongMaterial({ 
@@ -1523,43 +1160,43 @@ if __name__ == "__main__":
             scene.add(currentIndicator);
             visualizationObjects.currentIndicator = currentIndicator;
             
-            // 创建磁场线（圆形）
+            // 创建磁场线（圆形，绕运动方向 x 轴）
             const magneticFieldGroup = new THREE.Group();
+            const circleMaterial = new THREE.MeshBasicMaterial({ 
+                color: 0x00ff88, 
+                transparent: true, 
+                opacity: 0.7,
+                side: THREE.DoubleSide
+            });
             
             for (let i = 1; i <= 8; i++) {
                 const radius = i * 1.5;
                 const circleGeometry = new THREE.RingGeometry(radius - 0.05, radius + 0.05, 64);
-                const circleMaterial = new THREE.MeshBasicMaterial({ 
-                    color: 0x00ff88, 
-                    transparent: true, 
-                    opacity: 0.7 
-                });
                 const circle = new THREE.Mesh(circleGeometry, circleMaterial);
-                circle.rotation.x = Math.PI / 2;
+                circle.rotation.y = Math.PI / 2;
                 magneticFieldGroup.add(circle);
-                
-                // 添加方向指示箭头
-                for (let j = 0; j < 8; j++) {
-                    const angle = (j / 8) * Math.PI * 2;
-                    const arrowGeometry = new THREE.ConeGeometry(0.1, 0.3, 6);
-                    const arrowMaterial = new THREE.MeshPhongMaterial({ color: 0x00ff88 });
-                    const arrow = new THREE.Mesh(arrowGeometry, arrowMaterial);
-                    
-                    arrow.position.set(
-                        radius * Math.cos(angle),
-                        0,
-                        radius * Math.sin(angle)
-                    );
-                    arrow.rotation.y = angle + Math.PI / 2;
-                    arrow.rotation.x = Math.PI / 2;
-                    
-                    magneticFieldGroup.add(arrow);
-                }
             }
             
             scene.add(magneticFieldGroup);
             visualizationObjects.magneticFieldGroup = magneticFieldGroup;
             
+            // 磁场矢量（方向指示箭头）：网格上 {{INSTANCE_COUNT}} 个实例的 InstancedMesh，
+            // 每个速度一组场矢量（公式11 含 γ 的求值结果），动画中按速度切换
+            const sweepPositions = decodeFloat32("{{INSTANCE_POSITIONS}}");
+            const sweepVectors = decodeFloat32("{{INSTANCE_VECTORS}}");
+            const arrowOptions = { radius: 0.05, minLength: 0.15, maxLength: 0.7, opacity: 0.85, weakColor: 0x115533, strongColor: 0x88ff44 };
+            const fieldVectors = createInstancedArrows(sweepPositions, sweepVectors.subarray(0, {{INSTANCE_COUNT}} * 3), arrowOptions);
+            fieldVectors.userData.sweep = {
+                positions: sweepPositions,
+                vectors: sweepVectors,
+                velocities: {{SWEEP_VELOCITIES}},
+                gamma: {{SWEEP_GAMMA}},
+                options: arrowOptions,
+                frame: 0
+            };
+            scene.add(fieldVectors);
+            visualizationObjects.fieldVectors = fieldVectors;
+            
             // 创建磁场强度可视化
             const magneticFieldGeometry = new THREE.CylinderGeometry(12, 12, 0.5, 64, 1, true);
             const magneticFieldMaterial = new THREE.ShaderMaterial({
@@ -1626,7 +1263,9 @@ if __name__ == "__main__":
             const lorentzForce = new THREE.Mesh(lorentzForceGeometry, lorentzForceMaterial);
             scene.add(lorentzForce);
             visualizationObjects.lorentzForce = lorentzForce;
-        """
+        """).render(INSTANCE_COUNT=buffers['count'], INSTANCE_POSITIONS=buffers['positions'],
+                    INSTANCE_VECTORS=buffers['vectors'], SWEEP_VELOCITIES=json.dumps(buffers['velocities']),
+                    SWEEP_GAMMA=json.dumps([round(g, 6) for g in buffers['gamma']]))
     
     def get_lightspeed_propulsion_viz(self):
         """光速飞行器动力学方程可视化"""
@@ -1975,4 +1614,9 @@ if __name__ == "__main__":
             const energyFlow = new THREE.Points(energyFlowGeometry, energyFlowMaterial);
             scene.add(energyFlow);
             visualizationObjects.energyFlow = energyFlow;
-        """
\ No newline at end of file
+        """
+
+# 主程序
+if __name__ == "__main__":
+    generator = UnifiedFieldVisualizationGenerator()
+    generator.generate_all_visualizations()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容哈希共享资源包
+Content-Hashed Shared Asset Bundle
+
+所有页面共用的 CSS / JS 写成一份共享文件，文件名带内容哈希（如 ufv.3f2a9c1d04be.css）：
+    - 页面只保留 <link> / <script src>，体积大幅减小
+    - 内容不变时文件名不变，浏览器可以跨页面、跨版本长期缓存
+    - 内容变化时文件名随之变化，页面引用自动更新，不存在缓存过期问题
+    - 旧哈希的同名资源（连同其 .gz / .br）在写出新版本时清理
+    - 传入 optimizer 时资源先压缩再计算哈希，并写出预压缩版本
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from 并行生成 import atomic_write
+from 输出优化 import OutputOptimizer, remove_compressed
+
+HASH_LENGTH = 12
+
+
+class AssetBundle:
+    """一组共享资源（按类型 css / js），文件名 = 名称.内容哈希.类型"""
+
+    def __init__(self, name: str, optimizer: Optional[OutputOptimizer] = None, **contents: str):
+        self.name = name
+        self.optimizer = optimizer
+        self.contents = {kind: content for kind, content in contents.items() if content}
+        if optimizer is not None:
+            self.contents = {kind: optimizer.minify(f"{name}.{kind}", content)
+                             for kind, content in self.contents.items()}
+        self.filenames: Dict[str, str] = {}
+        for kind, content in self.contents.items():
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+            self.filenames[kind] = f"{name}.{digest}.{kind}"
+
+    def url(self, kind: str, asset_dir: Path, page_dir: Path) -> str:
+        """从页面所在目录到资源文件的相对 URL"""
+        return Path(os.path.relpath(Path(asset_dir) / self.filenames[kind], page_dir)).as_posix()
+
+    def write(self, asset_dir: Path) -> List[Path]:
+        """写出资源文件（已存在的同哈希文件跳过），并删除同名资源的旧哈希版本"""
+        asset_dir = Path(asset_dir)
+        asset_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for kind, filename in self.filenames.items():
+            for stale in asset_dir.glob(f"{self.name}.*.{kind}"):
+                if stale.name != filename and len(stale.suffixes) == 2:
+                    stale.unlink()
+                    remove_compressed(stale)
+            path = asset_dir / filename
+            if not path.exists():
+                atomic_write(path, self.contents[kind])
+                written.append(path)
+            variants = self.optimizer.compress(filename, self.contents[kind].encode('utf-8')) \
+                if self.optimizer is not None else {}
+            for suffix, blob in variants.items():
+                sibling = path.with_name(filename + suffix)
+                if not sibling.exists():
+                    atomic_write(sibling, blob)
+                    written.append(sibling)
+            remove_compressed(path, keep=variants)
+        return written
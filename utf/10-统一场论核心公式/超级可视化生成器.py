@@ -7,351 +7,77 @@
 """
 
 import os
-import json
 from pathlib import Path
 
+from 公式存储 import get_store
+from 并行生成 import format_report, generate_parallel, write_formula_folder
+from 资源包 import AssetBundle
+from 第三方库 import VENDOR_DIR, VendoredLibraries
+from 公式预渲染 import LatexPrerenderer
+from 输出优化 import OutputOptimizer, format_size_report
+from 页面模板 import SUPER_PAGE, SUPER_STYLE
+
 class SuperVisualizationGenerator:
-    def __init__(self):
-        self.base_path = Path("utf/统一场论核心公式")
+    def __init__(self, base_path=None, optimize=False, vendor=False, prerender=True):
+        self.base_path = Path(base_path) if base_path else Path(__file__).parent
         self.formulas = self.load_formulas()
+        # optimize=True 时压缩页面和样式，并写出 .gz / .br 预压缩文件
+        self.optimizer = OutputOptimizer() if optimize else None
+        self.assets = AssetBundle("ufv-super", self.optimizer, css=SUPER_STYLE)
+        # vendor=True（或本地库目录）时 three.js、MathJax 等从 assets/ 加载，页面不访问 CDN
+        self.vendor = VendoredLibraries(VENDOR_DIR if vendor is True else vendor, self.optimizer) if vendor else None
+        # prerender=True 时公式在构建时预渲染为内联 SVG，页面不再加载 MathJax
+        self.prerenderer = LatexPrerenderer(enabled=prerender)
         
     def load_formulas(self):
-        """加载所有公式信息"""
-        return [
-            {
-                "id": "01", "name": "时空同一化方程", "icon": "🌌",
-                "formula_latex": r"r⃗(t)=C⃗t=xi⃗+yj⃗+zk⃗",
-                "formula_unicode": "r⃗(t)=C⃗t=xi⃗+yj⃗+zk⃗",
-                "description": "描述时空的统一性，空间位置矢量与时间的线性关系",
-                "physics_concepts": ["时空统一", "光速不变", "相对论"],
-                "math_concepts": ["矢量代数", "线性变换", "三维几何"],
-                "parameters": [
-                    {"name": "speed", "type": "float", "default": 1.0, "range": [0.1, 3.0]},
-                    {"name": "direction", "type": "vector3", "default": [1, 0, 0], "range": [-2, 2]}
-                ]
-            },
-            {
-                "id": "02", "name": "三维螺旋时空方程", "icon": "🌀",
-                "formula_latex": r"r⃗(t) = r\cos\omega t \cdot i⃗ + r\sin\omega t \cdot j⃗ + ht \cdot k⃗",
-                "formula_unicode": "r⃗(t) = r cos ωt·i⃗ + r sin ωt·j⃗ + ht·k⃗",
-                "description": "描述螺旋形时空轨迹，结合圆周运动和直线运动",
-                "physics_concepts": ["螺旋运动", "角频率", "时空几何"],
-                "math_concepts": ["参数方程", "三角函数", "螺旋线"],
-                "parameters": [
-                    {"name": "radius", "type": "float", "default": 5.0, "range": [1.0, 10.0]},
-                    {"name": "omega", "type": "float", "default": 1.0, "range": [0.1, 3.0]},
-                    {"name": "height", "type": "float", "default": 2.0, "range": [0.5, 5.0]}
-                ]
-            }
-        ]
+        """加载所有公式信息（共享的公式存储，按依赖顺序）"""
+        self.store = get_store()
+        return self.store.formulas()
     
-    def generate_all_visualizations(self):
-        """生成所有19个公式的可视化"""
+    def generate_all_visualizations(self, workers=None):
+        """生成所有19个公式的可视化（进程池并行渲染，workers=1 时顺序生成），返回耗时报告"""
         print("🚀 开始生成张祥前统一场论核心公式可视化系统...")
         
-        # 创建完整的公式列表
-        all_formulas = self.create_complete_formula_list()
-        
-        for formula in all_formulas:
-            print(f"📐 正在生成: {formula['id']}-{formula['name']}")
-            self.generate_single_visualization(formula)
+        # 共享样式只写一份，页面通过带哈希的文件名引用
+        self.assets.write(self.base_path / "assets")
+        if self.vendor is not None:
+            self.vendor.write(self.base_path / "assets")
+        report = generate_parallel(self, self.formulas, workers)
+        for record in report['formulas']:
+            print(f"✅ 已生成: {record['target']}/visualization.html")
             
+        print(format_report(report))
+        if self.optimizer is not None:
+            print(format_size_report(report['formulas']))
         print("✅ 所有可视化生成完成！")
+        return report
     
-    def create_complete_formula_list(self):
-        """创建完整的19个公式列表"""
-        formulas = [
-            {
-                "id": "01", "name": "时空同一化方程", "icon": "🌌",
-                "formula_latex": r"\vec{r}(t)=\vec{C}t=x\vec{i}+y\vec{j}+z\vec{k}",
-                "description": "描述时空的统一性，空间位置矢量与时间的线性关系"
-            },
-            {
-                "id": "02", "name": "三维螺旋时空方程", "icon": "🌀", 
-                "formula_latex": r"\vec{r}(t) = r\cos\omega t \cdot \vec{i} + r\sin\omega t \cdot \vec{j} + ht \cdot \vec{k}",
-                "description": "描述螺旋形时空轨迹，结合圆周运动和直线运动"
-            }
-        ]
-        # 继续添加其他17个公式
-        formulas.extend([
-            {
-                "id": "03", "name": "质量定义方程", "icon": "⚖️",
-                "formula_latex": r"m = k \cdot \frac{dn}{d\Omega}",
-                "description": "通过立体角中的矢量条数密度定义质量"
-            },
-            {
-                "id": "04", "name": "引力场定义方程", "icon": "🌍",
-                "formula_latex": r"\overrightarrow{A}=-Gk\frac{\Delta n}{\Delta s}\frac{\overrightarrow{r}}{r}",
-                "description": "定义引力场强度与空间矢量条数梯度的关系"
-            },
-            {
-                "id": "05", "name": "静止动量方程", "icon": "⚡",
-                "formula_latex": r"\overrightarrow{p}_{0}=m_{0}\overrightarrow{C}_{0}",
-                "description": "静止物体的动量定义"
-            },
-            {
-                "id": "06", "name": "运动动量方程", "icon": "🚀",
-                "formula_latex": r"\overrightarrow{P}=m(\overrightarrow{C}-\overrightarrow{V})",
-                "description": "运动物体的动量修正公式"
-            },
-            {
-                "id": "07", "name": "宇宙大统一方程", "icon": "🌌",
-                "formula_latex": r"F = \frac{d\vec{P}}{dt} = \vec{C}\frac{dm}{dt} - \vec{V}\frac{dm}{dt} + m\frac{d\vec{C}}{dt} - m\frac{d\vec{V}}{dt}",
-                "description": "统一描述宇宙中所有力的基本方程"
-            },
-            {
-                "id": "08", "name": "空间波动方程", "icon": "〰️",
-                "formula_latex": r"\frac{\partial^2 L}{\partial x^2} + \frac{\partial^2 L}{\partial y^2} + \frac{\partial^2 L}{\partial z^2} = \frac{1}{c^2} \frac{\partial^2 L}{\partial t^2}",
-                "description": "描述空间中波动现象的基本方程"
-            },
-            {
-                "id": "09", "name": "电荷定义方程", "icon": "⚡",
-                "formula_latex": r"q=k^{\prime}k\frac{1}{\Omega^{2}}\frac{d\Omega}{dt}",
-                "description": "通过立体角变化率定义电荷"
-            },
-            {
-                "id": "10", "name": "电场定义方程", "icon": "🔌",
-                "formula_latex": r"\vec{E}=-\frac{kk^{\prime}}{4\pi\epsilon_0\Omega^2}\frac{d\Omega}{dt}\frac{\vec{r}}{r^3}",
-                "description": "电场强度与立体角变化的关系"
-            },
-            {
-                "id": "11", "name": "磁场定义方程", "icon": "🧲",
-                "formula_latex": r"\vec{B}=\frac{\mu_{0} \gamma k k^{\prime}}{4 \pi \Omega^{2}} \frac{d \Omega}{d t} \frac{[(x-v t) \vec{i}+y \vec{j}+z \vec{k}]}{\left[\gamma^{2}(x-v t)^{2}+y^{2}+z^{2}\right]^{\frac{3}{2}}}",
-                "description": "磁场与运动电荷的相对论性关系"
-            },
-            {
-                "id": "12", "name": "变化引力场产生电磁场", "icon": "🔄",
-                "formula_latex": r"\frac{\partial^{2}\overline{A}}{\partial t^{2}}=\frac{\overline{V}}{f}\left(\overline{\nabla}\cdot\overline{E}\right)-\frac{C^{2}}{f}\left(\overline{\nabla}\times\overline{B}\right)",
-                "description": "变化的引力场如何产生电磁场"
-            },
-            {
-                "id": "13", "name": "磁矢势方程", "icon": "🌀",
-                "formula_latex": r"\vec{\nabla} \times \vec{A} = \frac{\vec{B}}{f}",
-                "description": "磁矢势与磁场的关系"
-            },
-            {
-                "id": "14", "name": "变化引力场产生电场", "icon": "⚡",
-                "formula_latex": r"\vec{E}=-f\frac{d\vec{A}}{dt}",
-                "description": "变化的引力场产生电场的机制"
-            },
-            {
-                "id": "15", "name": "变化磁场产生引力场和电场", "icon": "🔄",
-                "formula_latex": r"\frac{d\overrightarrow{B}}{dt}=\frac{-\overrightarrow{A}\times\overrightarrow{E}}{c^2}-\frac{\overrightarrow{V}}{c^{2}}\times\frac{d\overrightarrow{E}}{dt}",
-                "description": "变化磁场产生引力场和电场的耦合关系"
-            },
-            {
-                "id": "16", "name": "统一场论能量方程", "icon": "💫",
-                "formula_latex": r"e = m_0 c^2 = mc^2\sqrt{1 - \frac{v^2}{c^2}}",
-                "description": "能量与质量的统一关系"
-            },
-            {
-                "id": "17", "name": "光速飞行器动力学方程", "icon": "🛸",
-                "formula_latex": r"\vec{F} = (\vec{C} - \vec{V})\frac{dm}{dt}",
-                "description": "光速飞行器的推进动力学原理"
-            },
-            {
-                "id": "18", "name": "空间波动通解", "icon": "〰️",
-                "formula_latex": r"L(r,t) = f(t-r/c) + g(t+r/c)",
-                "description": "空间波动方程的通解形式"
-            },
-            {
-                "id": "19", "name": "引力光速统一方程", "icon": "🌟",
-                "formula_latex": r"Z = \frac{Gc}{2}",
-                "description": "引力常数与光速的统一关系"
-            }
-        ])
-        
-        return formulas
+    def render_formula_files(self, formula):
+        """渲染单个公式文件夹的全部文件（只计算内容，不写文件）"""
+        return {"visualization.html": self.create_html_visualization(formula)}
     
     def generate_single_visualization(self, formula):
-        """为单个公式生成完整的可视化"""
-        folder_name = f"{formula['id']}-{formula['name']}"
-        folder_path = self.base_path / folder_name
-        
-        # 确保文件夹存在
-        folder_path.mkdir(exist_ok=True)
-        
-        # 生成HTML可视化
-        html_content = self.create_html_visualization(formula)
-        with open(folder_path / "visualization.html", 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        print(f"✅ 已生成: {folder_name}/visualization.html")
+        """为单个公式生成完整的可视化（原子写入）"""
+        record = write_formula_folder(self, formula)
+        print(f"✅ 已生成: {record['target']}/visualization.html")
+        return record
     
     def create_html_visualization(self, formula):
-        """创建HTML可视化代码"""
-        
-        # 根据公式ID选择特定的可视化代码
-        viz_code = self.get_visualization_code(formula['id'])
-        
-        html_template = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{formula['name']} - 张祥前统一场论可视化</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            background: linear-gradient(135deg, #0c0c0c 0%, #1a1a2e 50%, #16213e 100%);
-            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            overflow: hidden; color: white; height: 100vh;
-        }}
-        
-        #canvas {{ 
-            display: block; cursor: grab; width: 100%; height: 100%;
-            background: radial-gradient(circle at center, #1a1a2e 0%, #0c0c0c 100%);
-        }}
-        
-        .ui-panel {{
-            position: absolute; background: rgba(0, 0, 0, 0.85);
-            backdrop-filter: blur(20px); border: 1px solid rgba(255, 255, 255, 0.1);
-            border-radius: 15px; padding: 20px; 
-            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.6);
-            transition: all 0.3s ease;
-        }}
-        
-        .ui-panel:hover {{ transform: translateY(-2px); }}
-        
-        #info-panel {{ 
-            top: 20px; left: 20px; width: 420px; max-height: 80vh; overflow-y: auto;
-        }}
-        
-        #controls-panel {{ 
-            top: 20px; right: 20px; width: 320px;
-        }}
-        
-        .panel-title {{
-            font-size: 1.4em; font-weight: bold; margin-bottom: 15px;
-            background: linear-gradient(45deg, #667eea, #764ba2, #f093fb);
-            background-clip: text; -webkit-background-clip: text; 
-            -webkit-text-fill-color: transparent;
-        }}
-        
-        .formula-display {{
-            background: rgba(255, 255, 255, 0.05); padding: 15px; border-radius: 10px;
-            margin: 10px 0; border-left: 4px solid #667eea;
-        }}
-        
-        .parameter-control {{
-            margin: 10px 0; display: flex; align-items: center; gap: 10px;
-        }}
-        
-        .parameter-control label {{
-            min-width: 80px; font-size: 0.9em; color: #ccc;
-        }}
-        
-        .parameter-control input[type="range"] {{
-            flex: 1; height: 6px; border-radius: 3px;
-            background: linear-gradient(90deg, #667eea, #764ba2);
-            outline: none; -webkit-appearance: none;
-        }}
-        
-        .parameter-value {{
-            min-width: 60px; text-align: right; font-family: monospace;
-            background: rgba(255,255,255,0.1); padding: 2px 8px; border-radius: 4px;
-        }}
-        
-        .control-button {{
-            background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
-            border: none; padding: 12px 24px; border-radius: 25px; 
-            cursor: pointer; margin: 5px; font-size: 0.9em;
-            transition: all 0.3s ease; font-weight: 500;
-        }}
-        
-        .control-button:hover {{ 
-            transform: translateY(-2px); 
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
-        }}
-        
-        .physics-insight {{
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1), rgba(118, 75, 162, 0.1));
-            border: 1px solid rgba(102, 126, 234, 0.3); padding: 15px; 
-            border-radius: 10px; margin: 15px 0;
-        }}
-        
-        .loading-screen {{
-            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
-            background: linear-gradient(135deg, #0c0c0c, #1a1a2e);
-            display: flex; flex-direction: column; justify-content: center; align-items: center;
-            z-index: 1000; transition: opacity 0.5s ease;
-        }}
-        
-        .loading-spinner {{
-            width: 60px; height: 60px; border: 4px solid rgba(255,255,255,0.1);
-            border-top: 4px solid #667eea; border-radius: 50%;
-            animation: spin 1s linear infinite; margin-bottom: 20px;
-        }}
-        
-        @keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}
-        
-        .fade-out {{ opacity: 0; pointer-events: none; }}
-    </style>
-    
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
-    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
-    <script>
-        window.MathJax = {{
-            tex: {{ inlineMath: [['$', '$'], ['\\\\(', '\\\\)']] }},
-            svg: {{ fontCache: 'global' }}
-        }};
-    </script>
-</head>
-<body>
-    <div id="loadingScreen" class="loading-screen">
-        <div class="loading-spinner"></div>
-        <h2>正在加载 {formula['name']} 可视化...</h2>
-        <p>张祥前统一场论 - 高级3D可视化系统</p>
-    </div>
+        """创建HTML可视化代码（预编译模板）"""
+        page_dir = self.base_path / f"{formula['id']}-{formula['name']}"
+        formula_math, math_scripts = self.prerenderer.display(formula['formula_latex'], delimiter='$')
+        html = SUPER_PAGE.render(
+            STYLESHEET=self.assets.url('css', self.base_path / "assets", page_dir),
+            FORMULA_NAME=formula['name'],
+            FORMULA_ICON=formula['icon'],
+            FORMULA_MATH=formula_math,
+            MATH_SCRIPTS=math_scripts,
+            FORMULA_DESCRIPTION=formula['description'],
+            # 根据公式ID选择特定的可视化代码
+            VISUALIZATION_CODE=self.get_visualization_code(formula['id']),
+        )
+        return self.vendor.rewrite(html, self.base_path / "assets", page_dir) if self.vendor else html
     
-    <canvas id="canvas"></canvas>
-    
-    <div id="info-panel" class="ui-panel">
-        <div class="panel-title">{formula['icon']} {formula['name']}</div>
-        
-        <div class="formula-display">
-            <strong>LaTeX公式：</strong><br>
-            ${formula['formula_latex']}$
-        </div>
-        
-        <p><strong>物理描述：</strong><br>{formula['description']}</p>
-        
-        <div class="physics-insight">
-            <h4>🔬 物理意义</h4>
-            <p>该公式是张祥前统一场论的核心组成部分，揭示了宇宙基本规律的深层结构。</p>
-        </div>
-    </div>
-    
-    <div id="controls-panel" class="ui-panel">
-        <div class="panel-title">🎮 交互控制</div>
-        
-        <div style="text-align: center; margin-bottom: 15px;">
-            <button class="control-button" onclick="toggleAnimation()">
-                <span id="playPauseIcon">▶️</span> <span id="playPauseText">开始</span>
-            </button>
-            <button class="control-button" onclick="resetVisualization()">🔄 重置</button>
-            <button class="control-button" onclick="toggleFullscreen()">🔍 全屏</button>
-        </div>
-        
-        <div class="physics-insight">
-            <h4>💡 操作提示</h4>
-            <p>• 鼠标拖拽旋转视角<br>
-            • 滚轮缩放场景<br>
-            • 点击按钮控制动画<br>
-            • 观察公式的几何表现</p>
-        </div>
-    </div>
-
-    <script>
-        {viz_code}
-    </script>
-</body>
-</html>"""
-        
-        return html_template    
-
     def get_visualization_code(self, formula_id):
         """根据公式ID返回对应的可视化JavaScript代码"""
         
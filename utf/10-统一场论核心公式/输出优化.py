@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成页面的压缩与预压缩
+Build-Time Minification and Precompressed Outputs
+
+可选的输出后处理阶段，面向静态文件服务器（nginx gzip_static / brotli_static 等）：
+    - 压缩 HTML（去注释、折叠空白）以及其中的内联 <style> / <script>
+    - 压缩独立的 CSS / JS 资源
+    - 为每个文本输出写出 .gz 兄弟文件，安装了 brotli 时再写 .br
+    - 记录每个页面压缩前后以及 gzip / brotli 后的大小
+压缩器是保守的：字符串、模板字符串、正则字面量原样保留，JS 只在不影响
+自动分号插入的位置删除换行，<pre> / <textarea> / 非 JS 的 <script> 不做改动。
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import gzip
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 所有可能写出的预压缩后缀（关闭压缩或内容变化时用于清理旧文件）
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+# 写出预压缩版本的文件类型
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json', '.svg', '.md')
+
+# 单独成行、两侧空白不影响排版的 HTML 元素
+BLOCK_TAGS = frozenset("""
+    html head body title meta link style script noscript base
+    div section article aside header footer nav main p pre blockquote
+    h1 h2 h3 h4 h5 h6 ul ol li dl dt dd table thead tbody tfoot tr th td
+    form fieldset legend canvas hr br figure figcaption details summary
+""".split())
+
+# 前一个有效字符为这些时，'/' 开始的是正则字面量而不是除号
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw', 'delete', 'new')
+
+# JS 中这些字符两侧的空格可以删除（'+'、'-'、'/'、'.' 除外：a - -b、a / /re/、1 .toString）
+_JS_TIGHT = set('{}()[];,:=<>!&|?*%^~')
+# 换行前是这些字符时语句必然未结束，可以删除换行（'+'、'-' 除外：x++ 换行 y）
+_JS_CONTINUES = set('{[(,;:=&|?<>!*%^~')
+# 换行后是这些字符时不会触发自动分号插入
+_JS_CLOSES = set('}]),;.?:')
+
+_CSS_TIGHT = set('{};,>')
+
+_HTML_SEGMENT = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style|pre|textarea)\b([^>]*)>(.*?)</\1\s*>',
+    re.DOTALL | re.IGNORECASE)
+_HTML_TAG_NAME = re.compile(r'</?([a-zA-Z][a-zA-Z0-9-]*)')
+_SCRIPT_TYPE = re.compile(r'''\btype\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+_JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+
+
+def _scan_string(text: str, start: int) -> int:
+    """从引号处开始，返回字符串字面量结束后的位置（模板字符串中的 ${...} 会递归跳过）"""
+    quote = text[start]
+    i = start + 1
+    depth = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\':
+            i += 2
+            continue
+        if quote == '`':
+            if depth == 0 and text.startswith('${', i):
+                depth = 1
+                i += 2
+                continue
+            if depth:
+                if char in '"\'`':
+                    i = _scan_string(text, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(char, 0)
+                i += 1
+                continue
+        if char == quote:
+            return i + 1
+        if char == '\n' and quote != '`':
+            return i
+        i += 1
+    return i
+
+
+def _scan_regex(text: str, start: int) -> int:
+    """从 '/' 开始，返回正则字面量（含标志）结束后的位置"""
+    i = start + 1
+    in_class = False
+    while i < len(text):
+        char = text[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            i += 1
+            while i < len(text) and (text[i].isalnum() or text[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _starts_regex(output: List[str]) -> bool:
+    """根据已输出内容判断下一个 '/' 是否开始正则字面量"""
+    tail = ''.join(output[-3:]).rstrip()
+    if not tail:
+        return True
+    if tail[-1] in _REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[A-Za-z_$][\w$]*$', tail)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def _join_whitespace(output: List[str], newline: bool, next_char: str, tight: set,
+                     continues: set = frozenset(), closes: set = frozenset()):
+    """在两个 token 之间补回必要的最少空白"""
+    previous = output[-1][-1] if output and output[-1] else ''
+    if not previous or not next_char:
+        return
+    if newline and previous not in continues and next_char not in closes:
+        output.append('\n')
+    elif previous not in tight and next_char not in tight:
+        output.append(' ')
+
+
+def minify_js(text: str) -> str:
+    """保守地压缩 JavaScript：删除注释和缩进，保留字符串、正则和必要的换行"""
+    output: List[str] = []
+    i, length = 0, len(text)
+    while i < length:
+        char = text[i]
+        if char in ' \t\r\n' or text.startswith('//', i) or text.startswith('/*', i):
+            # 连续的空白和注释合并成一个分隔
+            newline = False
+            while i < length:
+                if text[i] in ' \t\r':
+                    i += 1
+                elif text[i] == '\n':
+                    newline = True
+                    i += 1
+                elif text.startswith('//', i):
+                    end = text.find('\n', i)
+                    i = length if end < 0 else end
+                elif text.startswith('/*', i):
+                    end = text.find('*/', i + 2)
+                    newline = newline or '\n' in text[i:end]
+                    i = length if end < 0 else end + 2
+                else:
+                    break
+            _join_whitespace(output, newline, text[i] if i < length else '',
+                             _JS_TIGHT, _JS_CONTINUES, _JS_CLOSES)
+        elif char in '"\'`':
+            end = _scan_string(text, i)
+            output.append(text[i:end])
+            i = end
+        elif char == '/' and _starts_regex(output):
+            end = _scan_regex(text, i)
+            output.append(text[i:end])
+            i = end
+        else:
+            output.append(char)
+            i += 1
+    return ''.join(output).strip()
+
+
+def minify_css(text: str) -> str:
+    """压缩 CSS：删除注释，折叠空白，去掉 {};,> 两侧和 ':' 之后的空白以及末尾分号"""
+    output: List[str] = []
+    i, length = 0, len(text)
+    while i < length:
+        char = text[i]
+        if char in ' \t\r\n' or text.startswith('/*', i):
+            while i < length:
+                if text[i] in ' \t\r\n':
+                    i += 1
+                elif text.startswith('/*', i):
+                    end = text.find('*/', i + 2)
+                    i = length if end < 0 else end + 2
+                else:
+                    break
+            next_char = text[i] if i < length else ''
+            previous = output[-1][-1] if output and output[-1] else ''
+            if previous and next_char and previous not in _CSS_TIGHT and previous != ':' \
+                    and next_char not in _CSS_TIGHT:
+                output.append(' ')
+        elif char in '"\'':
+            end = _scan_string(text, i)
+            output.append(text[i:end])
+            i = end
+        elif char == '}' and output and output[-1] == ';':
+            output[-1] = '}'
+            i += 1
+        else:
+            output.append(char)
+            i += 1
+    return ''.join(output).strip()
+
+
+def _is_block(token: str) -> bool:
+    """token 是否为块级元素的标签（或 <!DOCTYPE>）"""
+    if token.startswith('<!'):
+        return True
+    match = _HTML_TAG_NAME.match(token)
+    return bool(match) and match.group(1).lower() in BLOCK_TAGS
+
+
+def _collapse_html_text(text: str, before: str, after: str) -> str:
+    """折叠标签之间文本的空白；紧邻块级元素一侧的空白整段删除"""
+    text = re.sub(r'\s+', ' ', text)
+    if not before or _is_block(before):
+        text = text.lstrip()
+    if not after or _is_block(after):
+        text = text.rstrip()
+    return text
+
+
+def _split_tags(text: str) -> List[str]:
+    """把普通 HTML 切成 文本, 标签, 文本, ... 的序列"""
+    return [piece for piece in re.split(r'(<[^>]*>)', text) if piece]
+
+
+def _minify_element(match: 're.Match') -> str:
+    """压缩内联 <style> / JS <script> 的内容，其余受保护元素原样返回"""
+    tag, attributes, body = match.group(1), match.group(2), match.group(3)
+    kind = tag.lower()
+    if kind == 'style':
+        body = minify_css(body)
+    elif kind == 'script':
+        script_type = _SCRIPT_TYPE.search(attributes)
+        if (script_type.group(1).lower() if script_type else '') in _JS_TYPES:
+            body = minify_js(body)
+    else:
+        return match.group(0)
+    return f"<{tag}{attributes}>{body}</{tag}>"
+
+
+def minify_html(text: str) -> str:
+    """压缩 HTML：删除注释（保留条件注释），折叠空白，压缩内联样式和脚本"""
+    tokens: List[str] = []
+    position = 0
+    for match in _HTML_SEGMENT.finditer(text):
+        tokens.extend(_split_tags(text[position:match.start()]))
+        segment = match.group(0)
+        if not segment.startswith('<!--'):
+            tokens.append(_minify_element(match))
+        elif segment.startswith('<!--['):
+            tokens.append(segment)
+        position = match.end()
+    tokens.extend(_split_tags(text[position:]))
+
+    # 删除注释后相邻的文本片段先合并
+    merged: List[str] = []
+    for token in tokens:
+        if merged and not token.startswith('<') and not merged[-1].startswith('<'):
+            merged[-1] += token
+        else:
+            merged.append(token)
+
+    output = []
+    for index, token in enumerate(merged):
+        if token.startswith('<'):
+            output.append(token)
+        else:
+            before = merged[index - 1] if index > 0 else ''
+            after = merged[index + 1] if index + 1 < len(merged) else ''
+            output.append(_collapse_html_text(token, before, after))
+    return ''.join(output).strip() + '\n'
+
+
+MINIFIERS = {'.html': minify_html, '.css': minify_css, '.js': minify_js}
+
+
+class OutputOptimizer:
+    """输出后处理：按文件类型压缩文本，并生成 gzip / brotli 预压缩版本"""
+
+    def __init__(self, minify: bool = True, compress: bool = True, level: int = 9):
+        self.minify_enabled = minify
+        self.compress_enabled = compress
+        self.level = level
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """影响输出内容的设置（用于构建指纹）"""
+        return {
+            'minify': self.minify_enabled,
+            'compress': self.compress_enabled,
+            'level': self.level,
+            'brotli': self.compress_enabled and brotli is not None,
+        }
+
+    def minify(self, name: str, content: str) -> str:
+        """按文件后缀压缩文本，不认识的类型原样返回"""
+        minifier = MINIFIERS.get(Path(name).suffix.lower())
+        if not self.minify_enabled or minifier is None:
+            return content
+        return minifier(content)
+
+    def compress(self, name: str, data: bytes) -> Dict[str, bytes]:
+        """返回 {后缀: 预压缩内容}；关闭压缩或文件类型不适合时返回空 dict"""
+        if not self.compress_enabled or Path(name).suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            return {}
+        # mtime=0：相同内容得到逐字节相同的 .gz，便于缓存和比较
+        variants = {'.gz': gzip.compress(data, compresslevel=self.level, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data, quality=11)
+        return variants
+
+    def process(self, name: str, content: str) -> Dict[str, Any]:
+        """压缩并预压缩一个文件，返回最终内容、预压缩版本和各阶段大小"""
+        raw = len(content.encode('utf-8'))
+        content = self.minify(name, content)
+        data = content.encode('utf-8')
+        variants = self.compress(name, data)
+        sizes = {'raw': raw, 'minified': len(data)}
+        sizes.update({suffix: len(blob) for suffix, blob in variants.items()})
+        return {'content': content, 'variants': variants, 'sizes': sizes}
+
+
+def remove_compressed(path: Path, keep: Iterable[str] = ()):
+    """删除文件过期的预压缩兄弟文件（keep 中的后缀保留）"""
+    path = Path(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if suffix not in keep:
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists():
+                sibling.unlink()
+
+
+def _format_size(size: Optional[int]) -> str:
+    return '—' if size is None else f"{size / 1024:.1f} KB"
+
+
+def format_size_report(records: Iterable[Dict[str, Any]]) -> str:
+    """每个页面压缩前后及 gzip / brotli 之后的大小报告"""
+    lines = [f"{'文件':<40} {'原始':>10} {'压缩后':>10} {'gzip':>10} {'brotli':>10}"]
+    totals: Dict[str, int] = {}
+    for record in records:
+        for name, sizes in record.get('sizes', {}).items():
+            label = f"{record['target']}/{name}"
+            lines.append(f"{label:<40} {_format_size(sizes['raw']):>10} {_format_size(sizes['minified']):>10} "
+                         f"{_format_size(sizes.get('.gz')):>10} {_format_size(sizes.get('.br')):>10}")
+            for key, size in sizes.items():
+                totals[key] = totals.get(key, 0) + size
+    if totals:
+        saved = 1 - totals['minified'] / totals['raw'] if totals['raw'] else 0.0
+        lines.append(f"{'合计':<40} {_format_size(totals['raw']):>10} {_format_size(totals['minified']):>10} "
+                     f"{_format_size(totals.get('.gz')):>10} {_format_size(totals.get('.br')):>10}")
+        lines.append(f"📦 压缩减少 {saved:.0%}"
+                     + (f"，gzip 传输量为原始的 {totals['.gz'] / totals['raw']:.0%}" if '.gz' in totals else ''))
+    return "\n".join(lines)
+
+
+def optimize_file(source: Path, destination: Path, optimizer: Optional[OutputOptimizer] = None) -> Dict[str, Any]:
+    """压缩单个已有文件（如手写的独立页面）到 destination，并写出预压缩版本"""
+    from 并行生成 import atomic_write
+
+    optimizer = optimizer or OutputOptimizer()
+    source, destination = Path(source), Path(destination)
+    result = optimizer.process(source.name, source.read_text(encoding='utf-8'))
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(destination, result['content'])
+    for suffix, blob in result['variants'].items():
+        atomic_write(destination.with_name(destination.name + suffix), blob)
+    remove_compressed(destination, keep=result['variants'])
+    return {'target': destination.parent.name, 'sizes': {destination.name: result['sizes']}}
+
+
+def main():
+    """主函数：压缩生成的页面和仓库中手写的独立页面，输出到 dist/"""
+    from 终极可视化生成器 import UnifiedFieldVisualizationGenerator
+
+    print("📦 生成页面压缩与预压缩")
+    print("=" * 50)
+    if brotli is None:
+        print("⚠️ 未安装 brotli，只写出 .gz")
+
+    output = Path(__file__).with_name('dist')
+    generator = UnifiedFieldVisualizationGenerator(output, optimize=True)
+    _, _, report = generator.generate_all_visualizations(force=True)
+
+    records = list(report['formulas'])
+    standalone = Path(__file__).parent.parent / '01-核心论文' / '引力光速统一方程' / 'code'
+    for page in sorted(standalone.glob('*.html')):
+        records.append(optimize_file(page, output / 'standalone' / page.name))
+    print(format_size_report(records))
+
+
+if __name__ == "__main__":
+    main()
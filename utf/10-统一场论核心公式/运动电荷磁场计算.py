@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运动场源磁场向量化计算（公式11）
+Vectorized Moving-Source Magnetic Field Evaluator
+
+磁场定义方程：
+    B = μ₀γkk'/(4πΩ²) · dΩ/dt · [(x-vt)i + yj + zk] / [γ²(x-vt)² + y² + z²]^{3/2}
+
+场源沿 x 轴以速度 v 运动。在三维网格上对一批速度求值：
+    - γ 对整批速度只计算一次
+    - 网格由三个一维坐标轴给出，y² + z² 与速度无关，只计算一次；
+      x - vt 是一维数组，分母通过广播组合，不需要三维的中间坐标数组
+    - mode='cross' 时使用毕奥-萨伐尔形式 v × R（与数据库中 qv×r/r³ 一致），
+      两种形式共享同一个分母
+    - 结果可写入 .npy 内存映射文件（animate_sweep 用 matplotlib 逐速度回放切片），
+      也可导出为 WebGL 直接读取的 float32 缓冲区；公式11 页面的箭头实例由 场矢量实例.magnetic_sweep_buffers 求值
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+MU0 = 4e-7 * np.pi
+
+MODES = ('radial', 'cross')
+
+
+class MovingSourceMagneticField:
+    """运动场源磁场计算器（场源沿 x 轴运动）"""
+
+    def __init__(self, x: Sequence[float], y: Sequence[float], z: Sequence[float],
+                 mu0: float = MU0, k: float = 1.0, k_prime: float = 1.0,
+                 omega: float = 1.0, d_omega_dt: float = 1.0, c: float = 1.0,
+                 mode: str = 'radial', dtype=np.float32):
+        if mode not in MODES:
+            raise ValueError(f"未知形式: {mode}，可选 {MODES}")
+        self.dtype = np.dtype(dtype)
+        self.x = np.asarray(x, dtype=self.dtype)
+        self.y = np.asarray(y, dtype=self.dtype)
+        self.z = np.asarray(z, dtype=self.dtype)
+        self.shape = (len(self.x), len(self.y), len(self.z))
+        self.c = c
+        self.mode = mode
+
+        # 常数因子 μ₀kk'/(4πΩ²) · dΩ/dt
+        self.prefactor = mu0 * k * k_prime * d_omega_dt / (4 * np.pi * omega ** 2)
+
+        # 与速度无关的横向距离平方 y² + z²，及各分量的广播视图
+        self._transverse2 = self.y[:, None] ** 2 + self.z[None, :] ** 2
+        self._y = self.y[None, :, None]
+        self._z = self.z[None, None, :]
+
+        self._denominator = np.empty(self.shape, dtype=self.dtype)
+        self._gamma_cache: Dict[float, float] = {}
+
+    def gamma(self, velocities) -> np.ndarray:
+        """洛伦兹因子 γ = 1/sqrt(1 - v²/c²)，按速度缓存"""
+        velocities = np.atleast_1d(np.asarray(velocities, dtype=np.float64))
+        if np.any(np.abs(velocities) >= self.c):
+            raise ValueError(f"速度必须小于 c = {self.c}")
+        missing = [v for v in velocities.tolist() if v not in self._gamma_cache]
+        if missing:
+            values = 1 / np.sqrt(1 - (np.array(missing) / self.c) ** 2)
+            self._gamma_cache.update(zip(missing, values.tolist()))
+        return np.array([self._gamma_cache[v] for v in velocities.tolist()])
+
+    def evaluate(self, v: float, t: float = 0.0, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        计算单个速度下的磁场
+
+        返回:
+            (nx, ny, nz, 3) 数组，分量在最后一维（可直接作为 WebGL 的 vec3 缓冲区）
+        """
+        if out is None:
+            out = np.empty(self.shape + (3,), dtype=self.dtype)
+        gamma = self.dtype.type(self.gamma(v)[0])
+
+        # 分母 [γ²(x-vt)² + y² + z²]^{3/2}，只有 x-vt 与速度有关
+        longitudinal = (self.x - self.dtype.type(v * t))
+        scaled = (gamma * longitudinal) ** 2
+        denominator = self._denominator
+        np.add(scaled[:, None, None], self._transverse2[None, :, :], out=denominator)
+        # 场源所在点分母为零，置为无穷大使该点磁场为零
+        denominator[denominator == 0] = np.inf
+        np.multiply(denominator, np.sqrt(denominator), out=denominator)
+        np.divide(self.dtype.type(self.prefactor) * gamma, denominator, out=denominator)
+        scale = denominator
+
+        if self.mode == 'radial':
+            np.multiply(scale, longitudinal[:, None, None], out=out[..., 0])
+            np.multiply(scale, self._y, out=out[..., 1])
+            np.multiply(scale, self._z, out=out[..., 2])
+        else:
+            # v × R，v 沿 x 轴：(0, -v z, v y)
+            out[..., 0] = 0
+            np.multiply(scale, -v * self._z, out=out[..., 1])
+            np.multiply(scale, v * self._y, out=out[..., 2])
+        return out
+
+    def iter_sweep(self, velocities: Sequence[float], t: float = 0.0) -> Iterator[Tuple[float, np.ndarray]]:
+        """逐个速度产出磁场，输出缓冲区复用，内存占用与速度个数无关"""
+        self.gamma(velocities)
+        buffer = np.empty(self.shape + (3,), dtype=self.dtype)
+        for v in velocities:
+            yield v, self.evaluate(v, t, out=buffer)
+
+    def sweep(self, velocities: Sequence[float], t: float = 0.0,
+              path: Optional[str] = None) -> np.ndarray:
+        """
+        对一批速度求值，返回 (V, nx, ny, nz, 3) 数组
+
+        给出 path 时写入 .npy 内存映射文件（旁边附 JSON 元数据），超过内存也可以运行
+        """
+        velocities = np.asarray(velocities, dtype=np.float64)
+        shape = (len(velocities),) + self.shape + (3,)
+        if path is None:
+            result = np.empty(shape, dtype=self.dtype)
+        else:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            result = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=shape)
+            self._write_metadata(path.with_suffix('.json'), velocities, t, 'npy')
+
+        for i, v in enumerate(velocities):
+            self.evaluate(v, t, out=result[i])
+        if path is not None:
+            result.flush()
+        return result
+
+    def export_webgl_buffer(self, field: np.ndarray, path: str, velocities: Sequence[float],
+                            t: float = 0.0, stride: int = 1):
+        """
+        把磁场导出为小端 float32 原始缓冲区（.bin）和 JSON 元数据，
+        浏览器端 fetch 后直接 new Float32Array(buffer) 使用，vec3 交错存放
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sampled = field[..., ::stride, ::stride, ::stride, :]
+        np.ascontiguousarray(sampled, dtype='<f4').tofile(path)
+        self._write_metadata(path.with_suffix('.json'), velocities, t, 'float32-le', stride,
+                             list(sampled.shape))
+
+    def _write_metadata(self, path: Path, velocities, t: float, layout: str,
+                        stride: int = 1, shape: Optional[list] = None):
+        """写出元数据：坐标轴范围、速度、γ 和数组形状"""
+        velocities = np.asarray(velocities, dtype=np.float64)
+        metadata = {
+            'formula': '11',
+            'mode': self.mode,
+            'layout': layout,
+            'shape': shape or [len(velocities)] + list(self.shape) + [3],
+            'stride': stride,
+            'axes': {name: [float(axis[0]), float(axis[::stride][-1]), len(axis[::stride])]
+                     for name, axis in (('x', self.x), ('y', self.y), ('z', self.z))},
+            'velocities': velocities.tolist(),
+            'gamma': self.gamma(velocities).tolist(),
+            'c': self.c,
+            't': t,
+            'prefactor': self.prefactor,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+def load_sweep(sweep_path: str) -> Tuple[np.ndarray, Dict]:
+    """以只读内存映射方式打开 sweep() 写出的 .npy，返回 (扫描数组, 元数据)"""
+    sweep_path = Path(sweep_path)
+    sweep = np.load(sweep_path, mmap_mode='r')
+    with open(sweep_path.with_suffix('.json'), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    return sweep, metadata
+
+
+def animate_sweep(sweep_path: str, axis: int = 2, index: Optional[int] = None, interval: int = 300):
+    """
+    用 matplotlib 逐个速度回放磁场强度切片（log₁₀|B|），返回 FuncAnimation（调用方 plt.show() 或 save）
+
+    每帧只从内存映射中读入一个速度的切片；γ 增大时场向垂直于运动方向的平面压缩
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    sweep, metadata = load_sweep(sweep_path)
+    if index is None:
+        index = sweep.shape[axis + 1] // 2
+    plane = [name for i, name in enumerate('xyz') if i != axis]
+    extent = []
+    for name in plane:
+        low, high, _ = metadata['axes'][name]
+        extent += [low, high]
+
+    def magnitude(frame):
+        B = np.take(sweep[frame], index, axis=axis)
+        with np.errstate(divide='ignore'):
+            return np.log10(np.linalg.norm(B, axis=-1))
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+    image = ax.imshow(magnitude(0).T, origin='lower', cmap='viridis', extent=extent)
+    fig.colorbar(image, ax=ax, label='log₁₀|B|')
+    ax.set_xlabel(plane[0])
+    ax.set_ylabel(plane[1])
+
+    def update(frame):
+        data = magnitude(frame)
+        finite = data[np.isfinite(data)]
+        image.set_data(data.T)
+        if finite.size:
+            image.set_clim(finite.min(), finite.max())
+        ax.set_title(f"公式11 运动场源磁场  v = {metadata['velocities'][frame]:.2f}c  "
+                     f"γ = {metadata['gamma'][frame]:.3f}")
+        return (image,)
+
+    update(0)
+    return FuncAnimation(fig, update, frames=sweep.shape[0], interval=interval, blit=False)
+
+
+def reference_field(x, y, z, v, t=0.0, prefactor=1.0, c=1.0):
+    """逐点直接按公式11计算（用于校验）"""
+    gamma = 1 / np.sqrt(1 - (v / c) ** 2)
+    X, Y, Z = np.meshgrid(x, y, z, indexing='ij')
+    R = np.stack([X - v * t, Y, Z], axis=-1)
+    denominator = (gamma ** 2 * (X - v * t) ** 2 + Y ** 2 + Z ** 2) ** 1.5
+    with np.errstate(divide='ignore', invalid='ignore'):
+        B = prefactor * gamma * R / denominator[..., None]
+    B[denominator == 0] = 0
+    return B
+
+
+def main():
+    """主函数：公式校验和速度扫描性能测试"""
+    print("🧲 运动场源磁场计算（公式11）")
+    print("=" * 50)
+
+    axis = np.linspace(-2, 2, 33)
+    field = MovingSourceMagneticField(axis, axis, axis, mu0=1.0, dtype=np.float64)
+    for v in (0.0, 0.5, 0.9):
+        expected = reference_field(axis, axis, axis, v, t=0.7, prefactor=field.prefactor)
+        error = np.max(np.abs(field.evaluate(v, t=0.7) - expected)) / np.max(np.abs(expected))
+        print(f"✅ v = {v}c: 与逐点公式的最大相对误差 {error:.1e}")
+
+    axis = np.linspace(-4, 4, 128)
+    field = MovingSourceMagneticField(axis, axis, axis)
+    velocities = np.linspace(0, 0.99, 100)
+    start = time.perf_counter()
+    peak = [float(np.abs(B).max()) for _, B in field.iter_sweep(velocities, t=0.5)]
+    elapsed = time.perf_counter() - start
+    print(f"⚡ 128³ 网格 × {len(velocities)} 个速度: {elapsed:.2f} s，"
+          f"峰值 |B| 从 {peak[0]:.3g} 增至 {peak[-1]:.3g}")
+
+    output = Path(__file__).with_name('magnetic_sweep.npy')
+    sweep = field.sweep(velocities[:4], path=output)
+    print(f"✅ 内存映射扫描结果: {output.name} {sweep.shape}")
+    del sweep
+    output.unlink()
+    output.with_suffix('.json').unlink()
+
+
+if __name__ == "__main__":
+    main()
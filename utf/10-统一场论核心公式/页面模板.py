@@ -0,0 +1,893 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公式可视化页面模板
+Formula Visualization Page Templates
+
+终极 / 超级可视化生成器使用的页面与脚本模板，由模板引擎预编译。
+各页面共用的样式和场景引擎脚本单独存放，由生成器写成带内容哈希的共享资源文件。
+插槽写作 {{SLOT_NAME}}，CSS / JS 的花括号按原样书写。
+公式由生成器在构建时预渲染为内联 SVG（FORMULA_MATH）；只有预渲染失败时
+才在 MATH_SCRIPTS 插槽放入 MathJax，并把公式写成交给 MathJax 的定界文本。
+
+Author: Advanced Visualization AI System
+Date: 2025-09-16
+"""
+
+from 模板引擎 import compile_template
+
+# 终极可视化生成器：所有页面共用的样式（写入 ufv.<hash>.css）
+ULTIMATE_STYLE = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            background: linear-gradient(135deg, #0c0c0c 0%, #1a1a2e 50%, #16213e 100%);
+            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
+            overflow: hidden; color: white; height: 100vh;
+        }
+        
+        #canvas { 
+            display: block; cursor: grab; width: 100%; height: 100%;
+            background: radial-gradient(circle at center, #1a1a2e 0%, #0c0c0c 100%);
+        }
+        
+        .ui-panel {
+            position: absolute; background: rgba(0, 0, 0, 0.85);
+            backdrop-filter: blur(20px); border: 1px solid rgba(255, 255, 255, 0.1);
+            border-radius: 15px; padding: 20px; 
+            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.6);
+            transition: all 0.3s ease;
+        }
+        
+        .ui-panel:hover { transform: translateY(-2px); }
+        
+        #info-panel { 
+            top: 20px; left: 20px; width: 420px; max-height: 80vh; overflow-y: auto;
+        }
+        
+        #controls-panel { 
+            top: 20px; right: 20px; width: 320px;
+        }
+        
+        #math-panel {
+            bottom: 20px; left: 20px; width: 500px;
+        }
+        
+        .panel-title {
+            font-size: 1.4em; font-weight: bold; margin-bottom: 15px;
+            background: linear-gradient(45deg, #667eea, #764ba2, #f093fb);
+            background-clip: text; -webkit-background-clip: text; 
+            -webkit-text-fill-color: transparent;
+            text-shadow: none;
+        }
+        
+        .formula-display {
+            background: rgba(255, 255, 255, 0.05); padding: 15px; border-radius: 10px;
+            margin: 10px 0; border-left: 4px solid #667eea;
+        }
+        
+        .parameter-control {
+            margin: 10px 0; display: flex; align-items: center; gap: 10px;
+        }
+        
+        .parameter-control label {
+            min-width: 80px; font-size: 0.9em; color: #ccc;
+        }
+        
+        .parameter-control input[type="range"] {
+            flex: 1; height: 6px; border-radius: 3px;
+            background: linear-gradient(90deg, #667eea, #764ba2);
+            outline: none; -webkit-appearance: none;
+        }
+        
+        .parameter-control input[type="range"]::-webkit-slider-thumb {
+            -webkit-appearance: none; width: 18px; height: 18px;
+            border-radius: 50%; background: #fff; cursor: pointer;
+            box-shadow: 0 2px 6px rgba(0,0,0,0.3);
+        }
+        
+        .parameter-value {
+            min-width: 60px; text-align: right; font-family: monospace;
+            background: rgba(255,255,255,0.1); padding: 2px 8px; border-radius: 4px;
+        }
+        
+        .control-button {
+            background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
+            border: none; padding: 12px 24px; border-radius: 25px; 
+            cursor: pointer; margin: 5px; font-size: 0.9em;
+            transition: all 0.3s ease; font-weight: 500;
+        }
+        
+        .control-button:hover { 
+            transform: translateY(-2px); 
+            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
+        }
+        
+        .control-button:active { transform: translateY(0); }
+        
+        .stats-display {
+            background: rgba(255, 255, 255, 0.05); padding: 10px; 
+            border-radius: 8px; margin: 10px 0; font-family: monospace;
+            font-size: 0.85em; line-height: 1.4;
+        }
+        
+        .physics-insight {
+            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1), rgba(118, 75, 162, 0.1));
+            border: 1px solid rgba(102, 126, 234, 0.3); padding: 15px; 
+            border-radius: 10px; margin: 15px 0;
+        }
+        
+        .physics-insight h4 {
+            color: #667eea; margin-bottom: 8px; font-size: 1.1em;
+        }
+        
+        .loading-screen {
+            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
+            background: linear-gradient(135deg, #0c0c0c, #1a1a2e);
+            display: flex; flex-direction: column; justify-content: center; align-items: center;
+            z-index: 1000; transition: opacity 0.5s ease;
+        }
+        
+        .loading-spinner {
+            width: 60px; height: 60px; border: 4px solid rgba(255,255,255,0.1);
+            border-top: 4px solid #667eea; border-radius: 50%;
+            animation: spin 1s linear infinite; margin-bottom: 20px;
+        }
+        
+        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+        
+        .fade-out { opacity: 0; pointer-events: none; }
+        
+        /* 响应式设计 */
+        @media (max-width: 768px) {
+            .ui-panel { width: calc(100% - 40px) !important; }
+            #controls-panel { top: auto; bottom: 20px; right: 20px; }
+            #math-panel { display: none; }
+        }
+"""
+
+# 终极可视化生成器：完整页面
+ULTIMATE_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{FORMULA_NAME}} - 张祥前统一场论可视化</title>
+    <link rel="stylesheet" href="{{STYLESHEET}}">
+    
+    <!-- 外部库 -->
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
+    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
+{{MATH_SCRIPTS}}</head>
+<body>
+    <!-- 加载屏幕 -->
+    <div id="loadingScreen" class="loading-screen">
+        <div class="loading-spinner"></div>
+        <h2>正在加载 {{FORMULA_NAME}} 可视化...</h2>
+        <p>张祥前统一场论 - 高级3D可视化系统</p>
+    </div>
+    
+    <!-- 主画布 -->
+    <canvas id="canvas"></canvas>
+    
+    <!-- 信息面板 -->
+    <div id="info-panel" class="ui-panel">
+        <div class="panel-title">{{FORMULA_ICON}} {{FORMULA_NAME}}</div>
+        
+        <div class="formula-display">
+            <strong>LaTeX公式：</strong><br>
+            {{FORMULA_MATH}}
+        </div>
+        
+        <div class="formula-display">
+            <strong>Unicode表示：</strong><br>
+            <code>{{FORMULA_UNICODE}}</code>
+        </div>
+        
+        <p><strong>物理描述：</strong><br>{{FORMULA_DESCRIPTION}}</p>
+        
+        <div class="physics-insight">
+            <h4>🔬 物理洞察</h4>
+            <p>该公式揭示了{{PHYSICS_CONCEPTS}}的深层关系。</p>
+        </div>
+        
+        <div class="physics-insight">
+            <h4>📊 数学工具</h4>
+            <p>涉及{{MATH_CONCEPTS}}等数学概念。</p>
+        </div>
+        
+        <div class="stats-display" id="statsDisplay">
+            <strong>实时统计：</strong><br>
+            帧率: <span id="fps">60</span> FPS<br>
+            渲染对象: <span id="objectCount">0</span><br>
+            计算精度: <span id="precision">高精度</span>
+        </div>
+    </div>
+    
+    <!-- 控制面板 -->
+    <div id="controls-panel" class="ui-panel">
+        <div class="panel-title">🎮 交互控制</div>
+        
+        <div style="text-align: center; margin-bottom: 15px;">
+            <button class="control-button" onclick="toggleAnimation()">
+                <span id="playPauseIcon">▶️</span> <span id="playPauseText">开始</span>
+            </button>
+            <button class="control-button" onclick="resetVisualization()">🔄 重置</button>
+            <button class="control-button" onclick="toggleFullscreen()">🔍 全屏</button>
+        </div>
+        
+        <!-- 动态参数控制 -->
+        <div id="parameterControls">
+            {{PARAMETER_CONTROLS}}
+        </div>
+        
+        <div class="physics-insight">
+            <h4>💡 操作提示</h4>
+            <p>• 鼠标拖拽旋转视角<br>
+            • 滚轮缩放场景<br>
+            • 调节参数观察变化<br>
+            • 点击重置恢复初始状态</p>
+        </div>
+    </div>
+    
+    <!-- 数学面板 -->
+    <div id="math-panel" class="ui-panel">
+        <div class="panel-title">📐 数学分析</div>
+        <div id="mathAnalysis">
+            <div class="formula-display">
+                <strong>实时计算结果：</strong><br>
+                <span id="calculationResult">计算中...</span>
+            </div>
+        </div>
+    </div>
+
+    <script src="{{ENGINE_SCRIPT}}"></script>
+    <script>
+        {{VISUALIZATION_CODE}}
+    </script>
+</body>
+</html>"""
+
+# 终极可视化生成器：所有页面共用的 Three.js 场景引擎（写入 ufv.<hash>.js），
+# 公式相关的部分由页面脚本中的钩子函数提供
+ULTIMATE_ENGINE_SCRIPT = """
+        // 全局变量
+        let scene, camera, renderer, controls;
+        let animationId, isAnimating = false;
+        let visualizationObjects = {};
+        let parameters = {};
+        let startTime = Date.now();
+        let physics = null;
+        
+        // 物理 worker 的状态缓冲区个数和步进间隔（毫秒）
+        const PHYSICS_BUFFERS = 3;
+        const PHYSICS_INTERVAL = 1000 / 60;
+        
+        // 场景初始化
+        function initScene() {
+            // 创建场景
+            scene = new THREE.Scene();
+            scene.background = new THREE.Color(0x0a0a0a);
+            scene.fog = new THREE.Fog(0x0a0a0a, 50, 200);
+            
+            // 创建相机
+            camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);
+            camera.position.set(15, 15, 15);
+            
+            // 创建渲染器
+            renderer = new THREE.WebGLRenderer({ 
+                canvas: document.getElementById('canvas'), 
+                antialias: true,
+                alpha: true
+            });
+            renderer.setSize(window.innerWidth, window.innerHeight);
+            renderer.shadowMap.enabled = true;
+            renderer.shadowMap.type = THREE.PCFSoftShadowMap;
+            renderer.outputEncoding = THREE.sRGBEncoding;
+            renderer.toneMapping = THREE.ACESFilmicToneMapping;
+            renderer.toneMappingExposure = 1.2;
+            
+            // 创建控制器
+            controls = new THREE.OrbitControls(camera, renderer.domElement);
+            controls.enableDamping = true;
+            controls.dampingFactor = 0.05;
+            controls.maxDistance = 100;
+            controls.minDistance = 5;
+            
+            // 添加光照系统
+            setupLighting();
+            
+            // 创建坐标系
+            createCoordinateSystem();
+            
+            // 创建特定可视化内容（页面脚本提供）
+            createVisualization();
+            
+            // 初始化参数
+            initializeParameters();
+            
+            // 页面脚本提供物理模型时启动物理 worker
+            startPhysics();
+            
+            // 开始动画循环
+            animate();
+            
+            // 隐藏加载屏幕
+            setTimeout(() => {
+                document.getElementById('loadingScreen').classList.add('fade-out');
+            }, 1000);
+        }
+        
+        // 光照设置
+        function setupLighting() {
+            // 环境光
+            const ambientLight = new THREE.AmbientLight(0x404080, 0.3);
+            scene.add(ambientLight);
+            
+            // 主光源
+            const directionalLight = new THREE.DirectionalLight(0xffffff, 1);
+            directionalLight.position.set(20, 20, 10);
+            directionalLight.castShadow = true;
+            directionalLight.shadow.mapSize.width = 2048;
+            directionalLight.shadow.mapSize.height = 2048;
+            directionalLight.shadow.camera.near = 0.5;
+            directionalLight.shadow.camera.far = 100;
+            directionalLight.shadow.camera.left = -50;
+            directionalLight.shadow.camera.right = 50;
+            directionalLight.shadow.camera.top = 50;
+            directionalLight.shadow.camera.bottom = -50;
+            scene.add(directionalLight);
+            
+            // 补充光源
+            const pointLight = new THREE.PointLight(0x667eea, 0.5, 100);
+            pointLight.position.set(-10, 10, -10);
+            scene.add(pointLight);
+            
+            const pointLight2 = new THREE.PointLight(0x764ba2, 0.5, 100);
+            pointLight2.position.set(10, -10, 10);
+            scene.add(pointLight2);
+        }
+        
+        // 创建坐标系
+        function createCoordinateSystem() {
+            // 坐标轴
+            const axesHelper = new THREE.AxesHelper(10);
+            scene.add(axesHelper);
+            
+            // 网格
+            const gridHelper = new THREE.GridHelper(20, 20, 0x444444, 0x222222);
+            scene.add(gridHelper);
+            
+            // 坐标标签
+            createAxisLabels();
+        }
+        
+        // 创建坐标轴标签
+        function createAxisLabels() {
+            const loader = new THREE.FontLoader();
+            // 这里可以添加文字标签，但为了简化，我们使用基础几何体标记
+            
+            // X轴标记
+            const xGeometry = new THREE.SphereGeometry(0.2);
+            const xMaterial = new THREE.MeshBasicMaterial({ color: 0xff0000 });
+            const xMarker = new THREE.Mesh(xGeometry, xMaterial);
+            xMarker.position.set(10, 0, 0);
+            scene.add(xMarker);
+            
+            // Y轴标记
+            const yGeometry = new THREE.SphereGeometry(0.2);
+            const yMaterial = new THREE.MeshBasicMaterial({ color: 0x00ff00 });
+            const yMarker = new THREE.Mesh(yGeometry, yMaterial);
+            yMarker.position.set(0, 10, 0);
+            scene.add(yMarker);
+            
+            // Z轴标记
+            const zGeometry = new THREE.SphereGeometry(0.2);
+            const zMaterial = new THREE.MeshBasicMaterial({ color: 0x0000ff });
+            const zMarker = new THREE.Mesh(zGeometry, zMaterial);
+            zMarker.position.set(0, 0, 10);
+            scene.add(zMarker);
+        }
+        
+        // 主动画循环
+        function animate() {
+            animationId = requestAnimationFrame(animate);
+            
+            const currentTime = (Date.now() - startTime) / 1000;
+            
+            if (isAnimating) {
+                if (!physics) {
+                    updateVisualization(currentTime, null);
+                } else if (physics.worker) {
+                    // 只消费最新一帧；worker 还没有送来新帧时本帧不更新
+                    const frame = physics.latest;
+                    if (frame) {
+                        physics.latest = null;
+                        updateVisualization(frame.time, new Float64Array(frame.buffer));
+                        // 用完的缓冲区归还给 worker
+                        physics.worker.postMessage({ buffer: frame.buffer }, [frame.buffer]);
+                    }
+                } else {
+                    // 无法创建 worker（如严格的 CSP）时退回主线程步进
+                    physics.model.step(parameters, currentTime, physics.state);
+                    updateVisualization(currentTime, physics.state);
+                }
+            }
+            
+            // 更新控制器
+            controls.update();
+            
+            // 更新统计信息
+            updateStats();
+            
+            // 渲染场景
+            renderer.render(scene, camera);
+        }
+        
+        // 更新统计信息
+        function updateStats() {
+            const fps = Math.round(1000 / (performance.now() - (window.lastFrameTime || performance.now())));
+            window.lastFrameTime = performance.now();
+            
+            document.getElementById('fps').textContent = fps;
+            document.getElementById('objectCount').textContent = scene.children.length;
+        }
+        
+        // 参数更新函数
+        function updateParameter(name, value) {
+            parameters[name] = parseFloat(value);
+            document.getElementById(name + 'Value').textContent = parseFloat(value).toFixed(2);
+            updateVisualizationParameters();
+            postPhysicsMessage({ parameters: parameters });
+        }
+        
+        function updateVectorParameter(name, axis, value) {
+            if (!parameters[name]) parameters[name] = {x: 0, y: 0, z: 0};
+            parameters[name][axis] = parseFloat(value);
+            document.getElementById(name + '_' + axis + 'Value').textContent = parseFloat(value).toFixed(2);
+            updateVisualizationParameters();
+            postPhysicsMessage({ parameters: parameters });
+        }
+        
+        // 控制函数
+        function toggleAnimation() {
+            isAnimating = !isAnimating;
+            postPhysicsMessage({ running: isAnimating });
+            const icon = document.getElementById('playPauseIcon');
+            const text = document.getElementById('playPauseText');
+            
+            if (isAnimating) {
+                icon.textContent = '⏸️';
+                text.textContent = '暂停';
+            } else {
+                icon.textContent = '▶️';
+                text.textContent = '开始';
+            }
+        }
+        
+        function resetVisualization() {
+            startTime = Date.now();
+            initializeParameters();
+            // 重置所有参数控制器
+            resetParameterControls();
+            postPhysicsMessage({ parameters: parameters, startTime: startTime });
+        }
+        
+        function toggleFullscreen() {
+            if (!document.fullscreenElement) {
+                document.documentElement.requestFullscreen();
+            } else {
+                document.exitFullscreen();
+            }
+        }
+
+        // 物理 worker：页面脚本的 createPhysicsModel() 返回 { size, step(parameters, time, state), reset() }，
+        // step 把 time 时刻的 size 个状态量写入 state（Float64Array）。模型函数必须自包含
+        // （不引用 THREE 和页面变量），因为它和下面的主函数一起序列化为 Blob 脚本在 worker 中运行；
+        // Blob 脚本在 file:// 打开的页面中也能创建 worker。worker 无法创建（同步抛出）或加载失败
+        // （如 CSP 禁止 blob: 脚本时异步触发 onerror）时，同一个模型退回主线程步进。
+        // 状态缓冲区在两个线程之间转移（不复制），固定 PHYSICS_BUFFERS 个循环使用：
+        // worker 只在有空闲缓冲区时步进，主线程来不及绘制的旧帧直接归还，渲染循环只读取最新一帧。
+        // 未使用 SharedArrayBuffer：它要求跨源隔离（COOP/COEP 响应头），静态托管和本地文件都无法满足
+        function physicsWorkerMain(createPhysicsModel, bufferCount, interval) {
+            const model = createPhysicsModel();
+            const free = [];
+            for (let i = 0; i < bufferCount; i++) {
+                free.push(new ArrayBuffer(model.size * Float64Array.BYTES_PER_ELEMENT));
+            }
+            let parameters = {}, startTime = Date.now(), running = false, timer = null;
+
+            function schedule() {
+                if (running && timer === null && free.length > 0) {
+                    timer = setTimeout(step, interval);
+                }
+            }
+
+            function step() {
+                timer = null;
+                if (!running || free.length === 0) return;
+                const buffer = free.pop();
+                const time = (Date.now() - startTime) / 1000;
+                model.step(parameters, time, new Float64Array(buffer));
+                postMessage({ time: time, buffer: buffer }, [buffer]);
+                schedule();
+            }
+
+            onmessage = event => {
+                const message = event.data;
+                if (message.buffer) free.push(message.buffer);
+                if (message.parameters) parameters = message.parameters;
+                if (message.startTime !== undefined) {
+                    startTime = message.startTime;
+                    if (model.reset) model.reset();
+                }
+                if (message.running !== undefined) running = message.running;
+                schedule();
+            };
+        }
+
+        function startPhysics() {
+            if (typeof createPhysicsModel !== 'function') return;
+            try {
+                const source = `(${physicsWorkerMain})(${createPhysicsModel}, ${PHYSICS_BUFFERS}, ${PHYSICS_INTERVAL});`;
+                const worker = new Worker(URL.createObjectURL(new Blob([source], { type: 'text/javascript' })));
+                physics = { worker: worker, latest: null };
+                worker.onmessage = event => {
+                    // 新帧覆盖尚未绘制的旧帧，旧帧的缓冲区归还给 worker
+                    if (physics.latest) {
+                        worker.postMessage({ buffer: physics.latest.buffer }, [physics.latest.buffer]);
+                    }
+                    physics.latest = event.data;
+                };
+                worker.onerror = event => {
+                    event.preventDefault();
+                    worker.terminate();
+                    startMainThreadPhysics();
+                };
+                worker.postMessage({ parameters: parameters, startTime: startTime, running: isAnimating });
+            } catch (error) {
+                startMainThreadPhysics();
+            }
+        }
+
+        function startMainThreadPhysics() {
+            const model = createPhysicsModel();
+            physics = { model: model, state: new Float64Array(model.size) };
+        }
+
+        function postPhysicsMessage(message) {
+            if (physics && physics.worker) physics.worker.postMessage(message);
+        }
+
+        // 环形缓冲折线：顶点数组只分配一次，每帧只写入新点并调整绘制范围
+        // 数组长度为容量的两倍，每个点同时写入 i 和 i + capacity，
+        // 因此最近 capacity 个点在数组中总是连续的，可以直接用 setDrawRange 绘制
+        function createRingBufferLine(capacity, material) {
+            const geometry = new THREE.BufferGeometry();
+            const attribute = new THREE.BufferAttribute(new Float32Array(capacity * 2 * 3), 3);
+            attribute.setUsage(THREE.DynamicDrawUsage);
+            geometry.setAttribute('position', attribute);
+            geometry.setDrawRange(0, 0);
+
+            const line = new THREE.Line(geometry, material);
+            // 包围球不随每帧更新，关闭视锥剔除
+            line.frustumCulled = false;
+            line.userData.ring = { capacity: capacity, next: 0, count: 0 };
+            return line;
+        }
+
+        function pushRingBufferPoint(line, x, y, z) {
+            const ring = line.userData.ring;
+            const attribute = line.geometry.attributes.position;
+            const array = attribute.array;
+            const first = ring.next * 3;
+            const second = (ring.next + ring.capacity) * 3;
+            array[first] = array[second] = x;
+            array[first + 1] = array[second + 1] = y;
+            array[first + 2] = array[second + 2] = z;
+
+            ring.next = (ring.next + 1) % ring.capacity;
+            ring.count = Math.min(ring.count + 1, ring.capacity);
+            line.geometry.setDrawRange((ring.next - ring.count + ring.capacity) % ring.capacity, ring.count);
+            attribute.needsUpdate = true;
+        }
+
+        // 由物理状态整段填充的折线：顶点数组只分配一次，
+        // 物理模型算好的 count 个点（从 state[offset] 开始的 x, y, z）直接拷贝进来
+        function createStateLine(capacity, material) {
+            const geometry = new THREE.BufferGeometry();
+            const attribute = new THREE.BufferAttribute(new Float32Array(capacity * 3), 3);
+            attribute.setUsage(THREE.DynamicDrawUsage);
+            geometry.setAttribute('position', attribute);
+            geometry.setDrawRange(0, 0);
+
+            const line = new THREE.Line(geometry, material);
+            line.frustumCulled = false;
+            return line;
+        }
+
+        function copyStatePoints(line, state, offset, count) {
+            const attribute = line.geometry.attributes.position;
+            attribute.array.set(state.subarray(offset, offset + count * 3));
+            line.geometry.setDrawRange(0, count);
+            attribute.needsUpdate = true;
+        }
+
+        // 生成器嵌入的 base64 小端 Float32 数据
+        function decodeFloat32(base64) {
+            const binary = atob(base64);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) {
+                bytes[i] = binary.charCodeAt(i);
+            }
+            return new Float32Array(bytes.buffer);
+        }
+
+        // 全部场线合并为一个 LineSegments（一次绘制调用），顶点两两成一条线段
+        function createFieldLineSegments(base64, material) {
+            const geometry = new THREE.BufferGeometry();
+            geometry.setAttribute('position', new THREE.BufferAttribute(decodeFloat32(base64), 3));
+            return new THREE.LineSegments(geometry, material);
+        }
+
+        // 场矢量箭头：一个 InstancedMesh，每个实例的位置、方向、长度和颜色由生成器给出的
+        // positions / vectors（每实例 3 个分量）决定；长度和颜色按场强的对数归一化
+        function createInstancedArrows(positions, vectors, options) {
+            const count = positions.length / 3;
+            const geometry = new THREE.ConeGeometry(options.radius, 1, 6);
+            // 圆锥底面移到原点，沿 +y 方向伸出
+            geometry.translate(0, 0.5, 0);
+            const material = new THREE.MeshPhongMaterial({ transparent: true, opacity: options.opacity });
+            const mesh = new THREE.InstancedMesh(geometry, material, count);
+            setInstancedArrows(mesh, positions, vectors, options);
+            return mesh;
+        }
+
+        // 按新的场矢量重写全部实例的矩阵和颜色（实例数不变，不重建几何体）
+        function setInstancedArrows(mesh, positions, vectors, options) {
+            const count = mesh.count;
+            const magnitudes = new Float32Array(count);
+            let low = Infinity, high = -Infinity;
+            for (let i = 0; i < count; i++) {
+                const m = Math.hypot(vectors[3 * i], vectors[3 * i + 1], vectors[3 * i + 2]);
+                magnitudes[i] = m > 0 ? Math.log(m) : -Infinity;
+                if (m > 0) {
+                    low = Math.min(low, magnitudes[i]);
+                    high = Math.max(high, magnitudes[i]);
+                }
+            }
+
+            const dummy = new THREE.Object3D();
+            const up = new THREE.Vector3(0, 1, 0);
+            const direction = new THREE.Vector3();
+            const weakColor = new THREE.Color(options.weakColor);
+            const strongColor = new THREE.Color(options.strongColor);
+            const color = new THREE.Color();
+            for (let i = 0; i < count; i++) {
+                direction.set(vectors[3 * i], vectors[3 * i + 1], vectors[3 * i + 2]).normalize();
+                const s = high > low ? Math.max(0, (magnitudes[i] - low) / (high - low)) : 1;
+                const length = options.minLength + s * (options.maxLength - options.minLength);
+                dummy.position.set(positions[3 * i], positions[3 * i + 1], positions[3 * i + 2]);
+                dummy.quaternion.setFromUnitVectors(up, direction);
+                dummy.scale.set(1, length, 1);
+                dummy.updateMatrix();
+                mesh.setMatrixAt(i, dummy.matrix);
+                mesh.setColorAt(i, color.copy(weakColor).lerp(strongColor, s));
+            }
+            mesh.instanceMatrix.needsUpdate = true;
+            mesh.instanceColor.needsUpdate = true;
+        }
+
+        // 窗口大小调整
+        window.addEventListener('resize', () => {
+            camera.aspect = window.innerWidth / window.innerHeight;
+            camera.updateProjectionMatrix();
+            renderer.setSize(window.innerWidth, window.innerHeight);
+        });
+
+        // 页面加载完成后初始化
+        window.addEventListener('load', () => {
+            initScene();
+        });
+        """
+
+# 终极可视化生成器：页面内的公式专用脚本
+ULTIMATE_SCRIPT_TEMPLATE = """
+        // 页面脚本：共享引擎（ufv.<hash>.js）在加载完成后调用以下函数
+        
+        // 初始化参数
+        function initializeParameters() {
+            {{PARAMETER_INITIALIZATION}}
+        }
+        
+        // 创建特定可视化内容
+        function createVisualization() {
+            {{SPECIFIC_VISUALIZATION}}
+        }
+        
+        // 物理模型（在 Web Worker 中运行，见共享引擎的 startPhysics）
+        {{PHYSICS_MODEL}}
+        
+        // 更新可视化：state 为物理模型在 time 时刻的状态（没有物理模型时为 null），
+        // 缓冲区在函数返回后归还给 worker，不要保留引用
+        function updateVisualization(time, state) {
+            {{ANIMATION_CODE}}
+        }
+        
+        // 更新可视化参数
+        function updateVisualizationParameters() {
+            {{PARAMETER_UPDATE_CODE}}
+        }
+        
+        // 重置参数控制器
+        function resetParameterControls() {
+            {{RESET_CODE}}
+        }
+        """
+
+# 超级可视化生成器：所有页面共用的样式（写入 ufv-super.<hash>.css）
+SUPER_STYLE = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            background: linear-gradient(135deg, #0c0c0c 0%, #1a1a2e 50%, #16213e 100%);
+            font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
+            overflow: hidden; color: white; height: 100vh;
+        }
+        
+        #canvas { 
+            display: block; cursor: grab; width: 100%; height: 100%;
+            background: radial-gradient(circle at center, #1a1a2e 0%, #0c0c0c 100%);
+        }
+        
+        .ui-panel {
+            position: absolute; background: rgba(0, 0, 0, 0.85);
+            backdrop-filter: blur(20px); border: 1px solid rgba(255, 255, 255, 0.1);
+            border-radius: 15px; padding: 20px; 
+            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.6);
+            transition: all 0.3s ease;
+        }
+        
+        .ui-panel:hover { transform: translateY(-2px); }
+        
+        #info-panel { 
+            top: 20px; left: 20px; width: 420px; max-height: 80vh; overflow-y: auto;
+        }
+        
+        #controls-panel { 
+            top: 20px; right: 20px; width: 320px;
+        }
+        
+        .panel-title {
+            font-size: 1.4em; font-weight: bold; margin-bottom: 15px;
+            background: linear-gradient(45deg, #667eea, #764ba2, #f093fb);
+            background-clip: text; -webkit-background-clip: text; 
+            -webkit-text-fill-color: transparent;
+        }
+        
+        .formula-display {
+            background: rgba(255, 255, 255, 0.05); padding: 15px; border-radius: 10px;
+            margin: 10px 0; border-left: 4px solid #667eea;
+        }
+        
+        .parameter-control {
+            margin: 10px 0; display: flex; align-items: center; gap: 10px;
+        }
+        
+        .parameter-control label {
+            min-width: 80px; font-size: 0.9em; color: #ccc;
+        }
+        
+        .parameter-control input[type="range"] {
+            flex: 1; height: 6px; border-radius: 3px;
+            background: linear-gradient(90deg, #667eea, #764ba2);
+            outline: none; -webkit-appearance: none;
+        }
+        
+        .parameter-value {
+            min-width: 60px; text-align: right; font-family: monospace;
+            background: rgba(255,255,255,0.1); padding: 2px 8px; border-radius: 4px;
+        }
+        
+        .control-button {
+            background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
+            border: none; padding: 12px 24px; border-radius: 25px; 
+            cursor: pointer; margin: 5px; font-size: 0.9em;
+            transition: all 0.3s ease; font-weight: 500;
+        }
+        
+        .control-button:hover { 
+            transform: translateY(-2px); 
+            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.4);
+        }
+        
+        .physics-insight {
+            background: linear-gradient(135deg, rgba(102, 126, 234, 0.1), rgba(118, 75, 162, 0.1));
+            border: 1px solid rgba(102, 126, 234, 0.3); padding: 15px; 
+            border-radius: 10px; margin: 15px 0;
+        }
+        
+        .loading-screen {
+            position: fixed; top: 0; left: 0; width: 100%; height: 100%;
+            background: linear-gradient(135deg, #0c0c0c, #1a1a2e);
+            display: flex; flex-direction: column; justify-content: center; align-items: center;
+            z-index: 1000; transition: opacity 0.5s ease;
+        }
+        
+        .loading-spinner {
+            width: 60px; height: 60px; border: 4px solid rgba(255,255,255,0.1);
+            border-top: 4px solid #667eea; border-radius: 50%;
+            animation: spin 1s linear infinite; margin-bottom: 20px;
+        }
+        
+        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+        
+        .fade-out { opacity: 0; pointer-events: none; }
+"""
+
+# 超级可视化生成器：完整页面
+SUPER_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{FORMULA_NAME}} - 张祥前统一场论可视化</title>
+    <link rel="stylesheet" href="{{STYLESHEET}}">
+    
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
+    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
+{{MATH_SCRIPTS}}</head>
+<body>
+    <div id="loadingScreen" class="loading-screen">
+        <div class="loading-spinner"></div>
+        <h2>正在加载 {{FORMULA_NAME}} 可视化...</h2>
+        <p>张祥前统一场论 - 高级3D可视化系统</p>
+    </div>
+    
+    <canvas id="canvas"></canvas>
+    
+    <div id="info-panel" class="ui-panel">
+        <div class="panel-title">{{FORMULA_ICON}} {{FORMULA_NAME}}</div>
+        
+        <div class="formula-display">
+            <strong>LaTeX公式：</strong><br>
+            {{FORMULA_MATH}}
+        </div>
+        
+        <p><strong>物理描述：</strong><br>{{FORMULA_DESCRIPTION}}</p>
+        
+        <div class="physics-insight">
+            <h4>🔬 物理意义</h4>
+            <p>该公式是张祥前统一场论的核心组成部分，揭示了宇宙基本规律的深层结构。</p>
+        </div>
+    </div>
+    
+    <div id="controls-panel" class="ui-panel">
+        <div class="panel-title">🎮 交互控制</div>
+        
+        <div style="text-align: center; margin-bottom: 15px;">
+            <button class="control-button" onclick="toggleAnimation()">
+                <span id="playPauseIcon">▶️</span> <span id="playPauseText">开始</span>
+            </button>
+            <button class="control-button" onclick="resetVisualization()">🔄 重置</button>
+            <button class="control-button" onclick="toggleFullscreen()">🔍 全屏</button>
+        </div>
+        
+        <div class="physics-insight">
+            <h4>💡 操作提示</h4>
+            <p>• 鼠标拖拽旋转视角<br>
+            • 滚轮缩放场景<br>
+            • 点击按钮控制动画<br>
+            • 观察公式的几何表现</p>
+        </div>
+    </div>
+
+    <script>
+        {{VISUALIZATION_CODE}}
+    </script>
+</body>
+</html>"""
+
+ULTIMATE_PAGE = compile_template(ULTIMATE_PAGE_TEMPLATE)
+ULTIMATE_SCRIPT = compile_template(ULTIMATE_SCRIPT_TEMPLATE)
+SUPER_PAGE = compile_template(SUPER_PAGE_TEMPLATE)
@@ -7,16 +7,98 @@ Advanced HTML5 Visualization Template Generator
 为张祥前统一场论公式生成最先进的可视化模板
 """
 
-def get_advanced_html_template():
-    """获取最先进的HTML5模板"""
-    return '''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{FORMULA_NAME}} - 张祥前统一场论可视化</title>
-    <style>
-        :root {
+import json
+import math
+from typing import Any, Dict, Optional
+
+from 公式内核编译器 import UNIFORM_PREFIX, expand_parameters
+from 场矢量实例 import FIELD_SAMPLERS, get_compiler, shader_field_buffers
+from 模板引擎 import compile_template
+
+# 场矢量箭头的顶点着色器：每个实例在自己的采样点上调用公式的 GLSL 函数（FIELD_FUNCTION 插槽），
+# 按场方向旋转沿 +y 的箭头，按相对场强缩放长度；参数全部是 uniform
+FIELD_VERTEX_SHADER = '''attribute vec3 instanceOffset;
+uniform float fieldReference;
+uniform float fieldLogSpan;
+uniform float arrowMinLength;
+uniform float arrowMaxLength;
+varying float vStrength;
+
+{{FIELD_FUNCTION}}
+void main() {
+    // 先按参考场强归一化，length() 中的平方不会因 1e-11 或 1e9 量级的分量下溢、溢出
+    vec3 field = fieldAt(instanceOffset) / fieldReference;
+    float magnitude = length(field);
+    vec3 direction = magnitude > 0.0 ? field / magnitude : vec3(0.0, 1.0, 0.0);
+    vStrength = magnitude > 0.0 ? clamp(0.5 + log(magnitude) / (2.0 * fieldLogSpan), 0.0, 1.0) : 0.0;
+
+    // 以场方向为 y 轴的右手正交基
+    vec3 helper = abs(direction.y) < 0.99 ? vec3(0.0, 1.0, 0.0) : vec3(1.0, 0.0, 0.0);
+    vec3 side = normalize(cross(helper, direction));
+    vec3 front = cross(side, direction);
+    float arrowLength = mix(arrowMinLength, arrowMaxLength, vStrength);
+    vec3 local = side * position.x + direction * (position.y * arrowLength) + front * position.z;
+    gl_Position = projectionMatrix * modelViewMatrix * vec4(instanceOffset + local, 1.0);
+}
+'''
+
+FIELD_FRAGMENT_SHADER = '''uniform vec3 weakColor;
+uniform vec3 strongColor;
+uniform float opacity;
+varying float vStrength;
+
+void main() {
+    gl_FragColor = vec4(mix(weakColor, strongColor, vStrength), opacity);
+}
+'''
+
+# 范围跨越两个数量级以上的正参数（G、ε₀、μ₀ 等）用对数刻度滑块；
+# 在对数空间带容差比较，1e-11 / 1e-13 这类浮点比值（99.99999999999999）也算两个数量级
+LOG_SLIDER_DECADES = 2
+
+
+def get_field_shader_data(formula_id: str) -> Optional[Dict[str, Any]]:
+    """着色器求值的场页面数据：着色器源代码、uniform 及其滑块、采样点；其他公式返回 None"""
+    if formula_id not in FIELD_SAMPLERS:
+        return None
+    compiler = get_compiler()
+    parameters = compiler.formulas[formula_id]['parameters']
+    buffers = shader_field_buffers(formula_id)
+
+    uniforms = [{'name': UNIFORM_PREFIX + entry['name'], 'type': 'vec3' if entry['type'] == 'vector3' else 'float',
+                 'value': entry['default']}
+                for entry in parameters if entry['type'] in ('float', 'integer', 'vector3')]
+    controls = []
+    for argument in expand_parameters(parameters):
+        low, high = argument['range']
+        vector = argument['vector']
+        controls.append({
+            'label': argument['name'],
+            'uniform': UNIFORM_PREFIX + (vector or argument['name']),
+            'component': argument['name'][len(vector) + 1:] if vector else None,
+            'min': low, 'max': high, 'value': argument['default'],
+            'integer': argument['integer'],
+            'log': low > 0 and math.log10(high / low) >= LOG_SLIDER_DECADES - 1e-9,
+        })
+    return {
+        'vertexShader': compile_template(FIELD_VERTEX_SHADER).render(FIELD_FUNCTION=compiler.glsl(formula_id)),
+        'fragmentShader': FIELD_FRAGMENT_SHADER,
+        'uniforms': uniforms,
+        'controls': controls,
+        'count': buffers['count'],
+        'positions': buffers['positions'],
+        'reference': buffers['reference'],
+        'logSpan': buffers['log_span'],
+    }
+
+
+def get_shader_template(formula_id: str) -> str:
+    """页面 FIELD_SHADER 插槽的脚本：公式04 / 10 / 11 为着色器数据，其他公式为 null"""
+    return f"const FIELD_SHADER = {json.dumps(get_field_shader_data(formula_id))};"
+
+
+# 全自动生成器：所有页面共用的样式（写入 ufv-advanced.<hash>.css）
+ADVANCED_STYLE = '''        :root {
             --primary-color: #667eea;
             --secondary-color: #764ba2;
             --accent-color: #feca57;
@@ -156,91 +238,15 @@ def get_advanced_html_template():
             height: 100%; background: linear-gradient(90deg, var(--primary-color), var(--accent-color));
             width: 0%; transition: width 0.5s ease; border-radius: 4px;
         }
-    </style>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/stats.js/r17/Stats.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/dat-gui/0.7.9/dat.gui.min.js"></script>
-    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
-    <script>
-        window.MathJax = {
-            tex: { inlineMath: [['$', '$'], ['\\\\(', '\\\\)']], displayMath: [['$$', '$$'], ['\\\\[', '\\\\]']] },
-            options: { renderActions: { addMenu: [0, '', ''] } }
-        };
-    </script>
-</head>
-<body>
-    <div id="loading" class="loading">
-        <h3>🌌 加载张祥前统一场论可视化...</h3>
-        <div class="progress-bar"><div id="progress-fill" class="progress-fill"></div></div>
-        <p id="loading-text">正在初始化物理引擎...</p>
-    </div>
-    
-    <canvas id="canvas"></canvas>
-    
-    <div id="info-panel" class="ui-panel">
-        <div class="panel-title">{{FORMULA_ICON}} {{FORMULA_NAME}}</div>
-        <div class="math-formula">
-            <strong>核心公式：</strong><br>
-            $${{FORMULA_LATEX}}$$
-        </div>
-        <p><strong>物理意义：</strong> {{FORMULA_DESCRIPTION}}</p>
-        
-        <div class="control-group">
-            <h4>📊 实时参数监控</h4>
-            <div id="parameter-display"></div>
-        </div>
-        
-        <div class="control-group">
-            <h4>🎯 物理概念</h4>
-            <div id="physics-concepts"></div>
-        </div>
-    </div>
-    
-    <div id="controls-panel" class="ui-panel">
-        <div class="panel-title">🎮 高级控制</div>
-        
-        <div class="control-group">
-            <button class="button" onclick="startSimulation()">▶️ 开始模拟</button>
-            <button class="button" onclick="pauseSimulation()">⏸️ 暂停</button>
-            <button class="button" onclick="resetSimulation()">🔄 重置</button>
-            <button class="button" onclick="exportData()">💾 导出数据</button>
-        </div>
-        
-        <div class="control-group">
-            <h4>参数控制</h4>
-            <div id="parameter-controls"></div>
-        </div>
-        
-        <div class="control-group">
-            <h4>可视化选项</h4>
-            <div id="visualization-options"></div>
-        </div>
-        
-        <div class="control-group">
-            <h4>高级功能</h4>
-            <button class="button" onclick="toggleFullscreen()">🖥️ 全屏</button>
-            <button class="button" onclick="captureScreenshot()">📸 截图</button>
-            <button class="button" onclick="recordVideo()">🎥 录制</button>
-        </div>
-    </div>
-    
-    <div id="math-panel" class="ui-panel">
-        <div class="panel-title">📐 数学推导</div>
-        <div id="math-derivation"></div>
-    </div>
-    
-    <div id="stats-panel" class="ui-panel">
-        <div class="panel-title">📈 性能统计</div>
-        <div id="performance-stats"></div>
-    </div>
+'''
 
-    <script>
-        // 全局变量
+# 全自动生成器：所有页面共用的场景引擎（写入 ufv-advanced.<hash>.js），
+# 公式相关的数据由页面内的脚本以全局变量提供
+ADVANCED_ENGINE_SCRIPT = '''        // 全局变量（页面数据 FORMULA_NAME、FORMULA_LATEX、VISUALIZATION_TYPE、formulaParameters、
+        // FIELD_SHADER 由页面内的脚本在本文件之前定义）
         let scene, camera, renderer, stats, gui;
         let visualizationEngine, physicsSimulator;
         let animationId, isSimulating = false;
-        let formulaParameters = {{PARAMETERS_JSON}};
         let currentTime = 0, timeStep = 0.016;
         
         // 物理常数
@@ -339,9 +345,11 @@ def get_advanced_html_template():
         
         function createVisualizationObjects() {
             // 根据公式类型创建相应的可视化对象
-            const visualizationType = "{{VISUALIZATION_TYPE}}";
+            const visualizationType = VISUALIZATION_TYPE;
             
-            switch(visualizationType) {
+            if (FIELD_SHADER) {
+                createShaderFieldVisualization(FIELD_SHADER);
+            } else switch(visualizationType) {
                 case "3d_vector_field":
                     createVectorFieldVisualization();
                     break;
@@ -360,6 +368,92 @@ def get_advanced_html_template():
             scene.add(axesHelper);
         }
         
+        function decodeFloat32(base64) {
+            const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+            return new Float32Array(bytes.buffer);
+        }
+        
+        function createShaderFieldVisualization(field) {
+            // 场矢量在顶点着色器中求值：公式参数只是 uniform，拖动滑块不需要 CPU 重新计算
+            const uniforms = {
+                fieldReference: { value: field.reference },
+                fieldLogSpan: { value: field.logSpan },
+                arrowMinLength: { value: 0.15 },
+                arrowMaxLength: { value: 0.9 },
+                weakColor: { value: new THREE.Color(0x4444ff) },
+                strongColor: { value: new THREE.Color(0xff4444) },
+                opacity: { value: 0.85 }
+            };
+            field.uniforms.forEach(uniform => {
+                uniforms[uniform.name] = {
+                    value: uniform.type === 'vec3' ? new THREE.Vector3().fromArray(uniform.value) : uniform.value
+                };
+            });
+            
+            // 沿 +y、底面在原点的箭头，所有实例共用
+            const arrow = new THREE.ConeGeometry(0.05, 1, 6);
+            arrow.translate(0, 0.5, 0);
+            const geometry = new THREE.InstancedBufferGeometry();
+            geometry.setIndex(arrow.getIndex());
+            geometry.setAttribute('position', arrow.getAttribute('position'));
+            geometry.setAttribute('instanceOffset',
+                new THREE.InstancedBufferAttribute(decodeFloat32(field.positions), 3));
+            geometry.instanceCount = field.count;
+            
+            const material = new THREE.ShaderMaterial({
+                uniforms: uniforms,
+                vertexShader: field.vertexShader,
+                fragmentShader: field.fragmentShader,
+                transparent: true,
+                depthWrite: false
+            });
+            const arrows = new THREE.Mesh(geometry, material);
+            arrows.frustumCulled = false;  // 实例分布在箭头几何体的包围球之外
+            scene.add(arrows);
+            
+            createUniformControls(field.controls, material.uniforms);
+        }
+        
+        function createUniformControls(controls, uniforms) {
+            // 每个滑块只改写一个 uniform（或 vec3 的一个分量）
+            const container = document.getElementById('parameter-controls');
+            controls.forEach(control => {
+                const toValue = t => control.log
+                    ? control.min * Math.pow(control.max / control.min, t)
+                    : control.min + (control.max - control.min) * t;
+                const toSlider = value => control.log
+                    ? Math.log(value / control.min) / Math.log(control.max / control.min)
+                    : (value - control.min) / (control.max - control.min);
+                
+                const label = document.createElement('label');
+                label.style.display = 'block';
+                const input = document.createElement('input');
+                input.type = 'range';
+                input.min = 0;
+                input.max = 1000;
+                input.value = Math.round(toSlider(control.value) * 1000);
+                const text = document.createElement('span');
+                const show = value => { text.textContent = ` ${control.label} = ${Number(value.toPrecision(3))}`; };
+                show(control.value);
+                
+                input.addEventListener('input', () => {
+                    let value = toValue(input.value / 1000);
+                    if (control.integer) value = Math.round(value);
+                    const uniform = uniforms[control.uniform];
+                    if (control.component) {
+                        uniform.value[control.component] = value;
+                    } else {
+                        uniform.value = value;
+                    }
+                    show(value);
+                });
+                
+                label.appendChild(input);
+                label.appendChild(text);
+                container.appendChild(label);
+            });
+        }
+        
         function createVectorFieldVisualization() {
             // 创建矢量场可视化
             console.log("创建矢量场可视化...");
@@ -492,21 +586,21 @@ def get_advanced_html_template():
         
         function captureScreenshot() {
             const link = document.createElement('a');
-            link.download = '{{FORMULA_NAME}}_screenshot.png';
+            link.download = `${FORMULA_NAME}_screenshot.png`;
             link.href = renderer.domElement.toDataURL();
             link.click();
         }
         
         function exportData() {
             const data = {
-                formula: "{{FORMULA_LATEX}}",
+                formula: FORMULA_LATEX,
                 parameters: formulaParameters,
                 timestamp: new Date().toISOString()
             };
             const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
             const url = URL.createObjectURL(blob);
             const link = document.createElement('a');
-            link.download = '{{FORMULA_NAME}}_data.json';
+            link.download = `${FORMULA_NAME}_data.json`;
             link.href = url;
             link.click();
         }
@@ -529,21 +623,102 @@ def get_advanced_html_template():
             if (animationId) cancelAnimationFrame(animationId);
             if (renderer) renderer.dispose();
         });
-    </script>
-</body>
-</html>'''
+'''
+
+
+def get_advanced_html_template():
+    """获取最先进的HTML5模板（样式和场景引擎引用共享资源 STYLESHEET / ENGINE_SCRIPT）"""
+    return '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{FORMULA_NAME}} - 张祥前统一场论可视化</title>
+    <link rel="stylesheet" href="{{STYLESHEET}}">
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/stats.js/r17/Stats.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/dat-gui/0.7.9/dat.gui.min.js"></script>
+    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
+{{MATH_SCRIPTS}}</head>
+<body>
+    <div id="loading" class="loading">
+        <h3>🌌 加载张祥前统一场论可视化...</h3>
+        <div class="progress-bar"><div id="progress-fill" class="progress-fill"></div></div>
+        <p id="loading-text">正在初始化物理引擎...</p>
+    </div>
+    
+    <canvas id="canvas"></canvas>
+    
+    <div id="info-panel" class="ui-panel">
+        <div class="panel-title">{{FORMULA_ICON}} {{FORMULA_NAME}}</div>
+        <div class="math-formula">
+            <strong>核心公式：</strong><br>
+            {{FORMULA_MATH}}
+        </div>
+        <p><strong>物理意义：</strong> {{FORMULA_DESCRIPTION}}</p>
+        
+        <div class="control-group">
+            <h4>📊 实时参数监控</h4>
+            <div id="parameter-display"></div>
+        </div>
+        
+        <div class="control-group">
+            <h4>🎯 物理概念</h4>
+            <div id="physics-concepts"></div>
+        </div>
+    </div>
     
-    def _get_webgl_template(self) -> str:
-        """获取WebGL模板"""
-        return "WebGL高级渲染模板"
+    <div id="controls-panel" class="ui-panel">
+        <div class="panel-title">🎮 高级控制</div>
+        
+        <div class="control-group">
+            <button class="button" onclick="startSimulation()">▶️ 开始模拟</button>
+            <button class="button" onclick="pauseSimulation()">⏸️ 暂停</button>
+            <button class="button" onclick="resetSimulation()">🔄 重置</button>
+            <button class="button" onclick="exportData()">💾 导出数据</button>
+        </div>
+        
+        <div class="control-group">
+            <h4>参数控制</h4>
+            <div id="parameter-controls"></div>
+        </div>
+        
+        <div class="control-group">
+            <h4>可视化选项</h4>
+            <div id="visualization-options"></div>
+        </div>
+        
+        <div class="control-group">
+            <h4>高级功能</h4>
+            <button class="button" onclick="toggleFullscreen()">🖥️ 全屏</button>
+            <button class="button" onclick="captureScreenshot()">📸 截图</button>
+            <button class="button" onclick="recordVideo()">🎥 录制</button>
+        </div>
+    </div>
     
-    def _get_threejs_template(self) -> str:
-        """获取Three.js模板"""
-        return "Three.js物理模拟模板"
+    <div id="math-panel" class="ui-panel">
+        <div class="panel-title">📐 数学推导</div>
+        <div id="math-derivation"></div>
+    </div>
     
-    def _get_shader_template(self) -> str:
-        """获取着色器模板"""
-        return "GLSL着色器效果模板"
+    <div id="stats-panel" class="ui-panel">
+        <div class="panel-title">📈 性能统计</div>
+        <div id="performance-stats"></div>
+    </div>
+
+    <script>
+        // 页面数据：共享引擎脚本读取以下全局变量
+        const FORMULA_NAME = {{FORMULA_NAME_JSON}};
+        const FORMULA_LATEX = {{FORMULA_LATEX_JSON}};
+        const VISUALIZATION_TYPE = {{VISUALIZATION_TYPE_JSON}};
+        let formulaParameters = {{PARAMETERS_JSON}};
+        
+        // 场公式（04 / 10 / 11）的着色器数据，其他公式为 null
+        {{FIELD_SHADER}}
+    </script>
+    <script src="{{ENGINE_SCRIPT}}"></script>
+</body>
+</html>'''
 
 def main():
     """主函数"""